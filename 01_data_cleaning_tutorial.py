@@ -24,6 +24,10 @@ import matplotlib.pyplot as plt  # For visualization
 import seaborn as sns  # For beautiful statistical visualizations
 from datetime import datetime  # For date handling
 
+from approximate import write_sample  # Stratified sample for the dashboard
+from campaign_dataset import CampaignDataset  # Snapshot for a fast dashboard start
+from data_profile import DataProfile, diff_profiles, profile_csv, profile_path  # One-pass column profile
+
 # Set display options to see more data
 pd.set_option('display.max_columns', None)  # Show all columns
 pd.set_option('display.width', None)  # Don't wrap output
@@ -46,8 +50,6 @@ df = pd.read_csv('influencer_marketing_roi_dataset.csv')
 print(f"\n✓ Dataset loaded successfully!")
 print(f"  - Total rows: {len(df):,}")
 print(f"  - Total columns: {len(df.columns)}")
-print(f"\nColumn names and types:")
-print(df.dtypes)
 
 print("\n📋 First 5 rows of data:")
 print(df.head())
@@ -62,27 +64,34 @@ print("-" * 80)
 print(f"\nDataset shape: {df.shape}")
 print(f"  → This means: {df.shape[0]} rows and {df.shape[1]} columns")
 
-# Get basic statistics
-print("\n📈 Statistical Summary:")
-print(df.describe())
+# Profile every column in one streaming pass over the file: kind, missing
+# values, range, median, distinct count and most common value (see
+# data_profile.py). It reads the CSV chunk by chunk, so it works the same on
+# files too big to load: python data_profile.py --input big.csv
+RAW_PROFILE = profile_path('influencer_marketing_roi_dataset.csv')
+profile = profile_csv('influencer_marketing_roi_dataset.csv')
 
-# Check data types
-print("\n🏷️  Data Types:")
-print(df.dtypes)
+print("\n📈 Column Profile (≈ = estimated):")
+summary = profile.summary()
+print(summary)
 
 # Check for missing values
 print("\n❓ Missing Values:")
-missing = df.isnull().sum()
-missing_pct = (df.isnull().sum() / len(df)) * 100
-missing_df = pd.DataFrame({
-    'Missing_Count': missing,
-    'Percentage': missing_pct
-})
-print(missing_df[missing_df['Missing_Count'] > 0])
+missing_df = summary.loc[summary['nulls'] > 0, ['nulls', 'null_pct']]
+missing_df.columns = ['Missing_Count', 'Percentage']
+print(missing_df)
 
 if missing_df['Missing_Count'].sum() == 0:
     print("  ✓ No missing values found!")
 
+# Compare with the profile of the previous run, then keep this one
+if RAW_PROFILE.exists():
+    changes = diff_profiles(DataProfile.load(RAW_PROFILE).to_dict(), profile.to_dict())
+    print("\n🔄 Changes since the last run:")
+    print(changes.to_string(index=False) if len(changes) else "  ✓ The raw data looks the same")
+profile.save(RAW_PROFILE)
+print(f"\n✓ Saved column profile: {RAW_PROFILE}")
+
 # ============================================================================
 # STEP 4: DATA CLEANING
 # ============================================================================
@@ -280,6 +289,16 @@ print(f"\n✓ Cleaned data saved to: {output_file}")
 summary_by_platform = platform_stats.to_csv('summary_by_platform.csv')
 print(f"✓ Platform summary saved to: summary_by_platform.csv")
 
+# A small stratified sample lets the dashboard show estimates instantly
+# while the full file is still loading (see approximate.py)
+sample_file = write_sample(df_clean)
+print(f"✓ Stratified sample saved to: {sample_file}")
+
+# The dashboard starts from a snapshot of the typed data and its indexes
+# (one memory-mapped read) instead of parsing the CSV (see snapshot.py)
+snapshot_file = CampaignDataset.load(output_file, use_snapshot=False).save_snapshot()
+print(f"✓ Dashboard snapshot saved to: {snapshot_file}")
+
 # ============================================================================
 # STEP 8: DASHBOARD PREPARATION TIPS
 # ============================================================================
@@ -17,6 +17,14 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 
+from budget_optimizer import SEGMENT, fit_elasticities, recommend
+from bootstrap_ci import bootstrap_intervals, format_interval
+from leaderboard import leaderboard
+from pacing import daily_pacing, to_monthly
+import period_compare
+from period_compare import COMPARISONS, KPIS, baseline_window, describe_window, format_change
+from time_index import CampaignTimeIndex
+
 # Set style for better-looking plots
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
@@ -235,9 +243,13 @@ for i, v in enumerate(platform_performance['efficiency_score'].values):
 current_allocation = df.groupby('platform')['campaign_cost'].sum()
 total_budget = current_allocation.sum()
 
-# Recommended allocation based on efficiency score
-weights = platform_performance['efficiency_score'] / platform_performance['efficiency_score'].sum()
-recommended_allocation = weights * total_budget
+# Recommended allocation from the budget optimizer: every platform × category
+# × campaign type segment gets a response curve with diminishing returns,
+# and each segment stays within 50%-200% of its current spend
+segment_totals = df.groupby(SEGMENT).agg({'campaign_cost': 'sum', 'revenue': 'sum'})
+optimized = recommend(segment_totals, fit_elasticities(df), budget=total_budget)
+recommended_allocation = optimized.groupby(level='platform')['recommended_spend'].sum()
+expected_uplift = (optimized['expected_revenue'].sum() / optimized['revenue'].sum() - 1) * 100
 
 allocation_df = pd.DataFrame({
     'Current': current_allocation,
@@ -335,8 +347,9 @@ axes[1, 0].pie(campaign_counts, labels=campaign_counts.index, autopct='%1.1f%%',
 axes[1, 0].set_title('Campaign Type Distribution', fontsize=14, fontweight='bold')
 
 # 5.4: Revenue Trend Over Time
-monthly_revenue = df.groupby(df['start_date'].dt.to_period('M'))['revenue'].sum().reset_index()
-monthly_revenue['start_date'] = monthly_revenue['start_date'].dt.to_timestamp()
+# Paced: each campaign's revenue is spread over the days it ran (see pacing.py)
+# instead of landing entirely in its start month
+monthly_revenue = to_monthly(daily_pacing(df, by=[]), by=[]).rename(columns={'month': 'start_date'})
 
 axes[1, 1].plot(monthly_revenue['start_date'], monthly_revenue['revenue'],
                 marker='o', linewidth=2, color='#2ECC71', markersize=8)
@@ -380,6 +393,8 @@ Efficiency Score:       {platform_performance.iloc[0]['efficiency_score']:.2f}
 
 BUDGET ALLOCATION RECOMMENDATIONS:
 ---------------------------------
+Optimized over {len(optimized)} platform × category × campaign type segments
+Expected revenue change: {expected_uplift:+.1f}%
 """
 
 for platform in platform_performance.index:
@@ -390,11 +405,76 @@ for platform in platform_performance.index:
     report += f"\n{platform:12} | Current: {current_pct:5.1f}% → Recommended: {recommended_pct:5.1f}% "
     report += f"({change:+.1f}%)"
 
+# 95% bootstrap intervals: how much would these means move with other campaigns?
+intervals = bootstrap_intervals(df, n_resamples=2000)
+
+report += """
+
+CONFIDENCE INTERVALS (95% bootstrap, 2,000 resamples):
+-----------------------------------------------------"""
+
+for grouping, title in [('platform', 'Platform'), ('campaign_type', 'Campaign Type'),
+                        ('influencer_category', 'Category')]:
+    report += f"\n{title}:"
+    for segment, row in intervals.loc[grouping].sort_values('ROAS', ascending=False).iterrows():
+        report += (f"\n  {segment:16} | ROAS {format_interval(row['ROAS'], row['ROAS_low'], row['ROAS_high'])}"
+                   f" | CAC {format_interval(row['CAC'], row['CAC_low'], row['CAC_high'], money=True)}"
+                   f" | Efficiency {format_interval(row['efficiency_score'], row['efficiency_score_low'], row['efficiency_score_high'])}")
+
+# Campaign leaderboard: partial selection per platform, no full sort
+report += """
+
+CAMPAIGN LEADERBOARD (top and bottom 3 by ROAS per platform):
+------------------------------------------------------------"""
+
+for side in ['best', 'worst']:
+    report += f"\n{side.title()}:"
+    for _, row in leaderboard(df, 'ROAS', 3, ['platform'], side).iterrows():
+        report += (f"\n  {row['platform']:12} #{row['rank']} {row['campaign_id']:12} | "
+                   f"ROAS {row['ROAS']:8.2f} | CAC ${row['CAC']:8.2f} | "
+                   f"{row['campaign_type']} / {row['influencer_category']}")
+
+report += "\nLowest CAC overall:"
+for _, row in leaderboard(df, 'CAC', 5, [], 'best').iterrows():
+    report += (f"\n  #{row['rank']} {row['campaign_id']:12} | CAC ${row['CAC']:.2f} | "
+               f"ROAS {row['ROAS']:.2f} | {row['platform']} {row['campaign_type']}")
+
+# Period over period: the latest quarter against both baselines, from the time index
+time_index = CampaignTimeIndex.from_frame(df)
+period_end = df['start_date'].max().normalize()
+period_start = period_end.to_period('Q').start_time
+current_totals = time_index.cell_totals(period_start, period_end)
+baselines = {comparison: time_index.cell_totals(*baseline_window(period_start, period_end, comparison))
+             for comparison in COMPARISONS}
+changes = {comparison: period_compare.compare(period_compare.kpis(current_totals),
+                                              period_compare.kpis(totals))
+           for comparison, totals in baselines.items()}
+
+report += f"""
+
+PERIOD OVER PERIOD ({describe_window(period_start, period_end)}, latest quarter):
+{'-' * 80}
+{'KPI':16} {'Current':>16} | {' | '.join(f"{'vs ' + comparison:>25}" for comparison in COMPARISONS)}"""
+
+for name, (label, value_format, _) in KPIS.items():
+    report += (f"\n{label:16} {value_format.format(changes[COMPARISONS[0]].loc[name, 'current']):>16} | "
+               + " | ".join(f"{format_change(changes[comparison].loc[name, 'change']):>25}"
+                            for comparison in COMPARISONS))
+
+for comparison, totals in baselines.items():
+    versus = period_compare.compare_frames(period_compare.platform_metrics(current_totals),
+                                           period_compare.platform_metrics(totals))
+    report += f"\nPlatforms vs {comparison} ({describe_window(*baseline_window(period_start, period_end, comparison))}):"
+    for platform, row in versus.iterrows():
+        report += (f"\n  {platform:12} | Revenue ${row['revenue']:,.0f} ({format_change(row['revenue_change'])})"
+                   f" | ROAS {row['ROAS']:.2f} ({format_change(row['ROAS_change'])})"
+                   f" | CAC ${row['CAC']:.2f} ({format_change(row['CAC_change'])})")
+
 report += f"""
 
 KEY INSIGHTS:
 ------------
-1. Best ROAS Platform: {roas_by_platform.index[0]} ({roas_by_platform.iloc[0]:.2f})
+1. Best ROAS Platform: {roas_by_platform.index[0]} ({roas_by_platform.iloc[0]:.2f}, 95% CI {intervals.loc[('platform', roas_by_platform.index[0]), 'ROAS_low']:.2f}-{intervals.loc[('platform', roas_by_platform.index[0]), 'ROAS_high']:.2f})
 2. Lowest CAC Platform: {cac_by_platform.index[0]} (${cac_by_platform.iloc[0]:.2f})
 3. Best Campaign Type: {roas_by_campaign.index[0]} (ROAS: {roas_by_campaign.iloc[0]:.2f})
 
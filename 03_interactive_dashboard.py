@@ -17,6 +17,37 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 import numpy as np
+import threading
+import time
+from concurrent.futures import wait
+from pathlib import Path
+
+from figure_cache import FigureCache
+from time_index import CampaignTimeIndex, rollup
+import what_if
+from budget_optimizer import SEGMENT, fit_elasticities, recommend
+from bootstrap_ci import bootstrap_intervals, format_interval
+import approximate
+import cross_filter
+import export
+import live_feed
+from cross_filter import SegmentBitsets
+from drill_down import CampaignPages
+from leaderboard import LEADER_COLUMNS, leaderboard
+from pacing import ACTIVE, PACED_MEASURES, daily_pacing, to_monthly
+from period_compare import (COMPARISONS, KPIS, baseline_window, compare, compare_frames,
+                            describe_window, format_change, kpis, platform_metrics)
+from forecasting import forecast_monthly
+from snapshot import snapshot_path
+from tenants import DEFAULT_TENANT, TenantRegistry
+from rerun_profiler import RerunProfiler
+
+try:
+    from duckdb_backend import DuckDBCampaigns
+except ImportError:          # DuckDB is optional: pip install duckdb
+    DuckDBCampaigns = None
+
+RERUN_STARTED = time.perf_counter()
 
 # ============================================================================
 # PAGE CONFIGURATION
@@ -70,22 +101,170 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# ============================================================================
+# RERUN PROFILER (opt-in from the sidebar, see rerun_profiler.py)
+# ============================================================================
+@st.cache_resource
+def server_startup():
+    """When this server process first ran the script, its first render and warm-up"""
+    return {'started': RERUN_STARTED, 'first_render': None, 'prewarm': None}
+
+server = server_startup()
+
+profiler = RerunProfiler.for_session(st.session_state,
+                                     enabled=st.session_state.get("profile_reruns", False))
+profiler.begin("full rerun")
+rollup = profiler.wrap(rollup, lambda totals, by, **_: f"rollup by {by}")
+recommend = profiler.wrap(recommend, lambda segments, *_, **__: "budget optimizer")
+
 # ============================================================================
 # LOAD DATA
 # ============================================================================
-@st.cache_data
+# Each brand (tenant) has its own cleaned data: the default files here, or
+# tenants/<brand>/ (see tenants.py). A tenant loads when a session first
+# picks it; all tenants share one memory budget and the least recently used
+# are unloaded when it runs out.
+#
+# A tenant's full table loads on a background thread. While it loads, the
+# dashboard answers from the stratified sample 01 saves next to it (see
+# approximate.py) and reruns itself with the exact figures as soon as they
+# are ready. Afterwards, rows appended to the cleaned CSV (or new partition
+# files) are merged in without re-reading the history (see
+# campaign_dataset.py). When the cleaning stage left a snapshot (see
+# snapshot.py) the "full load" is one memory-mapped read, so the first rerun
+# waits for it instead of showing estimates.
+CLEANED_FILE = 'influencer_marketing_cleaned.csv'
+SNAPSHOT_WAIT_SECONDS = 5
+MEMORY_BUDGET_MB = 2048        # frames, indexes and cached aggregates of all tenants
+
+@st.cache_resource
+def tenant_registry():
+    """Every tenant's data and caches, shared by all sessions of this server"""
+    return TenantRegistry(CLEANED_FILE, max_bytes=MEMORY_BUDGET_MB * 1024 ** 2)
+
+registry = tenant_registry()
+tenant_names = registry.names()
+tenant = DEFAULT_TENANT
+if len(tenant_names) > 1:
+    tenant = st.sidebar.selectbox("🏢 Brand", options=tenant_names, key="tenant")
+
+def tenant_cache(kind, key, compute, max_entries=None, pinned=False):
+    """compute() cached for the selected tenant, within its share of the memory budget"""
+    return registry.cached(tenant, kind, key, compute, max_entries, pinned)
+
+def exact_loader():
+    """Start (or follow) loading the selected tenant's full data"""
+    return registry.loader(tenant)
+
+def load_dataset():
+    """The tenant's dataset: campaign frame, time index and file manifest"""
+    try:
+        return exact_loader().result()
+    except FileNotFoundError:
+        registry.evict(tenant)
+        st.error("❌ Error: Please run 01_data_cleaning_tutorial.py first!")
+        st.stop()
+
 def load_data():
-    """Load and cache the cleaned data"""
+    """The cleaned campaigns as of the last refresh (shared, never modified in place)"""
+    return load_dataset().frame
+
+def load_time_index():
+    """The date-range prefix-sum index, extended in place by each refresh"""
+    return load_dataset().index
+
+def load_sample():
+    """Stratified sample for the first answers, or None if 01 did not save one"""
+    folder = registry.tenant(tenant).folder
+    return tenant_cache('sample', None,
+                        lambda: approximate.read_sample(folder / approximate.SAMPLE_FILE))
+
+def load_sample_index():
+    """Time index over the weighted sample: same queries, estimated totals"""
+    return tenant_cache('sample index', None, lambda: CampaignTimeIndex.from_frame(load_sample()))
+
+def load_duckdb():
+    """DuckDB engine over a Parquet copy of the tenant's cleaned data, shared by all sessions"""
     try:
-        df = pd.read_csv('influencer_marketing_cleaned.csv')
-        df['start_date'] = pd.to_datetime(df['start_date'])
-        df['end_date'] = pd.to_datetime(df['end_date'])
-        return df
+        return tenant_cache('duckdb', None, lambda: DuckDBCampaigns(registry.tenant(tenant).path))
     except FileNotFoundError:
         st.error("❌ Error: Please run 01_data_cleaning_tutorial.py first!")
         st.stop()
 
-df = load_data()
+def load_campaign_pages(version):
+    """Sort orders for the campaign table, rebuilt when a refresh bumps the dataset version"""
+    return tenant_cache('campaign pages', version, lambda: CampaignPages(load_data()), max_entries=1)
+
+def live_feed_file():
+    """The tenant's live update feed (it may not exist)"""
+    return registry.tenant(tenant).folder / live_feed.FEED_FILE
+
+def load_live_feed():
+    """Follow the live update feed (if one appears) into the tenant's dataset
+
+    Pinned: it has already applied the feed to the dataset, so it must live
+    exactly as long as the dataset's frame and index (a new one would apply
+    the whole feed again).
+    """
+    return tenant_cache('live feed', None,
+                        lambda: live_feed.LiveCampaigns(live_feed_file(), dataset=load_dataset()),
+                        pinned=True)
+
+def load_elasticities(by, source_name="pandas"):
+    """Revenue-vs-spend elasticity per segment, fitted once from all campaigns"""
+    def fit():
+        if source_name == "duckdb":
+            return fit_elasticities(load_duckdb().campaigns(columns=list(SEGMENT) + ['campaign_cost', 'revenue']),
+                                    by=by)
+        return fit_elasticities(load_sample() if source_name == "sample" else load_data(), by=by)
+    return tenant_cache('elasticities', (by, source_name), fit)
+
+# Query engine: pandas keeps every campaign in memory behind a prefix-sum
+# index; DuckDB leaves the data on disk and runs each query as a scan.
+ENGINES = {"pandas (in memory)": "pandas", "DuckDB (columnar scan)": "duckdb"}
+engine = "pandas"
+if DuckDBCampaigns is not None:
+    engine = ENGINES[st.sidebar.selectbox("⚙️ Query engine", options=list(ENGINES), key="query_engine")]
+
+# `source` answers cell_totals / monthly queries: the time index, the
+# weighted sample index or DuckDB. `df` holds campaign rows (None for DuckDB).
+with profiler.step("load data") as step:
+    if engine == "pandas" and snapshot_path(registry.tenant(tenant).path).exists():
+        wait([exact_loader()], timeout=SNAPSHOT_WAIT_SECONDS)
+    estimated = engine == "pandas" and not exact_loader().done() and load_sample() is not None
+    if engine == "duckdb":
+        df = None
+        source = load_duckdb()
+        source_name = "duckdb"
+    elif estimated:
+        df = load_sample()
+        source = load_sample_index()
+        source_name = "sample"
+    else:
+        df = load_data()
+        source = load_time_index()
+        source_name = "pandas"
+    step['rows'] = source.total_campaigns
+
+# Live updates replace their campaigns' rows in the dataset (frame and time
+# index), so KPIs, charts, the campaign table and exports all include them.
+live = load_live_feed() if source_name == "pandas" and live_feed_file().exists() else None
+if live is not None:
+    df = load_data()         # the first poll may have just applied the feed
+
+def data_version():
+    """What this rerun shows: (tenant, dataset refreshes, live feed batches)"""
+    if source_name != "pandas":
+        return None
+    return (tenant, load_dataset().version, live.version if live is not None else None)
+
+if data_version() != st.session_state.get('data_version'):
+    change = load_dataset().last_change if source_name == "pandas" else None
+    seen = st.session_state.get('data_version')
+    if seen is not None and seen[0] == tenant and change is not None:
+        st.toast(f"🔄 {change['rows']:,} new campaigns loaded" if not change['full_reload']
+                 else "🔄 Data files changed: reloaded")
+    st.session_state['data_version'] = data_version()
 
 # ============================================================================
 # HEADER
@@ -95,422 +274,966 @@ st.markdown('<p class="main-header">📊 Influencer Marketing ROI Dashboard</p>'
 
 st.markdown("---")
 
+if estimated:
+    st.session_state['showed_estimates'] = True
+    st.info(f"⚡ **Estimated figures** from a stratified sample of {len(df):,} campaigns "
+            f"(≈ marks estimates, ± is the 95% margin). Exact figures replace them "
+            f"automatically when loading finishes.")
+elif st.session_state.pop('showed_estimates', False):
+    st.toast("✅ Exact figures loaded")
+
 # ============================================================================
 # SIDEBAR FILTERS
 # ============================================================================
 st.sidebar.header("🔍 Filters")
 
 # Date range filter
+first_date = pd.Timestamp(source.first_day, unit='D').date()
+last_date = pd.Timestamp(source.last_day, unit='D').date()
 date_range = st.sidebar.date_input(
     "Select Date Range",
-    value=(df['start_date'].min(), df['start_date'].max()),
-    min_value=df['start_date'].min().date(),
-    max_value=df['start_date'].max().date()
+    value=(first_date, last_date),
+    min_value=first_date,
+    max_value=last_date
 )
 
 # Platform filter
 platforms = st.sidebar.multiselect(
     "Select Platforms",
-    options=df['platform'].unique(),
-    default=df['platform'].unique()
+    options=sorted(source.cells['platform'].unique()),
+    default=sorted(source.cells['platform'].unique())
 )
 
 # Campaign type filter
 campaign_types = st.sidebar.multiselect(
     "Select Campaign Types",
-    options=df['campaign_type'].unique(),
-    default=df['campaign_type'].unique()
+    options=sorted(source.cells['campaign_type'].unique()),
+    default=sorted(source.cells['campaign_type'].unique())
 )
 
 # Influencer category filter
 categories = st.sidebar.multiselect(
     "Select Influencer Categories",
-    options=df['influencer_category'].unique(),
-    default=df['influencer_category'].unique()
+    options=sorted(source.cells['influencer_category'].unique()),
+    default=sorted(source.cells['influencer_category'].unique())
 )
 
+# Next-quarter projection on the trend charts (see forecasting.py)
+show_forecast = st.sidebar.toggle("📈 Forecast next quarter", key="show_forecast",
+                                  help="Seasonal trend fit per platform, with 95% prediction intervals")
+
+# Period-over-period deltas on the KPI row (see period_compare.py)
+comparison = st.sidebar.selectbox("📅 Compare with", options=[None] + COMPARISONS, key="comparison",
+                                  format_func=lambda option: "No comparison" if option is None
+                                  else option.capitalize())
+
+# What-if assumptions: revenue and cost are linear in AOV and CPM, so the
+# aggregates are rescaled directly instead of re-running the cleaning step.
+with st.sidebar.expander("🧪 What-if Assumptions"):
+    aov = st.number_input(
+        "Average order value ($)",
+        min_value=1.0,
+        value=float(what_if.BASELINE_AOV),
+        step=5.0
+    )
+    cpm = {
+        platform: st.number_input(
+            f"{platform} CPM ($ per 1,000 reach)",
+            min_value=0.5,
+            value=float(baseline_cpm),
+            step=0.5,
+            key=f"cpm_{platform}"
+        )
+        for platform, baseline_cpm in what_if.BASELINE_CPM.items()
+    }
+assumptions = {'aov': aov, 'cpm': cpm}
+
 # Apply filters
-filtered_df = df[
-    (df['start_date'].dt.date >= date_range[0]) &
-    (df['start_date'].dt.date <= date_range[1]) &
-    (df['platform'].isin(platforms)) &
-    (df['campaign_type'].isin(campaign_types)) &
-    (df['influencer_category'].isin(categories))
-]
+# KPIs and grouped charts come from the prefix-sum index: two lookups per
+# platform × campaign type × category cell instead of a scan over all rows.
+filters = {
+    'platform': platforms,
+    'campaign_type': campaign_types,
+    'influencer_category': categories
+}
+
+def index_query(kind, date_range, filters):
+    """source.cell_totals / source.monthly; the untouched default view comes from the snapshot"""
+    defaults = load_dataset().defaults if source_name == "pandas" else None
+    if (defaults is not None and (live is None or live.updates == 0)
+            and tuple(date_range) == (first_date, last_date)
+            and all(set(allowed) >= set(source.cells[column]) for column, allowed in filters.items())):
+        return defaults[kind]
+    return getattr(source, kind)(date_range[0], date_range[1], **filters)
+
+with profiler.step("filter: cell totals") as step:
+    totals = what_if.apply_assumptions(index_query('cell_totals', date_range, filters), **assumptions)
+    step['rows'] = len(totals)
+
+def campaign_mask(df, date_range, filters):
+    """Boolean mask of the campaign rows behind the sidebar filters"""
+    mask = ((df['start_date'] >= pd.Timestamp(date_range[0])) &
+            (df['start_date'] < pd.Timestamp(date_range[1]) + pd.Timedelta(days=1)))
+    for column, allowed in filters.items():
+        mask &= df[column].isin(allowed)
+    return mask.to_numpy()
+
+def filter_campaigns(df, date_range, filters, assumptions, columns=None):
+    """Campaign rows behind the sidebar filters, for the per-campaign charts only"""
+    if df is None:
+        # DuckDB: fetch only the needed columns (plus platform for what-if)
+        needed = None if columns is None else list(dict.fromkeys(columns + ['platform']))
+        rows = source.campaigns(date_range[0], date_range[1], columns=needed, **filters)
+    else:
+        rows = df[campaign_mask(df, date_range, filters)]
+    return what_if.apply_assumptions(rows, **assumptions)
+
+def platform_intervals(date_range, filters, data_version=0, n_resamples=2000):
+    """95% bootstrap intervals per platform for the filtered (baseline) campaigns
+
+    data_version is only part of the cache key: it changes when new data
+    lands inside date_range, so other ranges keep their cached intervals.
+    """
+    def resample():
+        with st.spinner("Resampling campaigns..."):
+            return bootstrap_intervals(filter_campaigns(df, date_range, filters, {},
+                                                        ['ROAS', 'CAC', 'platform', 'campaign_type',
+                                                         'influencer_category']),
+                                       n_resamples=n_resamples, groupings=['platform']).loc['platform']
+    key = (date_range, repr(filters), data_version, n_resamples, source_name)
+    return tenant_cache('bootstrap intervals', key, resample).copy()
+
+def paced_spend(date_range, filters, data_version=0):
+    """Baseline cost, revenue and active campaigns per platform and day of date_range
+
+    Campaigns count on every day they ran, so ones that started before the
+    range but were still running inside it contribute their share too.
+    """
+    def sweep():
+        columns = ['start_date', 'end_date', 'platform', 'campaign_type',
+                   'influencer_category'] + PACED_MEASURES
+        with st.spinner("Pacing campaign spend..."):
+            if df is None:
+                rows = source.campaigns(None, date_range[1], columns=columns, **filters)
+            else:
+                mask = ((df['start_date'] < pd.Timestamp(date_range[1]) + pd.Timedelta(days=1)) &
+                        (df['end_date'] >= pd.Timestamp(date_range[0])))
+                for column, allowed in filters.items():
+                    mask &= df[column].isin(allowed)
+                rows = df.loc[mask.to_numpy(), columns]
+            return daily_pacing(rows, ['platform'], start=date_range[0], end=date_range[1])
+    return tenant_cache('paced spend', (date_range, repr(filters), data_version, source_name), sweep)
+
+def baseline_totals(window, filters):
+    """Cell totals of a comparison window, cached until new data lands inside that window
+
+    The key holds the dataset's range_version() of the window, not its
+    overall version, so moving the current window or appending new days
+    reuses the cached history.
+    """
+    version = ((load_dataset().range_version(*window), live.version if live is not None else None)
+               if source_name == "pandas" else 0)
+    return tenant_cache('period baseline', (window, repr(filters), version, source_name),
+                        lambda: source.cell_totals(window[0], window[1], **filters), max_entries=32)
+
+filter_campaigns = profiler.wrap(filter_campaigns, lambda *_, **__: "filter: campaign rows")
+baseline_totals = profiler.wrap(baseline_totals, lambda *_, **__: "compare: baseline totals")
+platform_intervals = profiler.wrap(platform_intervals, lambda *_, **__: "bootstrap intervals")
+paced_spend = profiler.wrap(paced_spend, lambda *_, **__: "pacing: daily sweep")
+
+# ============================================================================
+# CROSS-FILTERING
+# ============================================================================
+# Clicking a bar or heatmap cell filters the other charts of the section
+# (see cross_filter.py). Grouped charts keep or drop cells of the cube the
+# sidebar already filtered; campaign charts AND one packed bitset per
+# selected value with the sidebar's bitset. Neither repeats the sidebar's
+# work. Selections are kept in session state: a chart whose numbers change
+# is redrawn without its selection highlight, but its filter stays.
+CROSS_FILTER_CHARTS = {
+    'revenue_platform': {'x': 'platform'},
+    'roas_platform': {'x': 'platform'},
+    'roas_campaign_type': {'y': 'campaign_type'},
+    'roas_heatmap': {'x': 'campaign_type', 'y': 'platform'},
+    'cac_platform': {'x': 'platform'},
+    'cac_category': {'y': 'influencer_category'},
+}
+
+def chart_key(name):
+    """Widget key of a selectable chart (a new key drops its selection highlight)"""
+    return f"xf_{name}_{st.session_state.get('cross_filter_generation', {}).get(name, 0)}"
+
+def select_segment(name):
+    """on_select callback: remember the segment selected in a chart"""
+    st.session_state.setdefault('cross_filters', {})[name] = cross_filter.chart_selection(
+        st.session_state.get(chart_key(name)), CROSS_FILTER_CHARTS[name])
+
+def clear_cross_filter(charts):
+    """Forget the selections made in these charts"""
+    generation = st.session_state.setdefault('cross_filter_generation', {})
+    for name in charts:
+        st.session_state.get('cross_filters', {}).pop(name, None)
+        generation[name] = generation.get(name, 0) + 1
+
+def section_cross_filter(charts):
+    """The cross-filter selected in a section's charts (dimension -> values), shown above them"""
+    stored = st.session_state.get('cross_filters', {})
+    selection = cross_filter.combine([stored.get(name, {}) for name in charts])
+    if selection:
+        col1, col2 = st.columns([6, 1])
+        col1.info(f"🔗 Cross-filter: {cross_filter.describe(selection)}")
+        col2.button("✕ Clear", key=f"clear_{charts[0]}", on_click=clear_cross_filter, args=(charts,),
+                    use_container_width=True)
+    else:
+        st.caption("🔗 Click a bar or heatmap cell to filter the section's other charts to it.")
+    return selection
+
+def load_segment_bitsets():
+    """Per-value row bitsets of the campaign rows in `df`, built once per data version"""
+    return tenant_cache('segment bitsets', (source_name, data_version()),
+                        lambda: SegmentBitsets(df), max_entries=1)
+
+def cross_filtered_campaigns(date_range, filters, assumptions, columns, selection):
+    """Campaign rows behind the sidebar filters and the cross-filter, without a row scan per click"""
+    if df is None:
+        narrowed = {column: [v for v in allowed if v in selection.get(column, allowed)]
+                    for column, allowed in filters.items()}
+        return filter_campaigns(df, date_range, narrowed, assumptions, columns)
+    bitsets = load_segment_bitsets()
+    base = tenant_cache('filter bitset', (source_name, data_version(), tuple(date_range), repr(filters)),
+                        lambda: bitsets.base(date_range[0], date_range[1], **filters), max_entries=8)
+    positions = bitsets.positions(bitsets.select(base, selection))
+    return what_if.apply_assumptions(df[columns].take(positions), **assumptions)
+
+cross_filtered_campaigns = profiler.wrap(cross_filtered_campaigns,
+                                         lambda *_, **__: "cross-filter: campaign rows")
+
+def monthly_totals(date_range, filters, assumptions):
+    """Per-cell monthly totals from the time index, under the what-if assumptions"""
+    with profiler.step("filter: monthly totals") as step:
+        monthly = what_if.apply_assumptions(index_query('monthly', date_range, filters), **assumptions)
+        step['rows'] = len(monthly)
+    return monthly
+
+def with_forecast(trend, monthly, y, date_range):
+    """Trend rows plus next-quarter forecast rows (forecast=True, with y_low / y_high)"""
+    if not show_forecast:
+        return trend
+    with profiler.step("forecast: next quarter") as step:
+        forecast = forecast_monthly(monthly, ['platform'], measures=[y], last_day=date_range[1])
+        step['rows'] = len(forecast)
+    return pd.concat([trend.assign(forecast=False),
+                      forecast.rename(columns={'month': 'start_date'}).assign(forecast=True)],
+                     ignore_index=True)
+
+# Sample rows and domain behind the error bars while figures are estimates
+if estimated:
+    sample_rows = what_if.apply_assumptions(df, **assumptions)
+    sample_domain = campaign_mask(df, date_range, filters)
+
+def with_margins(data, by, measure, selection=None):
+    """Attach the 95% sampling margin of each group mean while showing estimates"""
+    if not estimated:
+        return data
+    domain = sample_domain & cross_filter.selection_mask(sample_rows, selection or {}, skip=[by])
+    margins = approximate.group_means(sample_rows, domain, by, measure)
+    return data.merge(margins[[f'{measure}_margin']], left_on=by, right_index=True, how='left')
 
 st.sidebar.markdown("---")
-st.sidebar.info(f"📌 Showing {len(filtered_df):,} of {len(df):,} campaigns")
+approx = "≈" if estimated else ""
+st.sidebar.info(f"📌 Showing {approx}{totals['campaigns'].sum():,.0f} of "
+                f"{approx}{source.total_campaigns:,} campaigns")
+if estimated:
+    @st.fragment(run_every="1s")
+    def swap_in_exact_figures():
+        """Poll the background load and rerun the whole app once it is done"""
+        if exact_loader().done():
+            st.rerun()
+        st.caption("⏳ Loading exact figures in the background...")
+
+    with st.sidebar:
+        swap_in_exact_figures()
+if source_name == "pandas":
+    @st.fragment(run_every="5s")
+    def follow_new_data():
+        """Merge appended data and live updates; rerun when this session has not seen them"""
+        dataset = load_dataset()
+        if dataset.refresh() is not None:
+            registry.account(tenant)     # the data grew (or was replaced): measure it again
+            if dataset.last_change['full_reload']:
+                registry.forget(tenant, 'live feed')   # replay the feed into the rebuilt index
+        if live is not None:
+            live.poll()
+        if data_version() != st.session_state.get('data_version'):
+            st.rerun()
+
+        if dataset.last_change is not None:
+            change = dataset.last_change
+            st.caption(f"🔄 Last refresh: {change['rows']:,} rows in {change['ms']:,.0f} ms")
+        if live is not None:
+            last = f", last at {live.last_update:%H:%M:%S}" if live.last_update is not None else ""
+            st.caption(f"📡 Live feed: {live.updates:,} updates{last}")
+
+    with st.sidebar:
+        follow_new_data()
+if not what_if.is_baseline(**assumptions):
+    st.sidebar.warning(f"🧪 What-if mode: {what_if.describe(**assumptions)}")
+
+# ============================================================================
+# EXPORT THE FILTERED CAMPAIGNS
+# ============================================================================
+# The rows behind the filters are written to disk a chunk at a time on a
+# background thread (see export.py) while the sidebar shows its progress.
+# The finished file is served from Streamlit's static folder, which streams
+# it from disk instead of holding it in server memory.
+EXPORT_FOLDER = Path(__file__).resolve().parent / export.EXPORT_FOLDER
+EXPORT_FORMATS = {"CSV": "csv", "Parquet": "parquet"}
+
+def start_export(fmt, date_range, filters, assumptions):
+    """Write the filtered campaigns to a new export file on a background thread"""
+    export.remove_old_exports(EXPORT_FOLDER)
+    if df is None:
+        chunks = export.query_chunks(source, date_range[0], date_range[1], **filters)
+    else:
+        chunks = export.frame_chunks(df, date_range[0], date_range[1], **filters)
+    chunks = ((what_if.apply_assumptions(rows, **assumptions), done) for rows, done in chunks)
+    # Parquet schema from the whole frame, not from a first chunk the filters may have emptied
+    schema = (export.arrow_schema(what_if.apply_assumptions(df.iloc[:0], **assumptions))
+              if df is not None else None)
+    job = {'path': export.export_path(fmt, EXPORT_FOLDER), 'format': fmt, 'rows': 0, 'done': 0.0,
+           'file_name': f"campaigns_{date_range[0]:%Y%m%d}-{date_range[1]:%Y%m%d}.{fmt}",
+           'started': time.perf_counter(), 'finished': None, 'error': None}
+
+    def write():
+        try:
+            export.export_file(chunks, job['path'], fmt, schema=schema,
+                               progress=lambda rows, done: job.update(rows=rows, done=done))
+        except Exception as error:
+            job['error'] = str(error)
+        job['finished'] = time.perf_counter()
+
+    threading.Thread(target=write, daemon=True, name="dashboard-export").start()
+    return job
+
+export_job = st.session_state.get('export')
+exporting = export_job is not None and export_job['finished'] is None
+
+@st.fragment(run_every="1s" if exporting else None)
+def export_campaigns():
+    """Start an export of the filtered campaigns, follow its progress, link the file"""
+    job = st.session_state.get('export')
+    running = job is not None and job['finished'] is None
+    if running != exporting:
+        st.rerun()                   # start or stop polling
+    label = st.radio("Format", list(EXPORT_FORMATS), horizontal=True, key="export_format")
+    if st.button("📦 Prepare export", disabled=running or estimated, use_container_width=True,
+                 help="Available once the exact figures have loaded" if estimated else None):
+        st.session_state['export'] = start_export(EXPORT_FORMATS[label], date_range, filters, assumptions)
+        st.rerun()
+    if not what_if.is_baseline(**assumptions):
+        st.caption("🧪 Revenue, cost, ROAS and CAC are exported under the what-if assumptions.")
+
+    if job is None:
+        return
+    if running:
+        st.progress(job['done'], text=f"Writing {job['rows']:,} campaigns...")
+    elif job['error'] is not None:
+        st.error(f"❌ Export failed: {job['error']}")
+    elif not job['path'].exists():
+        st.caption("The export has expired: prepare it again.")
+    else:
+        if st.get_option("server.enableStaticServing"):
+            st.markdown(f'<a href="app/static/exports/{job["path"].name}" download="{job["file_name"]}">'
+                        f'⬇️ Download {job["file_name"]}</a>', unsafe_allow_html=True)
+        else:
+            # Without static serving the file is read into memory when clicked
+            st.download_button(f"⬇️ Download {job['file_name']}", data=job['path'].read_bytes,
+                               file_name=job['file_name'], mime=export.FORMATS[job['format']],
+                               use_container_width=True)
+        st.caption(f"{job['rows']:,} campaigns, {job['path'].stat().st_size / 1e6:,.1f} MB, "
+                   f"written in {job['finished'] - job['started']:,.1f} s")
+
+with st.sidebar.expander("📥 Export filtered campaigns", expanded=exporting):
+    export_campaigns()
 
 # ============================================================================
 # KEY METRICS (TOP ROW)
 # ============================================================================
 st.header("📈 Key Performance Indicators")
+if not what_if.is_baseline(**assumptions):
+    st.caption(f"🧪 Scenario figures ({what_if.describe(**assumptions)})")
 
 col1, col2, col3, col4, col5 = st.columns(5)
 
-total_spend = filtered_df['campaign_cost'].sum()
-total_revenue = filtered_df['revenue'].sum()
+total_campaigns = totals['campaigns'].sum()
+total_spend = totals['campaign_cost'].sum()
+total_revenue = totals['revenue'].sum()
 overall_roas = total_revenue / total_spend if total_spend > 0 else 0
-avg_cac = filtered_df['CAC'].mean()
-total_sales = filtered_df['product_sales'].sum()
+avg_cac = totals['CAC'].sum() / total_campaigns if total_campaigns > 0 else float('nan')
+total_sales = int(totals['product_sales'].sum())
+
+# Comparison mode: the baseline window is two index lookups per cell, cached
+if comparison is not None:
+    window = baseline_window(date_range[0], date_range[1], comparison)
+    with profiler.step("compare: kpi deltas"):
+        baseline = what_if.apply_assumptions(baseline_totals(window, filters), **assumptions)
+        kpi_changes = compare(kpis(totals), kpis(baseline))['change']
+
+def kpi_delta(name, **default):
+    """st.metric delta arguments: the change versus the baseline when comparing, else default"""
+    if comparison is None:
+        return default
+    if pd.isna(kpi_changes[name]):
+        return {'delta': None}
+    rise_is_good = KPIS[name][2]
+    return {'delta': format_change(kpi_changes[name]),
+            'delta_color': "off" if rise_is_good is None else "normal" if rise_is_good else "inverse"}
 
 with col1:
     st.metric(
         label="💰 Total Spend",
-        value=f"${total_spend:,.0f}",
-        delta=None
+        value=f"{approx}${total_spend:,.0f}",
+        **kpi_delta('spend', delta=None)
     )
 
 with col2:
     st.metric(
         label="📊 Total Revenue",
-        value=f"${total_revenue:,.0f}",
-        delta=f"{((total_revenue/total_spend - 1) * 100):.1f}% ROI" if total_spend > 0 else "N/A"
+        value=f"{approx}${total_revenue:,.0f}",
+        **kpi_delta('revenue',
+                    delta=f"{((total_revenue/total_spend - 1) * 100):.1f}% ROI" if total_spend > 0 else "N/A")
     )
 
 with col3:
     st.metric(
         label="🎯 Overall ROAS",
-        value=f"{overall_roas:.2f}",
-        delta="Positive" if overall_roas > 1 else "Negative",
-        delta_color="normal" if overall_roas > 1 else "inverse"
+        value=f"{approx}{overall_roas:.2f}",
+        **kpi_delta('ROAS',
+                    delta="Positive" if overall_roas > 1 else "Negative",
+                    delta_color="normal" if overall_roas > 1 else "inverse")
     )
 
 with col4:
     st.metric(
         label="💵 Avg CAC",
-        value=f"${avg_cac:.2f}",
-        delta=None
+        value=f"{approx}${avg_cac:.2f}",
+        **kpi_delta('CAC', delta=None)
     )
 
 with col5:
     st.metric(
         label="🛒 Total Sales",
-        value=f"{total_sales:,}",
-        delta=None
+        value=f"{approx}{total_sales:,}",
+        **kpi_delta('sales', delta=None)
+    )
+
+if comparison is not None:
+    if baseline.empty:
+        st.caption(f"📅 No campaigns to compare with in {describe_window(*window)} ({comparison}).")
+    else:
+        st.caption(f"📅 Changes versus {describe_window(*window)} ({comparison}, "
+                   f"{approx}{baseline['campaigns'].sum():,.0f} campaigns)")
+        versus = compare_frames(platform_metrics(totals), platform_metrics(baseline))
+        versus.columns = ['Spend ($)', 'Spend Δ', 'Revenue ($)', 'Revenue Δ', 'Avg ROAS', 'ROAS Δ',
+                          'Avg CAC ($)', 'CAC Δ', 'Campaigns', 'Campaigns Δ']
+        changes = [column for column in versus.columns if column.endswith('Δ')]
+        with st.expander(f"📅 Platforms versus the {comparison}", expanded=True):
+            st.dataframe(
+                versus.style.format({
+                    'Spend ($)': '${:,.0f}',
+                    'Revenue ($)': '${:,.0f}',
+                    'Avg ROAS': '{:.2f}',
+                    'Avg CAC ($)': '${:.2f}',
+                    'Campaigns': '{:,.0f}',
+                    **{column: format_change for column in changes}
+                }, na_rep='–'),
+                use_container_width=True
+            )
+
+if estimated:
+    margins = approximate.kpi_estimates(sample_rows, sample_domain)
+    st.caption(
+        f"± 95% margins: spend ±${margins['campaign_cost'][1]:,.0f} · "
+        f"revenue ±${margins['revenue'][1]:,.0f} · ROAS ±{margins['ROAS'][1]:.2f} · "
+        f"CAC ±${margins['CAC'][1]:.2f} · sales ±{margins['product_sales'][1]:,.0f}"
     )
 
 st.markdown("---")
 
 # ============================================================================
-# MAIN DASHBOARD - TWO COLUMNS
+# FIGURE CACHE
 # ============================================================================
+# Every chart below is built by a small builder function from its aggregate.
+# The cache stores the finished figure JSON keyed on (builder, aggregate,
+# layout parameters), so unchanged numbers never rebuild a figure.
+@st.cache_resource
+def get_figure_cache():
+    """One size-capped figure cache shared by every dashboard session"""
+    return FigureCache(max_bytes=64 * 1024 * 1024)
+
+figure_cache = get_figure_cache()
+
+TREND_LAYOUT = dict(
+    height=500,
+    font=dict(size=12),
+    showlegend=True,
+    legend=dict(
+        orientation="h",
+        yanchor="bottom",
+        y=1.02,
+        xanchor="right",
+        x=1
+    ),
+    plot_bgcolor='white',
+    xaxis=dict(
+        gridcolor='lightgray'
+    ),
+    hovermode='x unified'
+)
+
+def budget_pie(budget_by_platform):
+    fig = px.pie(
+        budget_by_platform,
+        values='campaign_cost',
+        names='platform',
+        title='Current Budget Distribution',
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+def grouped_bars(data, x, bars, title, xaxis_title, yaxis_title):
+    """Side-by-side bars, one trace per (column, label, color) in bars"""
+    fig = go.Figure(data=[
+        go.Bar(name=label, x=data[x], y=data[column], marker_color=color)
+        for column, label, color in bars
+    ])
+    fig.update_layout(
+        title=title,
+        barmode='group',
+        xaxis_title=xaxis_title,
+        yaxis_title=yaxis_title
+    )
+    return fig
+
+def trend_lines(data, y, title, yaxis_title, tickformat):
+    forecast = data[data['forecast']] if 'forecast' in data else data.iloc[:0]
+    data = data[~data['forecast']] if 'forecast' in data else data
+    fig = px.line(
+        data,
+        x='start_date',
+        y=y,
+        color='platform',
+        title=title,
+        markers=True
+    )
+    fig.update_layout(
+        xaxis_title='Month',
+        yaxis_title=yaxis_title,
+        yaxis=dict(
+            gridcolor='lightgray',
+            tickformat=tickformat
+        ),
+        **TREND_LAYOUT
+    )
+    fig.update_traces(
+        line=dict(width=3),
+        marker=dict(size=8)
+    )
+
+    # Forecast overlay: dashed line on from the last actual month, shaded interval
+    for trace in list(fig.data):
+        ahead = forecast[forecast['platform'] == trace.name]
+        if ahead.empty:
+            continue
+        line = pd.concat([data[data['platform'] == trace.name].tail(1), ahead])
+        fig.add_trace(go.Scatter(
+            x=list(ahead['start_date']) + list(ahead['start_date'][::-1]),
+            y=list(ahead[f'{y}_high']) + list(ahead[f'{y}_low'][::-1]),
+            fill='toself', fillcolor=trace.line.color, opacity=0.15, line=dict(width=0),
+            legendgroup=trace.name, showlegend=False, hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=line['start_date'], y=line[y], mode='lines+markers',
+            line=dict(color=trace.line.color, width=2, dash='dash'), marker=dict(size=6),
+            name=f'{trace.name} (forecast)', legendgroup=trace.name, showlegend=False
+        ))
+    return fig
+
+def pacing_lines(data, y, title, yaxis_title, tickformat):
+    fig = px.line(
+        data,
+        x='date',
+        y=y,
+        color='platform',
+        title=title,
+        line_shape='hv'
+    )
+    fig.update_layout(
+        xaxis_title='Date',
+        yaxis_title=yaxis_title,
+        yaxis=dict(
+            gridcolor='lightgray',
+            tickformat=tickformat
+        ),
+        **TREND_LAYOUT
+    )
+    return fig
+
+def roas_platform_bars(roas_by_platform):
+    # Create color based on ROAS (green if >1, red if <1)
+    colors = ['#2ECC71' if x > 1 else '#E74C3C' for x in roas_by_platform['ROAS']]
+
+    fig = go.Figure(data=[
+        go.Bar(
+            x=roas_by_platform['platform'],
+            y=roas_by_platform['ROAS'],
+            marker_color=colors,
+            text=roas_by_platform['ROAS'].round(2),
+            textposition='outside',
+            error_y=dict(type='data', array=roas_by_platform['ROAS_margin'])
+            if 'ROAS_margin' in roas_by_platform else None
+        )
+    ])
+    fig.add_hline(y=1, line_dash="dash", line_color="black",
+                  annotation_text="Break-even (ROAS=1)")
+    fig.update_layout(
+        title='Average ROAS by Platform',
+        xaxis_title='Platform',
+        yaxis_title='ROAS (Revenue/Cost)',
+        showlegend=False
+    )
+    return fig
+
+def horizontal_metric_bars(data, metric, label, title, color_scale, break_even=False):
+    fig = px.bar(
+        data,
+        x=metric,
+        y=label,
+        orientation='h',
+        title=title,
+        color=metric,
+        color_continuous_scale=color_scale
+    )
+    if break_even:
+        fig.add_vline(x=1, line_dash="dash", line_color="black")
+    return fig
+
+def roas_heatmap(heatmap_data):
+    fig = px.imshow(
+        heatmap_data,
+        labels=dict(x="Campaign Type", y="Platform", color="ROAS"),
+        x=heatmap_data.columns,
+        y=heatmap_data.index,
+        color_continuous_scale='RdYlGn',
+        aspect="auto",
+        text_auto='.2f'
+    )
+    # Heatmaps cannot be selected: an invisible marker on every cell takes the clicks
+    cells = heatmap_data.stack().rename('ROAS').reset_index()
+    fig.update_traces(hoverinfo='skip', hovertemplate=None)
+    fig.add_trace(go.Scatter(
+        x=cells['campaign_type'], y=cells['platform'], customdata=cells['ROAS'],
+        mode='markers', marker=dict(symbol='square', size=40, opacity=0), showlegend=False,
+        hovertemplate='%{y} × %{x}<br>ROAS %{customdata:.2f}<extra></extra>'
+    ))
+    fig.update_layout(title='ROAS Performance Matrix')
+    return fig
 
-# TAB LAYOUT
-tab1, tab2, tab3, tab4 = st.tabs(["📊 Overview", "💰 ROAS Analysis", "👥 CAC Analysis", "💡 Recommendations"])
+def roas_box(campaigns):
+    fig = px.box(
+        campaigns,
+        x='platform',
+        y='ROAS',
+        color='platform',
+        title='ROAS Distribution (Box Plot)',
+        points='outliers'
+    )
+    fig.add_hline(y=1, line_dash="dash", line_color="red", opacity=0.5)
+    return fig
+
+def cac_platform_bars(cac_by_platform):
+    fig = px.bar(
+        cac_by_platform,
+        x='platform',
+        y='CAC',
+        title='Average Customer Acquisition Cost',
+        color='CAC',
+        color_continuous_scale='RdYlGn_r',
+        text='CAC',
+        error_y='CAC_margin' if 'CAC_margin' in cac_by_platform else None
+    )
+    fig.update_traces(texttemplate='$%{text:.2f}', textposition='outside')
+    fig.update_layout(
+        xaxis_title='Platform',
+        yaxis_title='CAC ($)',
+        showlegend=False
+    )
+    return fig
+
+CAC_SCATTER_COLUMNS = ['CAC', 'ROAS', 'platform', 'revenue', 'campaign_type', 'influencer_category']
+
+def cac_roas_scatter(campaigns):
+    fig = px.scatter(
+        campaigns,
+        x='CAC',
+        y='ROAS',
+        color='platform',
+        size='revenue',
+        hover_data=['campaign_type', 'influencer_category'],
+        title='CAC vs ROAS by Platform (bubble size = revenue)',
+        opacity=0.6
+    )
+    fig.add_hline(y=1, line_dash="dash", line_color="red", opacity=0.3)
+    fig.update_layout(
+        xaxis_title='Customer Acquisition Cost ($)',
+        yaxis_title='Return on Ad Spend (ROAS)'
+    )
+    return fig
+
+def efficiency_bars(platform_performance):
+    fig = px.bar(
+        platform_performance,
+        x='platform',
+        y='efficiency_score',
+        title='Efficiency Score (ROAS/CAC)',
+        color='efficiency_score',
+        color_continuous_scale='Viridis',
+        text='efficiency_score'
+    )
+    fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+    return fig
+
+def show_chart(builder, data, select=None, **params):
+    """Render a cached figure at full container width; clicks on it cross-filter if select names it"""
+    if len(data) == 0:
+        st.caption("No campaigns match the current filters.")
+        return
+    with profiler.step(f"chart: {builder.__name__}", rows=len(data)) as step:
+        figure, hit = figure_cache.lookup(builder, data, **params)
+        step['cache'] = "hit" if hit else "miss"
+        step['bytes'] = len(figure.to_json())
+        if select is None:
+            st.plotly_chart(figure, use_container_width=True)
+        else:
+            st.plotly_chart(figure, use_container_width=True, key=chart_key(select),
+                            on_select=lambda: select_segment(select), selection_mode="points")
 
 # ============================================================================
-# TAB 1: OVERVIEW
+# MAIN DASHBOARD - SECTIONS
 # ============================================================================
-with tab1:
+# Each section is a fragment: only the section picked in the selector below is
+# computed on a rerun, and a widget inside a section reruns just that section.
+
+# ============================================================================
+# SECTION 1: OVERVIEW
+# ============================================================================
+@st.fragment
+@profiler.section
+def render_overview_section(totals, date_range, filters, assumptions):
+    """Budget split, cost vs revenue and the monthly revenue trend"""
+    selection = section_cross_filter(['revenue_platform'])
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("Budget Allocation by Platform")
 
-        budget_by_platform = filtered_df.groupby('platform')['campaign_cost'].sum().reset_index()
+        budget_by_platform = rollup(totals, 'platform', sums=['campaign_cost'])[['campaign_cost']].reset_index()
         budget_by_platform = budget_by_platform.sort_values('campaign_cost', ascending=False)
 
-        fig = px.pie(
-            budget_by_platform,
-            values='campaign_cost',
-            names='platform',
-            title='Current Budget Distribution',
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        fig.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(budget_pie, budget_by_platform)
 
     with col2:
         st.subheader("Revenue by Platform")
 
-        revenue_by_platform = filtered_df.groupby('platform').agg({
-            'campaign_cost': 'sum',
-            'revenue': 'sum'
-        }).reset_index()
-
-        fig = go.Figure(data=[
-            go.Bar(name='Cost', x=revenue_by_platform['platform'],
-                   y=revenue_by_platform['campaign_cost'], marker_color='#FF6B6B'),
-            go.Bar(name='Revenue', x=revenue_by_platform['platform'],
-                   y=revenue_by_platform['revenue'], marker_color='#4ECDC4')
-        ])
-        fig.update_layout(
-            title='Cost vs Revenue Comparison',
-            barmode='group',
-            xaxis_title='Platform',
-            yaxis_title='Amount ($)'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        revenue_by_platform = rollup(
+            totals, 'platform', sums=['campaign_cost', 'revenue']
+        )[['campaign_cost', 'revenue']].reset_index()
+
+        show_chart(grouped_bars, revenue_by_platform,
+                   select='revenue_platform',
+                   x='platform',
+                   bars=(('campaign_cost', 'Cost', '#FF6B6B'), ('revenue', 'Revenue', '#4ECDC4')),
+                   title='Cost vs Revenue Comparison',
+                   xaxis_title='Platform',
+                   yaxis_title='Amount ($)')
 
     # Full width chart - Trend over time
     st.subheader("Revenue Trend Over Time")
 
-    monthly_data = filtered_df.groupby([
-        filtered_df['start_date'].dt.to_period('M'),
-        'platform'
-    ]).agg({
-        'revenue': 'sum',
-        'campaign_cost': 'sum'
-    }).reset_index()
-    monthly_data['start_date'] = monthly_data['start_date'].dt.to_timestamp()
+    monthly = cross_filter.restrict(monthly_totals(date_range, filters, assumptions), selection)
+    monthly_data = rollup(
+        monthly,
+        ['month', 'platform'],
+        sums=['revenue', 'campaign_cost']
+    )[['revenue', 'campaign_cost']].reset_index().rename(columns={'month': 'start_date'})
+    monthly_data = with_forecast(monthly_data, monthly, 'revenue', date_range)
+
+    show_chart(trend_lines, monthly_data,
+               y='revenue',
+               title='Revenue Trend by Platform (Monthly Aggregated)',
+               yaxis_title='Revenue ($)',
+               tickformat='$,.0f')
+
+    # Pacing: each campaign's cost spread over the days it actually ran
+    st.subheader("Spend Pacing & Active Campaigns")
+
+    if estimated:
+        st.caption("⏳ Pacing is available once the exact figures have loaded.")
+        return
+
+    granularity = st.radio("Pacing granularity", ["Daily", "Monthly"], horizontal=True,
+                           label_visibility="collapsed", key="pacing_granularity")
+    paced = what_if.apply_assumptions(
+        paced_spend(tuple(date_range), filters,
+                    load_dataset().version if source_name == "pandas" else 0), **assumptions)
+    paced = cross_filter.restrict(paced, cross_filter.without(selection, ['campaign_type',
+                                                                          'influencer_category']))
+    if granularity == "Monthly":
+        paced = to_monthly(paced).rename(columns={'month': 'date', 'avg_active_campaigns': ACTIVE})
 
-    fig = px.line(
-        monthly_data,
-        x='start_date',
-        y='revenue',
-        color='platform',
-        title='Revenue Trend by Platform (Monthly Aggregated)',
-        markers=True
-    )
-    fig.update_layout(
-        xaxis_title='Month',
-        yaxis_title='Revenue ($)',
-        hovermode='x unified',
-        height=500,
-        font=dict(size=12),
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        ),
-        plot_bgcolor='white',
-        yaxis=dict(
-            gridcolor='lightgray',
-            tickformat='$,.0f'
-        ),
-        xaxis=dict(
-            gridcolor='lightgray'
-        )
-    )
-    fig.update_traces(
-        line=dict(width=3),
-        marker=dict(size=8)
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    col1, col2 = st.columns(2)
+
+    with col1:
+        show_chart(pacing_lines, paced[['date', 'platform', 'campaign_cost']],
+                   y='campaign_cost',
+                   title=f'{granularity} Spend by Platform (Paced)',
+                   yaxis_title='Spend ($)',
+                   tickformat='$,.0f')
+
+    with col2:
+        show_chart(pacing_lines, paced[['date', 'platform', ACTIVE]],
+                   y=ACTIVE,
+                   title='Campaigns Running per Day' + (' (Monthly Average)' if granularity == "Monthly" else ''),
+                   yaxis_title='Active Campaigns',
+                   tickformat=',.0f')
 
 # ============================================================================
-# TAB 2: ROAS ANALYSIS
+# SECTION 2: ROAS ANALYSIS
 # ============================================================================
-with tab2:
+@st.fragment
+@profiler.section
+def render_roas_section(totals, date_range, filters, assumptions):
+    """ROAS by platform and campaign type, heatmap and distribution"""
     st.header("🎯 Return on Ad Spend (ROAS) Analysis")
+    selection = section_cross_filter(['roas_platform', 'roas_campaign_type', 'roas_heatmap'])
 
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("ROAS by Platform")
 
-        roas_by_platform = filtered_df.groupby('platform')['ROAS'].mean().reset_index()
-        roas_by_platform = roas_by_platform.sort_values('ROAS', ascending=False)
+        roas_by_platform = rollup(cross_filter.restrict(totals, selection, skip=['platform']),
+                                  'platform', means=['ROAS'])[['ROAS']].reset_index()
+        roas_by_platform = with_margins(roas_by_platform.sort_values('ROAS', ascending=False),
+                                        'platform', 'ROAS', selection)
 
-        # Create color based on ROAS (green if >1, red if <1)
-        colors = ['#2ECC71' if x > 1 else '#E74C3C' for x in roas_by_platform['ROAS']]
-
-        fig = go.Figure(data=[
-            go.Bar(
-                x=roas_by_platform['platform'],
-                y=roas_by_platform['ROAS'],
-                marker_color=colors,
-                text=roas_by_platform['ROAS'].round(2),
-                textposition='outside'
-            )
-        ])
-        fig.add_hline(y=1, line_dash="dash", line_color="black",
-                      annotation_text="Break-even (ROAS=1)")
-        fig.update_layout(
-            title='Average ROAS by Platform',
-            xaxis_title='Platform',
-            yaxis_title='ROAS (Revenue/Cost)',
-            showlegend=False
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(roas_platform_bars, roas_by_platform, select='roas_platform')
 
     with col2:
         st.subheader("ROAS by Campaign Type")
 
-        roas_by_campaign = filtered_df.groupby('campaign_type')['ROAS'].mean().reset_index()
+        roas_by_campaign = rollup(cross_filter.restrict(totals, selection, skip=['campaign_type']),
+                                  'campaign_type', means=['ROAS'])[['ROAS']].reset_index()
         roas_by_campaign = roas_by_campaign.sort_values('ROAS', ascending=True)
 
-        fig = px.bar(
-            roas_by_campaign,
-            x='ROAS',
-            y='campaign_type',
-            orientation='h',
-            title='Average ROAS by Campaign Type',
-            color='ROAS',
-            color_continuous_scale='RdYlGn'
-        )
-        fig.add_vline(x=1, line_dash="dash", line_color="black")
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(horizontal_metric_bars, roas_by_campaign,
+                   select='roas_campaign_type',
+                   metric='ROAS',
+                   label='campaign_type',
+                   title='Average ROAS by Campaign Type',
+                   color_scale='RdYlGn',
+                   break_even=True)
 
     # ROAS Heatmap
     st.subheader("ROAS Heatmap: Platform × Campaign Type")
 
-    heatmap_data = filtered_df.pivot_table(
-        values='ROAS',
-        index='platform',
-        columns='campaign_type',
-        aggfunc='mean'
-    )
+    heatmap_data = rollup(
+        cross_filter.restrict(totals, selection, skip=['platform', 'campaign_type']),
+        ['platform', 'campaign_type'], means=['ROAS']
+    )['ROAS'].unstack('campaign_type')
 
-    fig = px.imshow(
-        heatmap_data,
-        labels=dict(x="Campaign Type", y="Platform", color="ROAS"),
-        x=heatmap_data.columns,
-        y=heatmap_data.index,
-        color_continuous_scale='RdYlGn',
-        aspect="auto",
-        text_auto='.2f'
-    )
-    fig.update_layout(title='ROAS Performance Matrix')
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(roas_heatmap, heatmap_data, select='roas_heatmap')
 
     # ROAS Distribution
     st.subheader("ROAS Distribution by Platform")
 
-    fig = px.box(
-        filtered_df,
-        x='platform',
-        y='ROAS',
-        color='platform',
-        title='ROAS Distribution (Box Plot)',
-        points='outliers'
-    )
-    fig.add_hline(y=1, line_dash="dash", line_color="red", opacity=0.5)
-    st.plotly_chart(fig, use_container_width=True)
+    filtered_df = cross_filtered_campaigns(date_range, filters, assumptions, ['platform', 'ROAS'], selection)
+    show_chart(roas_box, filtered_df[['platform', 'ROAS']])
 
 # ============================================================================
-# TAB 3: CAC ANALYSIS
+# SECTION 3: CAC ANALYSIS
 # ============================================================================
-with tab3:
+@st.fragment
+@profiler.section
+def render_cac_section(totals, date_range, filters, assumptions):
+    """CAC by platform and category, CAC vs ROAS and the CAC trend"""
     st.header("💵 Customer Acquisition Cost (CAC) Analysis")
+    selection = section_cross_filter(['cac_platform', 'cac_category'])
 
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("CAC by Platform")
 
-        cac_by_platform = filtered_df.groupby('platform')['CAC'].mean().reset_index()
-        cac_by_platform = cac_by_platform.sort_values('CAC')
-
-        fig = px.bar(
-            cac_by_platform,
-            x='platform',
-            y='CAC',
-            title='Average Customer Acquisition Cost',
-            color='CAC',
-            color_continuous_scale='RdYlGn_r',
-            text='CAC'
-        )
-        fig.update_traces(texttemplate='$%{text:.2f}', textposition='outside')
-        fig.update_layout(
-            xaxis_title='Platform',
-            yaxis_title='CAC ($)',
-            showlegend=False
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        cac_by_platform = rollup(cross_filter.restrict(totals, selection, skip=['platform']),
+                                 'platform', means=['CAC'])[['CAC']].reset_index()
+        cac_by_platform = with_margins(cac_by_platform.sort_values('CAC'), 'platform', 'CAC', selection)
+
+        show_chart(cac_platform_bars, cac_by_platform, select='cac_platform')
 
     with col2:
         st.subheader("CAC by Influencer Category")
 
-        cac_by_category = filtered_df.groupby('influencer_category')['CAC'].mean().reset_index()
+        cac_by_category = rollup(cross_filter.restrict(totals, selection, skip=['influencer_category']),
+                                 'influencer_category', means=['CAC'])[['CAC']].reset_index()
         cac_by_category = cac_by_category.sort_values('CAC', ascending=True)
 
-        fig = px.bar(
-            cac_by_category,
-            x='CAC',
-            y='influencer_category',
-            orientation='h',
-            title='Average CAC by Category',
-            color='CAC',
-            color_continuous_scale='Reds'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(horizontal_metric_bars, cac_by_category,
+                   select='cac_category',
+                   metric='CAC',
+                   label='influencer_category',
+                   title='Average CAC by Category',
+                   color_scale='Reds')
 
     # CAC vs ROAS Scatter
     st.subheader("CAC vs ROAS Performance Matrix")
 
-    fig = px.scatter(
-        filtered_df,
-        x='CAC',
-        y='ROAS',
-        color='platform',
-        size='revenue',
-        hover_data=['campaign_type', 'influencer_category'],
-        title='CAC vs ROAS by Platform (bubble size = revenue)',
-        opacity=0.6
-    )
-    fig.add_hline(y=1, line_dash="dash", line_color="red", opacity=0.3)
-    fig.update_layout(
-        xaxis_title='Customer Acquisition Cost ($)',
-        yaxis_title='Return on Ad Spend (ROAS)'
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    filtered_df = cross_filtered_campaigns(date_range, filters, assumptions, CAC_SCATTER_COLUMNS, selection)
+    show_chart(cac_roas_scatter, filtered_df[CAC_SCATTER_COLUMNS])
 
     # CAC Trend
     st.subheader("CAC Trend Over Time")
 
-    cac_trend = filtered_df.groupby([
-        filtered_df['start_date'].dt.to_period('M'),
-        'platform'
-    ])['CAC'].mean().reset_index()
-    cac_trend['start_date'] = cac_trend['start_date'].dt.to_timestamp()
+    monthly = cross_filter.restrict(monthly_totals(date_range, filters, assumptions), selection)
+    cac_trend = rollup(
+        monthly,
+        ['month', 'platform'],
+        means=['CAC']
+    )[['CAC']].reset_index().rename(columns={'month': 'start_date'})
+    cac_trend = with_forecast(cac_trend, monthly, 'CAC', date_range)
 
-    fig = px.line(
-        cac_trend,
-        x='start_date',
-        y='CAC',
-        color='platform',
-        markers=True,
-        title='CAC Trend by Platform (Monthly Average)'
-    )
-    fig.update_layout(
-        xaxis_title='Month',
-        yaxis_title='Average CAC ($)',
-        height=500,
-        font=dict(size=12),
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        ),
-        plot_bgcolor='white',
-        yaxis=dict(
-            gridcolor='lightgray',
-            tickformat='$,.2f'
-        ),
-        xaxis=dict(
-            gridcolor='lightgray'
-        ),
-        hovermode='x unified'
-    )
-    fig.update_traces(
-        line=dict(width=3),
-        marker=dict(size=8)
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(trend_lines, cac_trend,
+               y='CAC',
+               title='CAC Trend by Platform (Monthly Average)',
+               yaxis_title='Average CAC ($)',
+               tickformat='$,.2f')
 
 # ============================================================================
-# TAB 4: RECOMMENDATIONS
+# SECTION 4: RECOMMENDATIONS
 # ============================================================================
-with tab4:
+@st.fragment
+@profiler.section
+def render_recommendations_section(totals, date_range, filters, assumptions):
+    """Efficiency scores, budget reallocation and action items"""
     st.header("💡 Budget Allocation Recommendations")
 
     # Calculate performance metrics
-    platform_performance = filtered_df.groupby('platform').agg({
-        'ROAS': 'mean',
-        'CAC': 'mean',
-        'campaign_cost': 'sum',
-        'revenue': 'sum',
-        'engagement_rate': 'mean',
-        'conversion_rate': 'mean'
-    }).round(2)
+    platform_performance = rollup(
+        totals, 'platform',
+        sums=['campaign_cost', 'revenue'],
+        means=['ROAS', 'CAC', 'engagement_rate', 'conversion_rate']
+    )[['ROAS', 'CAC', 'campaign_cost', 'revenue', 'engagement_rate', 'conversion_rate']].round(2)
 
     platform_performance['efficiency_score'] = (
         platform_performance['ROAS'] / platform_performance['CAC']
@@ -518,51 +1241,106 @@ with tab4:
 
     platform_performance = platform_performance.sort_values('efficiency_score', ascending=False)
 
+    # Budget optimizer: each segment gets a diminishing-returns response curve
+    # and the budget goes where the next dollar earns the most revenue.
+    st.subheader("⚙️ Budget Optimizer")
+
+    opt1, opt2, opt3 = st.columns(3)
+    with opt1:
+        granularity = st.selectbox(
+            "Optimize budget by",
+            options=list(OPTIMIZER_LEVELS),
+            key="optimizer_granularity"
+        )
+    with opt2:
+        budget_pct = st.slider(
+            "Total budget (% of current spend)",
+            min_value=50, max_value=200, value=100, step=5,
+            key="optimizer_budget"
+        )
+    with opt3:
+        limits_pct = st.slider(
+            "Spend limits per segment (% of current)",
+            min_value=0, max_value=300, value=(50, 200), step=10,
+            key="optimizer_limits"
+        )
+
+    by = OPTIMIZER_LEVELS[granularity]
+    segments = rollup(totals, by, sums=['campaign_cost', 'revenue'])
+    current_total = platform_performance['campaign_cost'].sum()
+
+    try:
+        allocation = recommend(
+            segments,
+            load_elasticities(tuple(by), source_name),
+            budget=current_total * budget_pct / 100,
+            min_ratio=limits_pct[0] / 100,
+            max_ratio=limits_pct[1] / 100
+        )
+    except ValueError as error:
+        st.error(f"❌ {error}. Widen the spend limits or change the total budget.")
+        return
+    if allocation.empty:
+        st.info("ℹ️ No campaigns match the filters.")
+        return
+
+    platform_performance['recommended_budget'] = (
+        allocation.groupby(level='platform')['recommended_spend'].sum()
+    ).fillna(0)
+
+    current_revenue = allocation['revenue'].sum()
+    expected_revenue = allocation['expected_revenue'].sum()
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Segments optimized", f"{len(allocation):,}")
+    m2.metric("Recommended budget", f"${allocation['recommended_spend'].sum():,.0f}")
+    m3.metric("Expected revenue", f"${expected_revenue:,.0f}",
+              delta=f"{(expected_revenue / current_revenue - 1) * 100:+.1f}% vs current")
+
     # Current vs Recommended Allocation
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("Platform Efficiency Scores")
 
-        fig = px.bar(
-            platform_performance.reset_index(),
-            x='platform',
-            y='efficiency_score',
-            title='Efficiency Score (ROAS/CAC)',
-            color='efficiency_score',
-            color_continuous_scale='Viridis',
-            text='efficiency_score'
-        )
-        fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(efficiency_bars, platform_performance.reset_index())
 
     with col2:
         st.subheader("Budget Reallocation Suggestion")
 
-        # Calculate recommended allocation
-        current_total = platform_performance['campaign_cost'].sum()
-        weights = platform_performance['efficiency_score'] / platform_performance['efficiency_score'].sum()
-        platform_performance['recommended_budget'] = weights * current_total
-
         allocation_comparison = pd.DataFrame({
             'Platform': platform_performance.index,
             'Current': platform_performance['campaign_cost'],
             'Recommended': platform_performance['recommended_budget']
         })
 
-        fig = go.Figure(data=[
-            go.Bar(name='Current', x=allocation_comparison['Platform'],
-                   y=allocation_comparison['Current'], marker_color='#FF6B6B'),
-            go.Bar(name='Recommended', x=allocation_comparison['Platform'],
-                   y=allocation_comparison['Recommended'], marker_color='#4ECDC4')
-        ])
-        fig.update_layout(
-            title='Current vs Recommended Budget',
-            barmode='group',
-            xaxis_title='Platform',
-            yaxis_title='Budget ($)'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(grouped_bars, allocation_comparison,
+                   x='Platform',
+                   bars=(('Current', 'Current', '#FF6B6B'), ('Recommended', 'Recommended', '#4ECDC4')),
+                   title='Current vs Recommended Budget',
+                   xaxis_title='Platform',
+                   yaxis_title='Budget ($)')
+
+    if len(by) > 1:
+        st.subheader("🔀 Largest Segment Moves")
+
+        moves = allocation.assign(change=allocation['recommended_spend'] - allocation['campaign_cost'])
+        moves = moves.loc[moves['change'].abs().nlargest(10).index].reset_index()
+        moves = moves[by + ['campaign_cost', 'recommended_spend', 'change', 'elasticity', 'marginal_roas']]
+        moves.columns = ['Platform', 'Category', 'Campaign Type', 'Current ($)',
+                         'Recommended ($)', 'Change ($)', 'Elasticity', 'Marginal ROAS']
+        with profiler.step("table: largest segment moves", rows=len(moves)) as step:
+            step['bytes'] = int(moves.memory_usage(deep=True).sum())
+            st.dataframe(
+                moves.style.format({
+                    'Current ($)': '${:,.0f}',
+                    'Recommended ($)': '${:,.0f}',
+                    'Change ($)': '${:+,.0f}',
+                    'Elasticity': '{:.2f}',
+                    'Marginal ROAS': '{:.2f}'
+                }),
+                use_container_width=True,
+                hide_index=True
+            )
 
     # Insights and Recommendations
     st.subheader("📋 Key Insights & Action Items")
@@ -577,7 +1355,7 @@ with tab4:
     <ul>
         <li><strong>ROAS:</strong> {best_roas:.2f} (${best_roas:.2f} revenue per $1 spent)</li>
         <li><strong>Efficiency Score:</strong> {best_efficiency:.2f}</li>
-        <li><strong>Recommendation:</strong> Increase budget allocation by {((platform_performance.loc[best_platform, 'recommended_budget'] / platform_performance.loc[best_platform, 'campaign_cost'] - 1) * 100):.1f}%</li>
+        <li><strong>Recommendation:</strong> Change budget allocation by {((platform_performance.loc[best_platform, 'recommended_budget'] / platform_performance.loc[best_platform, 'campaign_cost'] - 1) * 100):+.1f}%</li>
     </ul>
     </div>
     """, unsafe_allow_html=True)
@@ -591,19 +1369,62 @@ with tab4:
                           'Engagement Rate (%)', 'Conversion Rate (%)', 'Total Revenue ($)']
 
     # Style the dataframe
-    st.dataframe(
-        display_df.style.background_gradient(subset=['Avg ROAS', 'Efficiency Score'], cmap='Greens')
-                       .background_gradient(subset=['Avg CAC ($)'], cmap='Reds_r')
-                       .format({
-                           'Avg ROAS': '{:.2f}',
-                           'Avg CAC ($)': '${:.2f}',
-                           'Efficiency Score': '{:.2f}',
-                           'Engagement Rate (%)': '{:.2f}%',
-                           'Conversion Rate (%)': '{:.4f}%',
-                           'Total Revenue ($)': '${:,.0f}'
-                       }),
-        use_container_width=True
-    )
+    with profiler.step("table: performance metrics (styled)", rows=len(display_df)) as step:
+        step['bytes'] = int(display_df.memory_usage(deep=True).sum())
+        st.dataframe(
+            display_df.style.background_gradient(subset=['Avg ROAS', 'Efficiency Score'], cmap='Greens')
+                           .background_gradient(subset=['Avg CAC ($)'], cmap='Reds_r')
+                           .format({
+                               'Avg ROAS': '{:.2f}',
+                               'Avg CAC ($)': '${:.2f}',
+                               'Efficiency Score': '{:.2f}',
+                               'Engagement Rate (%)': '{:.2f}%',
+                               'Conversion Rate (%)': '{:.4f}%',
+                               'Total Revenue ($)': '${:,.0f}'
+                           }),
+            use_container_width=True
+        )
+
+    if st.toggle("Show 95% confidence intervals (bootstrap)", key="show_intervals",
+                 disabled=estimated, help="Available once the exact figures have loaded"
+                 if estimated else None):
+        intervals = platform_intervals(tuple(date_range), filters,
+                                       load_dataset().range_version(*date_range)
+                                       if source_name == "pandas" else 0)
+
+        # Intervals are resampled once at baseline; what-if assumptions only
+        # rescale them per platform (ROAS × r/k, CAC × k, efficiency × r/k²)
+        scale = what_if.apply_assumptions(
+            pd.DataFrame({'platform': intervals.index, 'ROAS': 1.0, 'CAC': 1.0}), **assumptions
+        ).set_index('platform')
+        scale['efficiency_score'] = scale['ROAS'] / scale['CAC']
+        for statistic in ['ROAS', 'CAC', 'efficiency_score']:
+            for column in [statistic, f'{statistic}_low', f'{statistic}_high']:
+                intervals[column] = intervals[column] * scale[statistic]
+
+        intervals = intervals.reindex(platform_performance.index).dropna(subset=['ROAS'])
+        st.dataframe(
+            pd.DataFrame({
+                'ROAS': [format_interval(r['ROAS'], r['ROAS_low'], r['ROAS_high'])
+                         for _, r in intervals.iterrows()],
+                'CAC': [format_interval(r['CAC'], r['CAC_low'], r['CAC_high'], money=True)
+                        for _, r in intervals.iterrows()],
+                'Efficiency Score': [format_interval(r['efficiency_score'], r['efficiency_score_low'],
+                                                     r['efficiency_score_high'])
+                                     for _, r in intervals.iterrows()],
+                'Campaigns': intervals['campaigns'].map('{:,.0f}'.format),
+            }, index=intervals.index),
+            use_container_width=True
+        )
+
+        if len(intervals) > 1:
+            leader, runner_up = intervals.iloc[0], intervals.iloc[1]
+            if leader['efficiency_score_low'] > runner_up['efficiency_score_high']:
+                st.success(f"✅ {intervals.index[0]} leads on efficiency beyond the 95% interval "
+                           f"of {intervals.index[1]}")
+            else:
+                st.warning(f"⚠️ {intervals.index[0]} and {intervals.index[1]} have overlapping "
+                           f"efficiency intervals - the top ranking is not clear-cut")
 
     # Action items
     st.subheader("✅ Recommended Actions")
@@ -613,10 +1434,10 @@ with tab4:
 
         if change_pct > 10:
             action = f"📈 **Increase** budget for {platform} by {change_pct:.1f}%"
-            reason = f"High efficiency score ({row['efficiency_score']:.2f}) and strong ROAS ({row['ROAS']:.2f})"
+            reason = f"Strong ROAS ({row['ROAS']:.2f}) that holds up best as spend grows"
         elif change_pct < -10:
             action = f"📉 **Decrease** budget for {platform} by {abs(change_pct):.1f}%"
-            reason = f"Lower efficiency compared to other platforms"
+            reason = "Revenue responds less to extra spend than on other platforms"
         else:
             action = f"➡️ **Maintain** current budget for {platform}"
             reason = "Performance is balanced with current allocation"
@@ -624,6 +1445,266 @@ with tab4:
         st.markdown(f"{i}. {action}")
         st.caption(f"   Reason: {reason}")
 
+OPTIMIZER_LEVELS = {
+    "Platform × Category × Campaign Type": SEGMENT,
+    "Platform": ['platform'],
+}
+
+# ============================================================================
+# SECTION 5: CAMPAIGN DRILL-DOWN
+# ============================================================================
+# Only the visible page is filtered, sorted and sent to the browser: the
+# sort orders are prepared once per data version (see drill_down.py) and
+# DuckDB pushes ORDER BY ... LIMIT/OFFSET into its scan.
+CAMPAIGN_SORTS = {"ROAS": "ROAS", "CAC": "CAC", "Revenue": "revenue", "Campaign Cost": "campaign_cost"}
+PAGE_SIZES = [25, 50, 100]
+
+def turn_page(step):
+    """Button callback: move the campaign table by step pages"""
+    st.session_state['drill_page'] += step
+
+@st.fragment
+@profiler.section
+def render_campaigns_section(totals, date_range, filters, assumptions):
+    """Individual campaigns behind the filters, one sorted page at a time"""
+    st.header("🔎 Campaign Drill-Down")
+
+    if estimated:
+        st.info("⏳ The campaign table is available once the exact figures have loaded.")
+        return
+    pages = load_duckdb() if source_name == "duckdb" else load_campaign_pages(load_dataset().version)
+
+    col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 2, 1])
+    platform = col1.selectbox("Platform", ["All"] + list(filters['platform']), key="drill_platform")
+    category = col2.selectbox("Influencer Category", ["All"] + list(filters['influencer_category']),
+                              key="drill_category")
+    sort_label = col3.selectbox("Sort by", list(CAMPAIGN_SORTS), key="drill_sort")
+    descending = col4.selectbox("Order", ["Highest first", "Lowest first"],
+                                key="drill_order") == "Highest first"
+    page_size = col5.selectbox("Rows", PAGE_SIZES, index=1, key="drill_page_size")
+
+    drill = dict(filters)
+    if platform != "All":
+        drill['platform'] = [platform]
+    if category != "All":
+        drill['influencer_category'] = [category]
+
+    # Any change to what is listed starts again from the first page
+    query = (tuple(date_range), repr(drill), sort_label, descending, page_size)
+    if st.session_state.get('drill_query') != query:
+        st.session_state['drill_query'] = query
+        st.session_state['drill_page'] = 0
+
+    with profiler.step("table: campaign count") as step:
+        total = pages.count(date_range[0], date_range[1], **drill)
+        step['rows'] = total
+    last_page = max(0, (total - 1) // page_size)
+    page = st.session_state['drill_page'] = min(st.session_state['drill_page'], last_page)
+
+    with profiler.step("table: campaign page", rows=page_size) as step:
+        rows = pages.page(date_range[0], date_range[1], CAMPAIGN_SORTS[sort_label], descending,
+                          page, page_size, **drill)
+        rows = what_if.apply_assumptions(rows, **assumptions)
+        step['rows'] = len(rows)
+        step['bytes'] = int(rows.memory_usage(deep=True).sum())
+        rows.columns = ['Campaign', 'Start Date', 'Platform', 'Campaign Type', 'Category',
+                        'Cost ($)', 'Revenue ($)', 'ROAS', 'CAC ($)', 'Sales']
+        st.dataframe(
+            rows.style.format({
+                'Start Date': '{:%Y-%m-%d}',
+                'Cost ($)': '${:,.0f}',
+                'Revenue ($)': '${:,.0f}',
+                'ROAS': '{:.2f}',
+                'CAC ($)': '${:,.2f}',
+                'Sales': '{:,.0f}'
+            }, na_rep='–'),
+            use_container_width=True,
+            hide_index=True
+        )
+
+    nav1, nav2, nav3 = st.columns([1, 1, 6])
+    nav1.button("◀ Previous", on_click=turn_page, args=(-1,), disabled=page == 0, key="drill_previous")
+    nav2.button("Next ▶", on_click=turn_page, args=(1,), disabled=page >= last_page, key="drill_next")
+    shown = f"{page * page_size + 1:,}–{page * page_size + len(rows):,}" if total else "0"
+    nav3.caption(f"Showing {shown} of {total:,} campaigns · page {page + 1:,} of {last_page + 1:,}")
+    if not what_if.is_baseline(**assumptions):
+        nav3.caption("Order follows the recorded figures; the what-if assumptions change the values shown.")
+
+# ============================================================================
+# SECTION 6: CAMPAIGN LEADERBOARD
+# ============================================================================
+# Best and worst campaigns of every segment by partial selection
+# (np.argpartition per segment, see leaderboard.py) instead of sorting all
+# campaigns. Rankings follow the what-if figures shown.
+LEADERBOARD_METRICS = {"ROAS": "ROAS", "CAC": "CAC", "Revenue": "revenue",
+                       "Engagement Rate": "engagement_rate"}
+LEADERBOARD_LEVELS = {
+    "Platform × Category × Campaign Type": SEGMENT,
+    "Platform": ['platform'],
+    "Influencer Category": ['influencer_category'],
+    "Campaign Type": ['campaign_type'],
+    "All Campaigns": [],
+}
+LEADERBOARD_FORMATS = {
+    'start_date': '{:%Y-%m-%d}',
+    'campaign_cost': '${:,.0f}',
+    'revenue': '${:,.0f}',
+    'ROAS': '{:.2f}',
+    'CAC': '${:,.2f}',
+    'engagement_rate': '{:.2f}%'
+}
+
+@st.fragment
+@profiler.section
+def render_leaderboard_section(totals, date_range, filters, assumptions):
+    """Top and bottom campaigns per segment by the chosen metric"""
+    st.header("🏆 Campaign Leaderboard")
+
+    if estimated:
+        st.info("⏳ The leaderboard is available once the exact figures have loaded.")
+        return
+
+    col1, col2, col3 = st.columns([2, 3, 1])
+    metric = LEADERBOARD_METRICS[col1.selectbox("Rank by", list(LEADERBOARD_METRICS),
+                                                key="leader_metric")]
+    by = LEADERBOARD_LEVELS[col2.selectbox("Within", list(LEADERBOARD_LEVELS), key="leader_level")]
+    k = int(col3.number_input("Top", min_value=1, max_value=20, value=5, key="leader_k"))
+
+    campaigns = filter_campaigns(df, date_range, filters, assumptions, LEADER_COLUMNS)
+    shown = by + ['rank'] + [c for c in LEADER_COLUMNS if c not in by]
+    for side, title in [('best', "🥇 Best Campaigns"), ('worst', "🔻 Worst Campaigns")]:
+        st.subheader(title)
+        with profiler.step(f"leaderboard: top {k} ({side})", rows=len(campaigns)) as step:
+            board = leaderboard(campaigns, metric, k, by, side)[shown]
+            step['bytes'] = int(board.memory_usage(deep=True).sum())
+            st.dataframe(board.style.format(LEADERBOARD_FORMATS, na_rep='–'),
+                         use_container_width=True, hide_index=True)
+
+# ============================================================================
+# ACTIVE SECTION
+# ============================================================================
+SECTIONS = {
+    "📊 Overview": render_overview_section,
+    "💰 ROAS Analysis": render_roas_section,
+    "👥 CAC Analysis": render_cac_section,
+    "💡 Recommendations": render_recommendations_section,
+    "🔎 Campaigns": render_campaigns_section,
+    "🏆 Leaderboard": render_leaderboard_section,
+}
+
+active_section = st.radio(
+    "Section",
+    options=list(SECTIONS),
+    horizontal=True,
+    label_visibility="collapsed",
+    key="active_section"
+)
+
+with profiler.step(f"section: {active_section}"):
+    SECTIONS[active_section](totals, date_range, filters, assumptions)
+
+# ============================================================================
+# STARTUP PRE-WARM
+# ============================================================================
+# Streamlit runs no app code until the first session connects, so the warm-up
+# starts right after a tenant's first exact render (again if it was unloaded
+# since): a background thread fills the shared caches for the unfiltered
+# default view with what made each section's first visit slow (elasticity
+# fits, per-campaign charts).
+def warm_default_state(status):
+    """Fill the shared caches for the default view (no Streamlit calls: runs on a thread)"""
+    campaigns = load_dataset().frame
+    steps = [(f"elasticities by {', '.join(by)}", lambda by=by: load_elasticities(tuple(by), "pandas"))
+             for by in OPTIMIZER_LEVELS.values()]
+    steps += [
+        ("chart: roas_box", lambda: figure_cache.lookup(roas_box, campaigns[['platform', 'ROAS']])),
+        ("chart: cac_roas_scatter",
+         lambda: figure_cache.lookup(cac_roas_scatter, campaigns[CAC_SCATTER_COLUMNS])),
+    ]
+    for name, warm in steps:
+        started, evictions = time.perf_counter(), figure_cache.evictions
+        try:
+            warm()
+        except Exception as error:          # a failed warm-up only means a cold first visit
+            status['stopped'] = f"{name}: {error}"
+            break
+        status['steps'].append((name, (time.perf_counter() - started) * 1000))
+        if figure_cache.evictions > evictions:
+            # Warming more would only push out charts analysts are looking at
+            status['stopped'] = "figure cache full"
+            break
+    status['finished'] = time.perf_counter()
+
+def prewarm():
+    """Start the default-view warm-up once per tenant load"""
+    def start():
+        status = {'started': time.perf_counter(), 'finished': None, 'stopped': None, 'steps': []}
+        threading.Thread(target=warm_default_state, args=(status,), daemon=True,
+                         name=f"dashboard-prewarm-{tenant}").start()
+        return status
+    return tenant_cache('prewarm', None, start)
+
+if source_name == "pandas":
+    server['prewarm'] = prewarm()
+
+# Full-script rerun time; section-only (fragment) reruns do not reach this line.
+# Time to first render: from the first script run of the server (or of this
+# session) to the end of its first full rerun, and where the data came from.
+rerun_ms = (time.perf_counter() - RERUN_STARTED) * 1000
+loaded_from = load_dataset().loaded_from if source_name == "pandas" else source_name
+if server['first_render'] is None:
+    server['first_render'] = {'ms': (time.perf_counter() - server['started']) * 1000,
+                              'from': loaded_from}
+st.session_state.setdefault('first_render', {'ms': rerun_ms, 'from': loaded_from})
+st.sidebar.caption(f"⏱️ Last full rerun: {rerun_ms:,.0f} ms ({source_name})")
+cache_stats = figure_cache.stats()
+st.sidebar.caption(
+    f"🗂️ Figure cache: {cache_stats['entries']} charts, "
+    f"{cache_stats['bytes_used'] / 1e6:.1f} MB, {cache_stats['hit_rate']:.0%} hit rate"
+)
+tenant_stats = registry.stats()
+st.sidebar.caption(
+    f"🏢 Tenant memory: {registry.bytes_used / 1e6:,.0f} of {registry.max_bytes / 1e6:,.0f} MB, "
+    f"{(tenant_stats['state'] != 'not loaded').sum()} of {len(tenant_stats)} tenants resident, "
+    f"{registry.evictions} evictions"
+)
+if len(tenant_stats) > 1:
+    with st.sidebar.expander("🏢 Tenants"):
+        st.dataframe(tenant_stats.drop(columns='last_used').style.format(
+                         {'campaigns': '{:,}', 'data_mb': '{:,.1f}', 'cache_mb': '{:,.1f}',
+                          'hit_rate': '{:.0%}'}),
+                     use_container_width=True, hide_index=True)
+
+# Debug panel: where the last rerun spent its time, plus recent reruns
+profiler.finish()
+st.sidebar.toggle("🐞 Profile reruns", key="profile_reruns",
+                  help="Time every section, aggregation, chart and table")
+if profiler.enabled:
+    with st.sidebar.expander("🐞 Rerun profile", expanded=True):
+        if profiler.history:
+            last = profiler.history[-1]
+            st.caption(f"Last {last['kind']}: {last['total_ms']:,.0f} ms in {len(last['steps'])} steps")
+        st.dataframe(profiler.last_run(), use_container_width=True, hide_index=True)
+        first = st.session_state['first_render']
+        st.caption(f"🚀 First render: {first['ms']:,.0f} ms this session ({first['from']}), "
+                   f"{server['first_render']['ms']:,.0f} ms for the server's first visitor "
+                   f"({server['first_render']['from']})")
+        if server['prewarm'] is not None:
+            warm = server['prewarm']
+            state = (f"done in {(warm['finished'] - warm['started']) * 1000:,.0f} ms"
+                     if warm['finished'] else f"running, {len(warm['steps'])} steps done")
+            if warm['stopped']:
+                state += f" (stopped early: {warm['stopped']})"
+            st.caption(f"🔥 Pre-warm: {state}")
+            st.dataframe(pd.DataFrame(warm['steps'], columns=['step', 'ms']).round(1),
+                         use_container_width=True, hide_index=True)
+        st.caption(f"Last {len(profiler.history)} reruns")
+        history = profiler.history_table()
+        st.bar_chart(history, x='rerun', y='total_ms', height=150)
+        st.dataframe(history.iloc[::-1], use_container_width=True, hide_index=True)
+        st.download_button("⬇️ Export profile (JSON)", data=profiler.export(),
+                           file_name="dashboard_profile.json", mime="application/json")
+
 # ============================================================================
 # FOOTER
 # ============================================================================
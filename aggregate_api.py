@@ -0,0 +1,422 @@
+"""
+LOCAL JSON API FOR THE DASHBOARD AGGREGATES
+===========================================
+The KPIs, ROAS and CAC breakdowns and budget recommendations used to live
+only inside 03_interactive_dashboard.py. This module serves the same numbers
+as JSON over HTTP so other internal tools can read them, with the same
+filters as the dashboard sidebar.
+
+Every endpoint accepts:
+    start, end                        date range (YYYY-MM-DD, inclusive)
+    platform, campaign_type,          comma-separated allowed values
+    influencer_category               (or the parameter repeated)
+    aov, cpm_<Platform>               what-if assumptions (see what_if.py)
+
+Endpoints:
+    GET /kpis                         spend, revenue, ROAS, CAC, sales, campaigns
+    GET /roas?by=platform             average ROAS per platform / campaign_type / category
+    GET /cac?by=platform              average CAC per group
+    GET /cac/trend?by=platform        monthly average CAC per group
+    GET /allocation?by=segment        optimized budget (budget_pct, min_pct, max_pct)
+    GET /health                       data size and cache counters (never cached)
+
+Responses are cached per normalized query: parameter order, repeated
+values and defaults do not matter, so /kpis and /kpis?aov=50 share one
+entry. Each response carries an ETag (a hash of the body); a client that
+sends it back in If-None-Match gets a 304 with no body. Requests are
+handled by a fixed pool of worker threads.
+
+HOW TO RUN:
+    python aggregate_api.py                           # http://127.0.0.1:8502
+    python aggregate_api.py --workers 8 --engine duckdb
+    curl 'http://127.0.0.1:8502/kpis?platform=TikTok,YouTube&start=2023-01-01'
+    python benchmarks.py api                          # requests/sec and p95 latency
+
+Prerequisites: Run 01_data_cleaning_tutorial.py first!
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+import what_if
+from budget_optimizer import SEGMENT, fit_elasticities, recommend
+from time_index import DIMENSIONS, CampaignTimeIndex, rollup
+
+CLEANED_FILE = 'influencer_marketing_cleaned.csv'
+DEFAULT_PORT = 8502
+DEFAULT_WORKERS = 8
+MAX_CACHED_RESPONSES = 4096
+
+# Same choices as the dashboard's optimizer selectbox
+ALLOCATION_LEVELS = {'segment': SEGMENT, 'platform': ['platform']}
+
+
+class QueryError(ValueError):
+    """A request parameter that cannot be used (answered with 400)"""
+
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+class ResponseCache:
+    """LRU cache of (etag, JSON body) per normalized query"""
+
+    def __init__(self, max_entries=MAX_CACHED_RESPONSES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(etag, body) for key, or None"""
+        with self._lock:
+            response = self._responses.get(key)
+            if response is None:
+                self.misses += 1
+            else:
+                self._responses.move_to_end(key)
+                self.hits += 1
+            return response
+
+    def put(self, key, body):
+        """Store a body under key and return its (etag, body)"""
+        response = (f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', body)
+        with self._lock:
+            self._responses[key] = response
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_entries:
+                self._responses.popitem(last=False)
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
+
+    def stats(self):
+        """Counters for /health"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._responses),
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def etag_matches(header, etag):
+    """True when an If-None-Match header lists etag (or is *)"""
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix('W/') for tag in header.split(',')]
+    return '*' in tags or etag in tags
+
+
+# ============================================================================
+# AGGREGATES
+# ============================================================================
+def records(frame):
+    """JSON-ready list of row dicts (NaN becomes null, dates ISO strings)"""
+    return json.loads(frame.to_json(orient='records', date_format='iso', double_precision=6))
+
+
+class AggregateService:
+    """Answers normalized queries from a time index (or DuckDB) and fitted elasticities"""
+
+    def __init__(self, source, elasticities):
+        self.source = source
+        self.elasticities = elasticities
+        self.first_date = pd.Timestamp(source.first_day, unit='D').date()
+        self.last_date = pd.Timestamp(source.last_day, unit='D').date()
+        self.values = {dimension: sorted(source.cells[dimension].unique()) for dimension in DIMENSIONS}
+        self.endpoints = {
+            '/kpis': self.kpis,
+            '/roas': self.group_means,
+            '/cac': self.group_means,
+            '/cac/trend': self.cac_trend,
+            '/allocation': self.allocation,
+        }
+
+    # ------------------------------------------------------------------
+    # Query normalization
+    # ------------------------------------------------------------------
+    def normalize(self, path, params):
+        """Canonical, hashable form of a request (defaults filled, lists sorted)"""
+        if path not in self.endpoints:
+            raise LookupError(path)
+
+        def single(name, default=None):
+            values = params.get(name, [])
+            return values[-1] if values else default
+
+        def number(name, default):
+            try:
+                value = float(single(name, default))
+            except ValueError:
+                value = float('nan')
+            if not math.isfinite(value):
+                raise QueryError(f"{name} must be a number")
+            return value
+
+        def date(name, default):
+            value = single(name)
+            if value is None:
+                return default
+            try:
+                return pd.Timestamp(value).date()
+            except ValueError:
+                raise QueryError(f"{name} must be a date (YYYY-MM-DD)") from None
+
+        start, end = date('start', self.first_date), date('end', self.last_date)
+        if start > end:
+            raise QueryError("start must not be after end")
+
+        filters = []
+        for dimension in DIMENSIONS:
+            allowed = {value for raw in params.get(dimension, []) for value in raw.split(',') if value}
+            # All values (or none given) means no filter, so both share a cache entry
+            if allowed and allowed != set(self.values[dimension]):
+                filters.append((dimension, tuple(sorted(allowed))))
+
+        aov = number('aov', what_if.BASELINE_AOV)
+        cpm = tuple((platform, number(f'cpm_{platform}', base))
+                    for platform, base in what_if.BASELINE_CPM.items())
+        if aov <= 0 or any(value <= 0 for _, value in cpm):
+            raise QueryError("aov and cpm values must be positive")
+        cpm = tuple((platform, value) for platform, value in cpm
+                    if value != what_if.BASELINE_CPM[platform])
+
+        options = ()
+        if path in ('/roas', '/cac', '/cac/trend'):
+            by = single('by', 'platform')
+            if by not in DIMENSIONS:
+                raise QueryError(f"by must be one of {', '.join(DIMENSIONS)}")
+            options = (('by', by),)
+        elif path == '/allocation':
+            by = single('by', 'segment')
+            if by not in ALLOCATION_LEVELS:
+                raise QueryError(f"by must be one of {', '.join(ALLOCATION_LEVELS)}")
+            options = (('by', by), ('budget_pct', number('budget_pct', 100)),
+                       ('min_pct', number('min_pct', 50)), ('max_pct', number('max_pct', 200)))
+
+        return (path, str(start), str(end), tuple(filters), aov, cpm, options)
+
+    def answer(self, query):
+        """Payload dict for a normalized query"""
+        path, start, end, filters, aov, cpm, options = query
+        assumptions = {'aov': aov, 'cpm': dict(cpm)}
+        totals = what_if.apply_assumptions(
+            self.source.cell_totals(start, end, **dict(filters)), **assumptions
+        )
+        payload = self.endpoints[path](totals, query, assumptions, **dict(options))
+        return {
+            'query': {
+                'start': start, 'end': end,
+                **{dimension: list(allowed) for dimension, allowed in filters},
+                'assumptions': what_if.describe(**assumptions),
+                **dict(options),
+            },
+            **payload,
+        }
+
+    # ------------------------------------------------------------------
+    # Endpoints
+    # ------------------------------------------------------------------
+    def kpis(self, totals, query, assumptions):
+        """The dashboard's KPI row"""
+        campaigns = totals['campaigns'].sum()
+        spend, revenue = totals['campaign_cost'].sum(), totals['revenue'].sum()
+        return {
+            'campaigns': int(round(campaigns)),
+            'total_spend': round(float(spend), 2),
+            'total_revenue': round(float(revenue), 2),
+            'roi_pct': round(float((revenue / spend - 1) * 100), 2) if spend > 0 else None,
+            'overall_roas': round(float(revenue / spend), 4) if spend > 0 else None,
+            'avg_cac': round(float(totals['CAC'].sum() / campaigns), 4) if campaigns > 0 else None,
+            'total_sales': int(totals['product_sales'].sum()),
+        }
+
+    def group_means(self, totals, query, assumptions, by):
+        """Average ROAS or CAC per value of `by` (the endpoint path picks the measure)"""
+        measure = 'ROAS' if query[0] == '/roas' else 'CAC'
+        grouped = rollup(totals, by, means=[measure])[[measure, 'campaigns']].reset_index()
+        return {'groups': records(grouped.sort_values(measure, ascending=measure == 'CAC'))}
+
+    def cac_trend(self, totals, query, assumptions, by):
+        """Monthly average CAC per value of `by`"""
+        _, start, end, filters, *_ = query
+        monthly = what_if.apply_assumptions(
+            self.source.monthly(start, end, **dict(filters)), **assumptions
+        )
+        trend = rollup(monthly, ['month', by], means=['CAC'])[['CAC', 'campaigns']].reset_index()
+        trend['month'] = trend['month'].dt.strftime('%Y-%m')
+        return {'months': records(trend)}
+
+    def allocation(self, totals, query, assumptions, by, budget_pct, min_pct, max_pct):
+        """Optimized budget per segment, as on the dashboard's Recommendations tab"""
+        columns = ALLOCATION_LEVELS[by]
+        segments = rollup(totals, columns, sums=['campaign_cost', 'revenue'])
+        current = segments['campaign_cost'].sum()
+        try:
+            allocation = recommend(segments, self.elasticities[by],
+                                   budget=current * budget_pct / 100,
+                                   min_ratio=min_pct / 100, max_ratio=max_pct / 100)
+        except ValueError as error:
+            raise QueryError(str(error)) from None
+
+        by_platform = allocation.groupby(level='platform')[
+            ['campaign_cost', 'recommended_spend', 'revenue', 'expected_revenue']].sum()
+        return {
+            'current_budget': round(float(current), 2),
+            'recommended_budget': round(float(allocation['recommended_spend'].sum()), 2),
+            'current_revenue': round(float(allocation['revenue'].sum()), 2),
+            'expected_revenue': round(float(allocation['expected_revenue'].sum()), 2),
+            'platforms': records(by_platform.reset_index()),
+            'segments': records(allocation.reset_index()),
+        }
+
+
+def load_service(csv_path=CLEANED_FILE, engine='pandas'):
+    """Build the service from the cleaned CSV with the pandas index or DuckDB"""
+    fit_columns = list(SEGMENT) + ['campaign_cost', 'revenue']
+    if engine == 'duckdb':
+        from duckdb_backend import DuckDBCampaigns
+        source = DuckDBCampaigns(csv_path)
+        history = source.campaigns(columns=fit_columns)
+    else:
+        df = pd.read_csv(csv_path, parse_dates=['start_date'])
+        source = CampaignTimeIndex.from_frame(df)
+        history = df[fit_columns]
+    elasticities = {name: fit_elasticities(history, by=by) for name, by in ALLOCATION_LEVELS.items()}
+    return AggregateService(source, elasticities)
+
+
+# ============================================================================
+# HTTP SERVER
+# ============================================================================
+class AggregateHandler(BaseHTTPRequestHandler):
+    """GET handler: normalize, serve from the cache or compute, revalidate ETags"""
+
+    protocol_version = 'HTTP/1.1'     # keep-alive, so clients reuse connections
+    timeout = 30                      # free the worker from idle keep-alive clients
+    disable_nagle_algorithm = True    # headers and body go out as separate writes
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/') or '/'
+        server = self.server
+
+        if path == '/health':
+            return self._send(200, json.dumps({
+                'campaigns': server.service.source.total_campaigns,
+                'first_date': str(server.service.first_date),
+                'last_date': str(server.service.last_date),
+                'workers': server.workers,
+                'cache': server.cache.stats(),
+            }).encode(), cache_control='no-store')
+
+        try:
+            key = server.service.normalize(path, parse_qs(url.query))
+            response = server.cache.get(key)
+            if response is None:
+                body = json.dumps(server.service.answer(key), allow_nan=False).encode()
+                response = server.cache.put(key, body)
+        except LookupError:
+            return self._error(404, f"unknown endpoint {path}")
+        except QueryError as error:
+            return self._error(400, str(error))
+
+        etag, body = response
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            server.cache.not_modified += 1
+            return self._send(304, b'', etag=etag)
+        self._send(200, body, etag=etag)
+
+    def _error(self, status, message):
+        self._send(status, json.dumps({'error': message}).encode(), cache_control='no-store')
+
+    def _send(self, status, body, etag=None, cache_control='no-cache'):
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Cache-Control', cache_control)
+        if status != 304:
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class AggregateServer(HTTPServer):
+    """HTTP server that hands each connection to a fixed pool of worker threads"""
+
+    def __init__(self, address, service, workers=DEFAULT_WORKERS, cache=None, verbose=False):
+        super().__init__(address, AggregateHandler)
+        self.service = service
+        self.cache = cache or ResponseCache()
+        self.workers = workers
+        self.verbose = verbose
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api-worker')
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process_request_thread, request, client_address)
+
+    def _process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--engine', choices=['pandas', 'duckdb'], default='pandas')
+    parser.add_argument('--input', default=CLEANED_FILE)
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args()
+
+    try:
+        service = load_service(args.input, args.engine)
+    except FileNotFoundError:
+        raise SystemExit("❌ Error: Please run 01_data_cleaning_tutorial.py first!")
+
+    server = AggregateServer((args.host, args.port), service, workers=args.workers,
+                             verbose=args.verbose)
+    print(f"✓ Serving {service.source.total_campaigns:,} campaigns on "
+          f"http://{args.host}:{server.server_address[1]} ({args.workers} workers, {args.engine})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
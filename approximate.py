@@ -0,0 +1,146 @@
+"""
+STRATIFIED SAMPLE FOR APPROXIMATE (PROGRESSIVE) DASHBOARD ANSWERS
+=================================================================
+At tens of millions of campaigns, reading the cleaned CSV and building the
+time index takes seconds before the first chart can appear. A small sample
+stored next to the cleaned data lets the dashboard answer immediately with
+estimates, then swap in the exact figures once the full table is loaded.
+
+The sample is stratified by platform × campaign_type: every stratum keeps up
+to SAMPLE_PER_STRATUM random campaigns, each carrying a sample_weight of
+(campaigns in stratum) / (campaigns sampled). Weighted sums estimate totals
+and weighted ratios estimate means, so a CampaignTimeIndex built from the
+sample returns estimates in exactly the shape the exact index does.
+
+Error bars use the standard stratified-sampling variance
+    Var(total) = Σ_h N_h² × (1 - n_h / N_h) × s_h² / n_h
+and, for means and ROAS, the same formula on the linearized ratio
+    z = (y - R × x) / X
+Margins are 1.96 standard errors (≈ 95% confidence).
+
+The campaigns with the first and last start date are always kept (weight
+1), so date pickers built from the sample show the full range.
+
+Usage:
+    write_sample(df_clean)                       # next to the cleaned CSV
+    sample = read_sample()
+    kpis = kpi_estimates(sample, domain_mask)    # {'revenue': (value, margin), ...}
+"""
+
+import numpy as np
+import pandas as pd
+
+from time_index import DIMENSIONS, MEASURES, WEIGHT
+
+SAMPLE_FILE = 'influencer_marketing_sample.csv'
+STRATA = ['platform', 'campaign_type']
+SAMPLE_PER_STRATUM = 1000
+Z_95 = 1.96
+
+# Only what the dashboard reads from campaign rows, to keep the file small
+SAMPLE_COLUMNS = ['start_date'] + DIMENSIONS + MEASURES
+
+
+def stratified_sample(df, per_stratum=SAMPLE_PER_STRATUM, seed=42):
+    """Up to per_stratum random campaigns per platform × campaign_type, weighted"""
+    dates = df['start_date'].to_numpy()
+    certain = np.zeros(len(df), dtype=bool)
+    certain[[dates.argmin(), dates.argmax()]] = True
+
+    rest = df[~certain]
+    rank = (pd.Series(np.random.default_rng(seed).random(len(rest)), index=rest.index)
+            .groupby([rest[column] for column in STRATA]).rank(method='first'))
+    stratum_size = rest.groupby(STRATA)[STRATA[0]].transform('size')
+    picked = rank <= per_stratum
+
+    sample = pd.concat([
+        df[certain].assign(**{WEIGHT: 1.0}),
+        rest[picked].assign(**{WEIGHT: stratum_size[picked] / np.minimum(stratum_size[picked], per_stratum)}),
+    ])
+    return sample[SAMPLE_COLUMNS + [WEIGHT]].sort_values('start_date').reset_index(drop=True)
+
+
+def write_sample(df, path=SAMPLE_FILE, per_stratum=SAMPLE_PER_STRATUM):
+    """Save the stratified sample of a cleaned campaign frame"""
+    stratified_sample(df, per_stratum).to_csv(path, index=False)
+    return path
+
+
+def read_sample(path=SAMPLE_FILE):
+    """Load a saved sample, or None when it has not been written yet"""
+    try:
+        return pd.read_csv(path, parse_dates=['start_date'])
+    except FileNotFoundError:
+        return None
+
+
+# ============================================================================
+# ESTIMATES WITH ERROR BARS
+# ============================================================================
+def _strata_codes(sample):
+    """Variance strata: platform × campaign_type, certainty rows on their own"""
+    keys = [sample[column] for column in STRATA] + [sample[WEIGHT]]
+    return pd.MultiIndex.from_arrays(keys).factorize()[0]
+
+
+def _total_variance(values, codes, weights):
+    """Stratified variance of the weighted total of values"""
+    n = np.bincount(codes).astype(np.float64)
+    population = np.bincount(codes, weights)
+    total = np.bincount(codes, values)
+    squares = np.bincount(codes, values * values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spread = np.where(n > 1, (squares - total * total / n) / (n - 1), 0.0)
+        variance = population ** 2 * (1 - n / population) * spread / n
+    return float(np.nansum(np.maximum(variance, 0.0)))
+
+
+def estimate_total(sample, values, domain, codes=None):
+    """(estimate, 95% margin) of the total of values over the domain rows"""
+    weights = sample[WEIGHT].to_numpy(np.float64)
+    codes = _strata_codes(sample) if codes is None else codes
+    y = np.where(domain, np.asarray(values, dtype=np.float64), 0.0)
+    variance = _total_variance(y, codes, weights)
+    return float((weights * y).sum()), Z_95 * variance ** 0.5
+
+
+def estimate_ratio(sample, numerator, domain, denominator=None, codes=None):
+    """(estimate, 95% margin) of Σ numerator / Σ denominator over the domain
+
+    With no denominator this is the campaign-level mean of numerator.
+    """
+    weights = sample[WEIGHT].to_numpy(np.float64)
+    codes = _strata_codes(sample) if codes is None else codes
+    y = np.where(domain, np.asarray(numerator, dtype=np.float64), 0.0)
+    x = np.where(domain, 1.0 if denominator is None else np.asarray(denominator, dtype=np.float64), 0.0)
+    y_total, x_total = (weights * y).sum(), (weights * x).sum()
+    if x_total <= 0:
+        return float('nan'), float('nan')
+
+    ratio = y_total / x_total
+    z = (y - ratio * x) / x_total
+    variance = _total_variance(z, codes, weights)
+    return float(ratio), Z_95 * variance ** 0.5
+
+
+def kpi_estimates(sample, domain):
+    """Dashboard KPIs as (estimate, margin): totals, overall ROAS and mean CAC"""
+    codes = _strata_codes(sample)
+    return {
+        'campaigns': estimate_total(sample, np.ones(len(sample)), domain, codes),
+        'campaign_cost': estimate_total(sample, sample['campaign_cost'], domain, codes),
+        'revenue': estimate_total(sample, sample['revenue'], domain, codes),
+        'product_sales': estimate_total(sample, sample['product_sales'], domain, codes),
+        'ROAS': estimate_ratio(sample, sample['revenue'], domain, sample['campaign_cost'], codes),
+        'CAC': estimate_ratio(sample, sample['CAC'], domain, codes=codes),
+    }
+
+
+def group_means(sample, domain, by, measure):
+    """Mean of measure per value of column `by`, with a {measure}_margin column"""
+    codes = _strata_codes(sample)
+    rows = {}
+    for group in np.unique(sample.loc[domain, by]):
+        rows[group] = estimate_ratio(sample, sample[measure], domain & (sample[by] == group).to_numpy(),
+                                     codes=codes)
+    return pd.DataFrame.from_dict(rows, orient='index', columns=[measure, f'{measure}_margin'])
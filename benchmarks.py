@@ -0,0 +1,1125 @@
+"""
+PERFORMANCE BENCHMARKS FOR THE MARKETING DASHBOARD
+===================================================
+Reproducible timings for the dashboard and the analysis pipeline.
+
+The real campaign export is not shipped with the project, so every benchmark
+runs against a synthetic dataset with the same schema and value ranges as
+influencer_marketing_roi_dataset.csv (one campaign per day, four platforms,
+five campaign types, seven influencer categories).
+
+HOW TO RUN:
+    python benchmarks.py rerun                 # dashboard rerun latency
+    python benchmarks.py rerun --rows 1000000  # ...at a larger scale
+    python benchmarks.py sessions              # many concurrent analysts, random filters
+    python benchmarks.py daterange             # index lookups vs row scans
+    python benchmarks.py optimizer             # budget solver vs segment count
+    python benchmarks.py bootstrap             # bootstrap intervals, 10k x 1M rows
+    python benchmarks.py approx                # first paint: sample estimates vs exact
+    python benchmarks.py engines               # pandas vs DuckDB at 1M and 10M rows
+    python benchmarks.py reload                # appended rows: refresh vs full reload
+    python benchmarks.py startup               # cold load: cleaned CSV vs snapshot
+    python benchmarks.py drilldown             # campaign table: full filter+sort vs one page
+    python benchmarks.py topk                  # per-segment leaderboards: sort vs argpartition
+    python benchmarks.py pacing                # daily spend pacing: per-day rows vs interval sweep
+    python benchmarks.py forecast              # segment forecasts: per-series loop vs one stacked solve
+    python benchmarks.py tenants               # many brands under one memory budget: hits vs reloads
+    python benchmarks.py export                # filtered download: in-memory file vs chunked stream
+    python benchmarks.py crossfilter           # chart clicks: re-filter rows vs cube cells + bitsets
+    python benchmarks.py cleaning              # 01's pipeline: pandas vs Polars lazy
+    python benchmarks.py api                   # JSON API: requests/sec and p95 latency
+
+Each command prints a small timing table. Run from the project folder.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from what_if import BASELINE_AOV, BASELINE_CPM
+
+PROJECT_DIR = Path(__file__).resolve().parent
+DASHBOARD_SCRIPT = PROJECT_DIR / '03_interactive_dashboard.py'
+
+PLATFORMS = ['Instagram', 'YouTube', 'TikTok', 'Twitter']
+PLATFORM_WEIGHTS = [0.40, 0.30, 0.20, 0.10]
+CAMPAIGN_TYPES = ['Seasonal Sale', 'Giveaway', 'Brand Awareness',
+                  'Product Launch', 'Event Promotion']
+CATEGORIES = ['Fashion', 'Travel', 'Tech', 'Fitness', 'Food', 'Beauty', 'Gaming']
+
+# Same assumptions as 01_data_cleaning_tutorial.py
+PLATFORM_CPM = BASELINE_CPM
+AVERAGE_ORDER_VALUE = BASELINE_AOV
+
+
+# ============================================================================
+# SYNTHETIC DATA
+# ============================================================================
+def make_raw_campaigns(n_rows, seed=0, first_row=0):
+    """Generate raw campaigns shaped like influencer_marketing_roi_dataset.csv"""
+    rng = np.random.default_rng(seed)
+    rows = np.arange(first_row, first_row + n_rows)
+    start = pd.Timestamp('2022-01-01') + pd.to_timedelta(rows % 80_000, unit='D')
+    duration = rng.integers(1, 30, n_rows)
+    return pd.DataFrame({
+        'campaign_id': [f'CAMP{100000 + i}' for i in rows],
+        'platform': rng.choice(PLATFORMS, n_rows, p=PLATFORM_WEIGHTS),
+        'influencer_category': rng.choice(CATEGORIES, n_rows),
+        'campaign_type': rng.choice(CAMPAIGN_TYPES, n_rows),
+        'start_date': start,
+        'engagements': rng.integers(100, 100_000, n_rows),
+        'estimated_reach': rng.integers(1_000, 1_000_000, n_rows),
+        'product_sales': rng.integers(0, 5_000, n_rows),
+        'campaign_duration_days': duration,
+        'end_date': start + pd.to_timedelta(duration, unit='D'),
+    })
+
+
+def make_cleaned_campaigns(n_rows, seed=0, first_row=0):
+    """Synthetic campaigns with the derived columns written by step 01"""
+    df = make_raw_campaigns(n_rows, seed, first_row)
+    rng = np.random.default_rng(seed + 1)
+    cpm = df['platform'].map(PLATFORM_CPM)
+    noise = 1 + rng.uniform(-0.2, 0.2, n_rows)
+    df['campaign_cost'] = (df['estimated_reach'] / 1000 * cpm * noise).round(2)
+    df['revenue'] = df['product_sales'] * AVERAGE_ORDER_VALUE
+    df['ROAS'] = (df['revenue'] / df['campaign_cost']).round(2)
+    df['CAC'] = (df['campaign_cost'] / df['product_sales'].replace(0, 1)).round(2)
+    df['engagement_rate'] = (df['engagements'] / df['estimated_reach'] * 100).round(2)
+    df['conversion_rate'] = (df['product_sales'] / df['estimated_reach'] * 100).round(2)
+    df['year'] = df['start_date'].dt.year
+    df['month'] = df['start_date'].dt.month
+    df['quarter'] = df['start_date'].dt.quarter
+    df['day_of_week'] = df['start_date'].dt.day_name()
+    return df
+
+
+def write_cleaned_csv(folder, n_rows, seed=0, sample=False, chunk_rows=1_000_000):
+    """Write a synthetic influencer_marketing_cleaned.csv (and optionally its sample) into folder"""
+    path = Path(folder) / 'influencer_marketing_cleaned.csv'
+    if n_rows > chunk_rows and not sample:
+        # Large files are written in chunks so generation fits in memory
+        for first_row in range(0, n_rows, chunk_rows):
+            chunk = make_cleaned_campaigns(min(chunk_rows, n_rows - first_row),
+                                           seed + first_row, first_row)
+            chunk.to_csv(path, index=False, mode='a', header=first_row == 0)
+        return path
+    df = make_cleaned_campaigns(n_rows, seed)
+    df.to_csv(path, index=False)
+    if sample:
+        from approximate import SAMPLE_FILE, write_sample
+        write_sample(df, Path(folder) / SAMPLE_FILE)
+    return path
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+def timed(func, *args, **kwargs):
+    """Run func once and return (result, elapsed milliseconds)"""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def print_timings(title, rows):
+    """Print (label, list of ms samples) rows as a small table"""
+    print(f"\n{title}")
+    print("-" * 72)
+    print(f"{'case':36} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    for label, samples in rows:
+        ordered = sorted(samples)
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+        print(f"{label:36} {statistics.mean(samples):10.1f} "
+              f"{statistics.median(samples):10.1f} {p95:10.1f}")
+
+
+# ============================================================================
+# BENCHMARK: DASHBOARD RERUN LATENCY
+# ============================================================================
+def bench_rerun(args):
+    """Time headless reruns of 03_interactive_dashboard.py for each section"""
+    from streamlit.testing.v1 import AppTest
+
+    with tempfile.TemporaryDirectory() as folder:
+        write_cleaned_csv(folder, args.rows)
+        previous_dir = os.getcwd()
+        os.chdir(folder)
+        try:
+            at = AppTest.from_file(str(DASHBOARD_SCRIPT), default_timeout=600)
+            _, cold_ms = timed(at.run)
+            rows = [('first render (cold)', [cold_ms])]
+
+            sections = at.radio(key='active_section').options if _has_key(at, 'active_section') else [None]
+            for section in sections:
+                samples = []
+                for _ in range(args.repeat):
+                    if section is not None:
+                        at.radio(key='active_section').set_value(section)
+                    _, ms = timed(at.run)
+                    samples.append(ms)
+                rows.append((f'rerun: {section or "all tabs"}', samples))
+        finally:
+            os.chdir(previous_dir)
+
+    print_timings(f"Dashboard rerun latency ({args.rows:,} rows)", rows)
+
+
+def _has_key(at, key):
+    """True when the AppTest tree contains a radio widget with this key"""
+    return any(widget.key == key for widget in at.radio)
+
+
+# ============================================================================
+# BENCHMARK: CONCURRENT DASHBOARD SESSIONS
+# ============================================================================
+def _rss_mb():
+    """Current resident memory of this process in MB (peak where /proc is missing)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _random_filter_change(rng, at):
+    """Change one sidebar or section widget the way an analyst might"""
+    def subset(options):
+        return list(rng.choice(options, rng.integers(1, len(options) + 1), replace=False))
+
+    action = rng.choice(['dates', 'platforms', 'types', 'categories', 'section', 'aov', 'budget'])
+    if action == 'dates':
+        low, high = at.date_input[0].min, at.date_input[0].max
+        days = sorted(rng.integers(0, (high - low).days + 1, 2))
+        at.date_input[0].set_value((low + pd.Timedelta(days=int(days[0])),
+                                    low + pd.Timedelta(days=int(days[1]))))
+    elif action in ('platforms', 'types', 'categories'):
+        label = {'platforms': 'Select Platforms', 'types': 'Select Campaign Types',
+                 'categories': 'Select Influencer Categories'}[action]
+        widget = next(w for w in at.multiselect if w.label == label)
+        widget.set_value(subset(widget.options))
+    elif action == 'aov':
+        next(w for w in at.number_input if w.label.startswith('Average order')).set_value(
+            float(rng.integers(6, 15) * 5))
+    elif action == 'budget' and any(w.key == 'optimizer_budget' for w in at.slider):
+        at.slider(key='optimizer_budget').set_value(int(rng.integers(10, 41) * 5))
+    else:
+        section = at.radio(key='active_section')
+        section.set_value(section.options[rng.integers(len(section.options))])
+    return action
+
+
+def _dashboard_session(steps, seed, results):
+    """One simulated analyst: first render, then `steps` random filter changes"""
+    from streamlit.testing.v1 import AppTest
+
+    rng = np.random.default_rng(seed)
+    at = AppTest.from_file(str(DASHBOARD_SCRIPT), default_timeout=600)
+    _, first_ms = timed(at.run)
+    latencies, errors = [], len(at.exception)
+    for _ in range(steps):
+        _random_filter_change(rng, at)
+        _, ms = timed(at.run)
+        latencies.append(ms)
+        errors += len(at.exception)
+    results.append((first_ms, latencies, errors, at))
+
+
+def _session_process(folder, steps, seed, results):
+    """A session in its own process (own caches, like a separate server replica)"""
+    os.chdir(folder)
+    finished = []
+    _dashboard_session(steps, seed, finished)
+    first_ms, latencies, errors, _ = finished[0]
+    results.put((first_ms, latencies, errors, _rss_mb()))
+
+
+def bench_sessions(args):
+    """Rerun latency, throughput and memory as concurrent sessions grow"""
+    import multiprocessing
+    import threading
+
+    summary = []
+    with tempfile.TemporaryDirectory() as folder:
+        write_cleaned_csv(folder, args.rows)
+        previous_dir = os.getcwd()
+        os.chdir(folder)
+        try:
+            # Threads share one process, like sessions on one Streamlit server:
+            # load the data and fill the shared caches once before measuring
+            if args.mode == 'threads':
+                _dashboard_session(3, 0, [])
+            context = multiprocessing.get_context('spawn')
+
+            for n_sessions in args.sessions:
+                baseline_mb = _rss_mb()
+                started = time.perf_counter()
+                if args.mode == 'threads':
+                    finished = []
+                    workers = [threading.Thread(target=_dashboard_session,
+                                                args=(args.steps, seed + 1, finished))
+                               for seed in range(n_sessions)]
+                    for worker in workers:
+                        worker.start()
+                    for worker in workers:
+                        worker.join()
+                    wall = time.perf_counter() - started
+                    session_mb = (_rss_mb() - baseline_mb) / n_sessions
+                    finished = [result[:3] for result in finished]   # drop the AppTest sessions
+                else:
+                    queue = context.Queue()
+                    workers = [context.Process(target=_session_process,
+                                               args=(folder, args.steps, seed + 1, queue))
+                               for seed in range(n_sessions)]
+                    for worker in workers:
+                        worker.start()
+                    finished = [queue.get() for _ in workers]
+                    for worker in workers:
+                        worker.join()
+                    wall = time.perf_counter() - started
+                    session_mb = statistics.mean(rss for *_, rss in finished)
+                summary.append((n_sessions, wall, session_mb, finished))
+        finally:
+            os.chdir(previous_dir)
+
+    rows, lines = [], []
+    for n_sessions, wall, session_mb, finished in summary:
+        latencies = [ms for result in finished for ms in result[1]]
+        errors = sum(result[2] for result in finished)
+        ordered = sorted(latencies)
+        p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+        rows.append((f'{n_sessions} sessions: first render', [result[0] for result in finished]))
+        rows.append((f'{n_sessions} sessions: rerun', latencies))
+        lines.append(f"  {n_sessions:3} sessions: {len(latencies) / wall:6.1f} reruns/sec, "
+                     f"p99 {p99:,.0f} ms, {session_mb:,.1f} MB "
+                     + ("added per session" if args.mode == 'threads' else "per session process")
+                     + (f", {errors} errors" if errors else ""))
+
+    print_timings(f"Concurrent dashboard sessions ({args.rows:,} rows, {args.steps} filter changes "
+                  f"per session, {args.mode}, {os.cpu_count()} CPU)", rows)
+    for line in lines:
+        print(line)
+
+
+# ============================================================================
+# BENCHMARK: DATE-RANGE KPIs (ROW SCAN VS PREFIX-SUM INDEX)
+# ============================================================================
+def bench_daterange(args):
+    """Random date ranges answered by a row scan and by CampaignTimeIndex"""
+    from time_index import CampaignTimeIndex
+
+    df = make_cleaned_campaigns(args.rows)
+    index, build_ms = timed(CampaignTimeIndex.from_frame, df)
+
+    rng = np.random.default_rng(1)
+    days = df['start_date'].sort_values().to_numpy()
+    ranges = [tuple(pd.Timestamp(d) for d in sorted(rng.choice(days, 2)))
+              for _ in range(args.repeat)]
+
+    scan, lookup = [], []
+    for start, end in ranges:
+        def scan_kpis():
+            rows = df[(df['start_date'] >= start) & (df['start_date'] <= end)]
+            return rows['campaign_cost'].sum(), rows['revenue'].sum(), rows['CAC'].mean()
+
+        def index_kpis():
+            totals = index.cell_totals(start, end)
+            return (totals['campaign_cost'].sum(), totals['revenue'].sum(),
+                    totals['CAC'].sum() / totals['campaigns'].sum())
+
+        expected, ms = timed(scan_kpis)
+        scan.append(ms)
+        got, ms = timed(index_kpis)
+        lookup.append(ms)
+        assert np.allclose(expected, got), (expected, got)
+
+    print_timings(f"Date-range KPIs ({args.rows:,} rows, index built in {build_ms:,.0f} ms)",
+                  [('row scan', scan), ('prefix-sum index', lookup)])
+
+
+# ============================================================================
+# BENCHMARK: BUDGET OPTIMIZER
+# ============================================================================
+def bench_optimizer(args):
+    """Solve time of the constrained allocation for growing segment counts"""
+    from budget_optimizer import optimize_allocation
+
+    rng = np.random.default_rng(2)
+    rows = []
+    for n_segments in (140, 1_000, 5_000, 20_000):
+        curves = pd.DataFrame({
+            'campaign_cost': rng.uniform(1e3, 1e6, n_segments),
+            'revenue': rng.uniform(1e4, 1e8, n_segments),
+            'elasticity': rng.uniform(0.05, 0.95, n_segments),
+        })
+        current = curves['campaign_cost'].to_numpy()
+        samples = []
+        for _ in range(args.repeat):
+            budget = current.sum() * rng.uniform(0.6, 1.8)
+            _, ms = timed(optimize_allocation, curves, budget,
+                          min_spend=current * 0.5, max_spend=current * 2.0)
+            samples.append(ms)
+        rows.append((f'{n_segments:,} segments', samples))
+
+    print_timings("Budget optimizer solve time", rows)
+
+
+# ============================================================================
+# BENCHMARK: BOOTSTRAP CONFIDENCE INTERVALS
+# ============================================================================
+def bench_bootstrap(args):
+    """Bootstrap intervals for every grouping, inline and on the process pool"""
+    from bootstrap_ci import bootstrap_intervals
+
+    df = make_cleaned_campaigns(args.rows)
+    rows = []
+    for label, workers in [('1 process', 1), (f'{os.cpu_count()} processes', os.cpu_count())]:
+        samples = []
+        for _ in range(args.repeat):
+            _, ms = timed(bootstrap_intervals, df, n_resamples=args.resamples, workers=workers)
+            samples.append(ms)
+        rows.append((label, samples))
+
+    elements = args.rows * args.resamples
+    print_timings(f"Bootstrap intervals ({args.resamples:,} resamples x {args.rows:,} rows)", rows)
+    print(f"{'ns per resampled row (1 process)':36} {statistics.median(rows[0][1]) * 1e6 / elements:10.1f}")
+
+
+# ============================================================================
+# BENCHMARK: PROGRESSIVE (SAMPLE-FIRST) LOADING
+# ============================================================================
+def _time_first_paint(folder, results):
+    """First session on a fresh server: first paint, then time until exact figures"""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    # Warm up imports on a tiny dataset, then drop every cache: what is left
+    # is the data loading a real server does for its first visitor
+    with tempfile.TemporaryDirectory() as warmup:
+        write_cleaned_csv(warmup, 1_000)
+        os.chdir(warmup)
+        AppTest.from_file(str(DASHBOARD_SCRIPT), default_timeout=600).run()
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+    os.chdir(folder)
+    started = time.perf_counter()
+    at = AppTest.from_file(str(DASHBOARD_SCRIPT), default_timeout=600)
+    at.run()
+    first_paint = (time.perf_counter() - started) * 1000
+    estimated = any('Estimated figures' in info.value for info in at.info)
+    while any('Estimated figures' in info.value for info in at.info):
+        time.sleep(0.25)         # the dashboard itself polls once a second
+        at.run()
+    results.put((first_paint, estimated, (time.perf_counter() - started) * 1000))
+
+
+def bench_approximate(args):
+    """Cold first paint with and without the stratified sample"""
+    import multiprocessing
+
+    context = multiprocessing.get_context('spawn')
+    rows = []
+    with tempfile.TemporaryDirectory() as folder:
+        write_cleaned_csv(folder, args.rows, sample=True)
+        sample_path = Path(folder) / 'influencer_marketing_sample.csv'
+        hidden_path = Path(folder) / 'sample.hidden'
+        for label in ('with sample', 'no sample'):
+            if label == 'no sample':
+                sample_path.rename(hidden_path)
+            paint, exact, estimated = [], [], False
+            for _ in range(args.repeat):
+                results = context.Queue()
+                worker = context.Process(target=_time_first_paint, args=(folder, results))
+                worker.start()
+                first_ms, estimated, exact_ms = results.get()
+                worker.join()
+                paint.append(first_ms)
+                exact.append(exact_ms)
+            rows.append((f'{label}: first paint' + (' (estimates)' if estimated else ''), paint))
+            rows.append((f'{label}: exact figures shown', exact))
+
+    print_timings(f"Cold dashboard load ({args.rows:,} rows, fresh process each run)", rows)
+
+
+# ============================================================================
+# BENCHMARK: QUERY ENGINES (PANDAS + TIME INDEX VS DUCKDB)
+# ============================================================================
+def _engine_worker(engine, path, queries, results):
+    """Time one backend in its own process: setup, each query kind, peak memory"""
+    import resource
+
+    if engine == 'duckdb':
+        from duckdb_backend import DuckDBCampaigns
+        source, setup_ms = timed(DuckDBCampaigns, path)
+        rows = lambda start, end, filters: source.campaigns(start, end, ['platform', 'ROAS'], **filters)
+    else:
+        from time_index import CampaignTimeIndex
+
+        def load():
+            df = pd.read_csv(path, parse_dates=['start_date', 'end_date'])
+            return df, CampaignTimeIndex.from_frame(df)
+
+        (df, source), setup_ms = timed(load)
+
+        def rows(start, end, filters):
+            mask = ((df['start_date'] >= start) & (df['start_date'] <= end)
+                    & df['platform'].isin(filters['platform']))
+            return df.loc[mask, ['platform', 'ROAS']]
+
+    cases = {
+        'KPIs / cell totals': lambda start, end, filters: source.cell_totals(start, end, **filters),
+        'monthly trend': lambda start, end, filters: source.monthly(start, end, **filters),
+        'campaign rows (box plot)': rows,
+    }
+    timings, sizes = {}, {}
+    for label, query in cases.items():
+        timings[label], sizes[label] = [], []
+        for query_args in queries:
+            result, ms = timed(query, *query_args)
+            timings[label].append(ms)
+            sizes[label].append(len(result))
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put((setup_ms, timings, sizes, peak_mb))
+
+
+def bench_engines(args):
+    """Setup, per-query latency and peak memory of both dashboard backends"""
+    import multiprocessing
+
+    context = multiprocessing.get_context('spawn')
+    for n_rows in args.rows:
+        rng = np.random.default_rng(3)
+        first_day = pd.Timestamp('2022-01-01')
+        span = min(n_rows, 80_000)
+        queries = []
+        for _ in range(args.repeat):
+            start, end = sorted(first_day + pd.Timedelta(days=int(d)) for d in rng.integers(0, span, 2))
+            platforms = list(rng.choice(PLATFORMS, rng.integers(1, 5), replace=False))
+            queries.append((start, end, {'platform': platforms}))
+
+        rows, sizes, notes = [], {}, []
+        with tempfile.TemporaryDirectory() as folder:
+            path = write_cleaned_csv(folder, n_rows)
+            for engine in ('pandas', 'duckdb'):
+                results = context.Queue()
+                worker = context.Process(target=_engine_worker, args=(engine, path, queries, results))
+                worker.start()
+                worker.join()
+                if worker.exitcode != 0:
+                    notes.append(f"{engine}: failed (exit code {worker.exitcode}, likely out of memory)")
+                    continue
+                setup_ms, timings, sizes[engine], peak_mb = results.get()
+                notes.append(f"{engine}: peak memory {peak_mb:,.0f} MB")
+                rows.append((f'{engine}: setup (load / convert)', [setup_ms]))
+                rows += [(f'{engine}: {label}', samples) for label, samples in timings.items()]
+
+        if len(sizes) == 2:
+            assert sizes['pandas'] == sizes['duckdb'], "backends returned different result sizes"
+        print_timings(f"Query engines ({n_rows:,} rows, {os.cpu_count()} CPU)", rows)
+        for note in notes:
+            print(f"  {note}")
+
+
+# ============================================================================
+# BENCHMARK: HOT RELOAD OF APPENDED DATA
+# ============================================================================
+def bench_reload(args):
+    """Refresh after appends and new partitions, against a full reload"""
+    from campaign_dataset import CampaignDataset
+
+    rows = []
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_cleaned_csv(folder, args.rows)
+        dataset, full_ms = timed(CampaignDataset.load, path)
+        rows.append((f'full load ({args.rows:,} rows)', [full_ms]))
+
+        _, ms = timed(dataset.refresh)
+        rows.append(('refresh, nothing new', [ms]))
+        first_row = args.rows
+        for n_new in args.append:
+            samples = []
+            for _ in range(args.repeat):
+                new = make_cleaned_campaigns(n_new, seed=first_row, first_row=first_row)
+                first_row += n_new
+                with open(path, 'a', encoding='utf-8') as data:
+                    new.to_csv(data, index=False, header=False)
+                change, ms = timed(dataset.refresh)
+                assert change['rows'] == n_new and not change['full_reload']
+                samples.append(ms)
+            rows.append((f'refresh, {n_new:,} rows appended', samples))
+
+        new = make_cleaned_campaigns(args.append[0], seed=first_row, first_row=first_row)
+        new.to_csv(Path(folder) / f'{Path(path).stem}_new.csv', index=False)
+        change, ms = timed(dataset.refresh)
+        assert change['rows'] == len(new)
+        rows.append((f'refresh, new {len(new):,}-row partition', [ms]))
+        assert dataset.index.total_campaigns == len(dataset.frame)
+
+    print_timings(f"Hot reload ({args.rows:,} rows already loaded)", rows)
+
+
+# ============================================================================
+# BENCHMARK: COLD START FROM THE SNAPSHOT
+# ============================================================================
+def bench_startup(args):
+    """Load the dashboard data from the cleaned CSV and from the snapshot"""
+    from campaign_dataset import CampaignDataset
+
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as folder:
+            path = write_cleaned_csv(folder, n_rows)
+            csv_runs = [timed(CampaignDataset.load, path, use_snapshot=False) for _ in range(args.repeat)]
+            _, write_ms = timed(csv_runs[0][0].save_snapshot)
+            snapshot_runs = [timed(CampaignDataset.load, path) for _ in range(args.repeat)]
+            assert snapshot_runs[0][0].loaded_from == 'snapshot'
+            assert snapshot_runs[0][0].frame.equals(csv_runs[0][0].frame)
+            print_timings(f"Cold load, {n_rows:,} rows", [
+                ('cleaned CSV + time index', [ms for _, ms in csv_runs]),
+                ('write snapshot (cleaning stage)', [write_ms]),
+                ('snapshot (one mmap read)', [ms for _, ms in snapshot_runs]),
+            ])
+
+
+# ============================================================================
+# BENCHMARK: CAMPAIGN DRILL-DOWN TABLE
+# ============================================================================
+def bench_drilldown(args):
+    """One page of the campaign table: filter + sort everything vs CampaignPages"""
+    from drill_down import PAGE_COLUMNS, CampaignPages
+
+    df = make_cleaned_campaigns(args.rows)
+    pages, build_ms = timed(CampaignPages, df)
+    first, last = df['start_date'].min(), df['start_date'].max()
+    queries = {
+        'all campaigns': {},
+        'one platform': {'platform': ['TikTok']},
+        'platform + category': {'platform': ['TikTok'], 'influencer_category': ['Fitness']},
+    }
+
+    def full_sort(filters, page):
+        mask = df['start_date'].between(first, last)
+        for column, allowed in filters.items():
+            mask &= df[column].isin(allowed)
+        rows = df[mask].sort_values('ROAS', ascending=False, kind='stable')
+        return len(rows), rows.iloc[page * 50:(page + 1) * 50][PAGE_COLUMNS]
+
+    rows = [('build sort orders (once per version)', [build_ms])]
+    for label, filters in queries.items():
+        (total, expected), _ = timed(full_sort, filters, 0)
+        got = pages.page(first, last, 'ROAS', True, 0, 50, **filters)
+        assert pages.count(first, last, **filters) == total
+        assert np.allclose(got['ROAS'], expected['ROAS'])
+        rows.append((f'{label}: full filter + sort', [timed(full_sort, filters, 0)[1]
+                                                        for _ in range(args.repeat)]))
+        rows.append((f'{label}: count + page 1', [
+            timed(lambda: (pages.count(first, last, **filters),
+                           pages.page(first, last, 'ROAS', True, 0, 50, **filters)))[1]
+            for _ in range(args.repeat)]))
+        rows.append((f'{label}: next page', [
+            timed(pages.page, first, last, 'ROAS', True, page, 50, **filters)[1]
+            for page in range(1, args.repeat + 1)]))
+    print_timings(f"Campaign table page (50 rows sorted by ROAS), {args.rows:,} campaigns", rows)
+
+
+# ============================================================================
+# BENCHMARK: TOP-K LEADERBOARDS
+# ============================================================================
+def bench_topk(args):
+    """Best k campaigns per segment: sort + groupby.head vs partial selection"""
+    from leaderboard import SEGMENT, top_k
+
+    df = make_cleaned_campaigns(args.rows)
+
+    def full_sort(by):
+        ranked = df.sort_values('ROAS', ascending=False, kind='stable')
+        return ranked.groupby(by, sort=True).head(args.k) if by else ranked.head(args.k)
+
+    rows = []
+    for label, by in [('per segment (140)', SEGMENT), ('per platform', ['platform']), ('overall', [])]:
+        expected, _ = timed(full_sort, by)
+        got = top_k(df, 'ROAS', args.k, by)
+        assert np.isclose(np.sort(df['ROAS'].to_numpy()[got['row']]),
+                          np.sort(expected['ROAS'].to_numpy())).all()
+        rows.append((f'{label}: full sort + head', [timed(full_sort, by)[1] for _ in range(args.repeat)]))
+        rows.append((f'{label}: argpartition', [timed(top_k, df, 'ROAS', args.k, by)[1]
+                                                for _ in range(args.repeat)]))
+    print_timings(f"Top {args.k} campaigns by ROAS, {args.rows:,} campaigns", rows)
+
+
+# ============================================================================
+# BENCHMARK: DAILY SPEND PACING
+# ============================================================================
+def bench_pacing(args):
+    """Paced daily spend per platform: one row per active day vs difference arrays"""
+    from pacing import active_days, daily_pacing
+
+    df = make_cleaned_campaigns(args.rows)
+
+    def explode():
+        first, last = active_days(df)
+        length = last - first + 1
+        campaign = np.repeat(np.arange(len(df)), length)
+        day = first[campaign] + np.arange(len(campaign)) - np.repeat(np.cumsum(length) - length, length)
+        per_day = pd.DataFrame({'platform': df['platform'].to_numpy()[campaign], 'day': day,
+                                'campaign_cost': df['campaign_cost'].to_numpy()[campaign] / length[campaign]})
+        return per_day.groupby(['platform', 'day'])['campaign_cost'].agg(['sum', 'size'])
+
+    expected, _ = timed(explode)
+    paced = daily_pacing(df, ['platform'], measures=['campaign_cost'])
+    paced = paced[paced['active_campaigns'] > 0]
+    assert np.allclose(paced['campaign_cost'], expected['sum'])
+    assert (paced['active_campaigns'].to_numpy() == expected['size'].to_numpy()).all()
+
+    print_timings(f"Daily paced spend + active campaigns per platform, {args.rows:,} campaigns", [
+        (f'one row per active day ({int(expected["size"].sum()):,})',
+         [timed(explode)[1] for _ in range(args.repeat)]),
+        ('difference arrays + cumsum',
+         [timed(daily_pacing, df, ['platform'], ['campaign_cost'])[1] for _ in range(args.repeat)]),
+    ])
+
+
+# ============================================================================
+# BENCHMARK: BATCH FORECASTING
+# ============================================================================
+def bench_forecast(args):
+    """Seasonal trend fits for many monthly series: one at a time vs stacked"""
+    from forecasting import HORIZON, fit_all, fit_series
+
+    rng = np.random.default_rng(4)
+    history = np.arange(np.datetime64('2021-01'), np.datetime64('2021-01') + args.months)
+    future = np.arange(history[-1] + 1, history[-1] + 1 + HORIZON)
+    season = 1 + 0.2 * np.sin(np.arange(args.months) / 12 * 2 * np.pi)
+
+    rows = []
+    for n_series in args.series:
+        Y = rng.gamma(2.0, 5e4, n_series)[None, :] * season[:, None] \
+            * rng.normal(1, 0.1, (args.months, n_series))
+        loop_series = min(n_series, 2_000)
+        _, loop_ms = timed(lambda: [fit_series(history, future, Y[:, [i]]) for i in range(loop_series)])
+        stacked, stacked_ms = timed(fit_all, history, future, Y)
+        assert np.allclose(fit_series(history, future, Y[:, :1])[0], stacked[0][:, :1])
+        rows.append((f'{n_series:,} series: one by one' + (' (est.)' if loop_series < n_series else ''),
+                     [loop_ms * n_series / loop_series]))
+        rows.append((f'{n_series:,} series: stacked lstsq', [stacked_ms]))
+    print_timings(f"Forecast fits, {args.months} months of history, {HORIZON} months ahead", rows)
+
+
+# ============================================================================
+# BENCHMARK: TENANTS UNDER A MEMORY BUDGET
+# ============================================================================
+def bench_tenants(args):
+    """Skewed traffic over several brands whose data does not all fit the budget"""
+    from drill_down import CampaignPages
+    from tenants import DEFAULT_TENANT, TENANTS_FOLDER, TenantRegistry
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_cleaned_csv(folder, args.rows)
+        for brand in range(1, args.tenants):
+            brand_folder = Path(folder) / TENANTS_FOLDER / f'brand_{brand}'
+            brand_folder.mkdir(parents=True)
+            write_cleaned_csv(brand_folder, args.rows, seed=brand)
+
+        registry = TenantRegistry(path)
+        names = registry.names()
+        for name in names:
+            registry.dataset(name)
+        registry.account(names[-1])
+        full_bytes = sum(registry.tenant(name).dataset_bytes for name in names)
+        for name in names:
+            registry.evict(name)
+        registry.max_bytes = int(full_bytes * args.budget)
+
+        # Zipf-like traffic: the first brands get most of the requests
+        rng = np.random.default_rng(7)
+        popularity = 1 / np.arange(1, len(names) + 1)
+        requests = rng.choice(names, args.requests, p=popularity / popularity.sum())
+        resident, cold, peak = [], [], 0
+        for name in requests:
+            was_resident = registry.tenant(name).state() == 'loaded'
+
+            def request():
+                dataset = registry.dataset(name)
+                registry.account(name)
+                return registry.cached(name, 'campaign pages', dataset.version,
+                                       lambda: CampaignPages(dataset.frame), max_entries=1)
+
+            _, ms = timed(request)
+            (resident if was_resident else cold).append(ms)
+            peak = max(peak, registry.bytes_used)
+
+        stats = registry.stats()
+        print_timings(f"{len(names)} tenants × {args.rows:,} rows, budget {args.budget:.0%} "
+                      f"of their {full_bytes / 1e6:,.0f} MB, {args.requests} requests", [
+                          ('request, tenant resident', resident),
+                          ('request, tenant (re)loaded', cold),
+                      ])
+        print(f"Peak memory {peak / 1e6:,.0f} MB of {registry.max_bytes / 1e6:,.0f} MB budget, "
+              f"{registry.evictions} evictions")
+        print(stats[['tenant', 'loads', 'evictions', 'hit_rate', 'data_mb', 'cache_mb']]
+              .to_string(index=False, float_format='{:.2f}'.format))
+        assert peak <= registry.max_bytes
+        assert DEFAULT_TENANT in names
+
+
+# ============================================================================
+# BENCHMARK: STREAMING EXPORT
+# ============================================================================
+def bench_export(args):
+    """Full-history download: filtered copy + encoded bytes in memory vs chunks to disk"""
+    from export import export_file, frame_chunks
+
+    df = make_cleaned_campaigns(args.rows)
+    held = {}
+
+    def in_memory(fmt):
+        rows = df[np.ones(len(df), dtype=bool)]
+        data = rows.to_csv(index=False).encode() if fmt == 'csv' else rows.to_parquet(compression='zstd')
+        held[fmt] = rows.memory_usage(deep=True).sum() + len(data)
+        return data
+
+    def measured_chunks():
+        """frame_chunks, noting the largest chunk held at once"""
+        for rows, done in frame_chunks(df, chunk_rows=args.chunk_rows):
+            held['chunk'] = max(held.get('chunk', 0), rows.memory_usage(deep=True).sum())
+            yield rows, done
+
+    rows, memory = [], []
+    with tempfile.TemporaryDirectory() as folder:
+        for fmt in ['csv', 'parquet']:
+            path = Path(folder) / f'export.{fmt}'
+            _, ms = timed(in_memory, fmt)
+            rows.append((f'{fmt}: in memory', [ms]))
+            memory.append((f'{fmt}: in memory', held[fmt]))
+            _, ms = timed(export_file, measured_chunks(), path, fmt)
+            rows.append((f'{fmt}: streamed, {args.chunk_rows:,}-row chunks', [ms]))
+            memory.append((f'{fmt}: streamed ({path.stat().st_size / 1e6:,.0f} MB file)', held['chunk']))
+            assert len(pd.read_parquet(path) if fmt == 'parquet' else pd.read_csv(path)) == len(df)
+
+    print_timings(f"Export all {args.rows:,} campaigns", rows)
+    print(f"{'case':36} {'MB held':>10}   (filtered rows + encoded file at once)")
+    for label, size in memory:
+        print(f"{label:36} {size / 1e6:10.1f}")
+
+
+# ============================================================================
+# BENCHMARK: CROSS-FILTER CLICKS
+# ============================================================================
+def bench_crossfilter(args):
+    """A chart click answered by re-filtering every row vs from the cube and bitsets"""
+    from cross_filter import SegmentBitsets, restrict
+    from time_index import CampaignTimeIndex, rollup
+
+    columns = ['platform', 'ROAS', 'CAC', 'revenue', 'campaign_type', 'influencer_category']
+    rng = np.random.default_rng(11)
+    for n_rows in args.rows:
+        df = make_cleaned_campaigns(n_rows)
+        index = CampaignTimeIndex.from_frame(df)
+        first, last = df['start_date'].min(), df['start_date'].max()
+        start, end = (first + (last - first) / 4).normalize(), last
+        filters = {'platform': PLATFORMS[:3], 'campaign_type': CAMPAIGN_TYPES,
+                   'influencer_category': CATEGORIES[:5]}
+        clicks = [{'platform': [str(rng.choice(filters['platform']))],
+                   'campaign_type': [str(rng.choice(CAMPAIGN_TYPES))]} for _ in range(args.clicks)]
+
+        def refilter(selection):
+            """What a sidebar change costs: index query plus a mask over every row"""
+            narrowed = {**filters, **selection}
+            totals = index.cell_totals(start, end, **narrowed)
+            mask = ((df['start_date'] >= start) & (df['start_date'] <= end)).to_numpy()
+            for column, allowed in narrowed.items():
+                mask = mask & df[column].isin(allowed).to_numpy()
+            return totals, df.loc[mask, columns]
+
+        bitsets, build_ms = timed(SegmentBitsets, df)
+        base, base_ms = timed(bitsets.base, start, end, **filters)
+        totals = index.cell_totals(start, end, **filters)
+
+        def click(selection):
+            """Cube cells for the grouped charts, bitset AND for the campaign charts"""
+            charts = [rollup(restrict(totals, selection, skip=[by]), by, means=['ROAS'])
+                      for by in ['platform', 'campaign_type']]
+            positions = bitsets.positions(bitsets.select(base, selection))
+            return charts, df[columns].take(positions)
+
+        for selection in clicks[:3]:
+            assert len(click(selection)[1]) == len(refilter(selection)[1])
+        print_timings(f"Cross-filter clicks, {n_rows:,} campaigns", [
+            ('re-filter rows + index query', [timed(refilter, c)[1] for c in clicks]),
+            ('bitsets: build (per data version)', [build_ms]),
+            ('bitsets: sidebar base (per filter)', [base_ms]),
+            ('click: cube cells + bitset AND', [timed(click, c)[1] for c in clicks]),
+        ])
+
+
+# ============================================================================
+# BENCHMARK: CLEANING PIPELINE (PANDAS VS POLARS)
+# ============================================================================
+def bench_cleaning(args):
+    """Both cleaning backends on the same raw CSV, after checking they agree"""
+    from cleaning_pipeline import clean_pandas, clean_polars, collect_polars, compare_outputs
+
+    with tempfile.TemporaryDirectory() as folder:
+        raw_path = Path(folder) / 'influencer_marketing_roi_dataset.csv'
+        raw = make_raw_campaigns(args.rows)
+        pd.concat([raw, raw.iloc[:100]]).to_csv(raw_path, index=False)   # a few duplicates
+        del raw
+
+        problems = compare_outputs(clean_pandas(raw_path), collect_polars(raw_path))
+        assert not problems, problems
+        print(f"✓ Parity: Polars output matches pandas on {args.rows:,} rows")
+
+        out_path = Path(folder) / 'cleaned.csv'
+        cases = {
+            'pandas: clean in memory': lambda: clean_pandas(raw_path),
+            'polars: clean in memory': lambda: clean_polars(raw_path).collect(engine='streaming'),
+            'pandas: clean + write CSV': lambda: clean_pandas(raw_path).to_csv(out_path, index=False),
+            'polars: clean + sink CSV (streaming)': lambda: clean_polars(raw_path).sink_csv(
+                out_path, datetime_format='%Y-%m-%d'),
+            'polars: 3 output columns (pushdown)': lambda: clean_polars(raw_path).select(
+                'platform', 'ROAS', 'CAC').collect(engine='streaming'),
+        }
+        rows = []
+        for label, run in cases.items():
+            rows.append((label, [timed(run)[1] for _ in range(args.repeat)]))
+
+    print_timings(f"Cleaning pipeline ({args.rows:,} rows, {os.cpu_count()} CPU)", rows)
+    medians = {label: statistics.median(times) for label, times in rows}
+    print(f"  speedup, clean in memory:   "
+          f"{medians['pandas: clean in memory'] / medians['polars: clean in memory']:.1f}x")
+    print(f"  speedup, clean + write CSV: "
+          f"{medians['pandas: clean + write CSV'] / medians['polars: clean + sink CSV (streaming)']:.1f}x")
+
+
+# ============================================================================
+# BENCHMARK: JSON AGGREGATE API UNDER LOAD
+# ============================================================================
+def _serve_api(path, workers, ready):
+    """Run aggregate_api in its own process and report the port it bound"""
+    from aggregate_api import AggregateServer, load_service
+
+    server = AggregateServer(('127.0.0.1', 0), load_service(path), workers=workers)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+def _api_urls(rng, count, first_day, span):
+    """Dashboard-like requests: random endpoints, date ranges, platforms and AOV"""
+    endpoints = ['/kpis', '/roas?by=platform', '/cac?by=influencer_category',
+                 '/cac/trend?by=platform', '/allocation?by=segment']
+    urls = []
+    for _ in range(count):
+        start, end = sorted(first_day + pd.Timedelta(days=int(d)) for d in rng.integers(0, span, 2))
+        platforms = ','.join(rng.choice(PLATFORMS, rng.integers(1, 5), replace=False))
+        endpoint = endpoints[rng.integers(len(endpoints))]
+        urls.append(f"{endpoint}{'&' if '?' in endpoint else '?'}start={start.date()}&end={end.date()}"
+                    f"&platform={platforms}&aov={rng.integers(30, 71)}")
+    return urls
+
+
+def _api_load(port, urls, clients, duration, etags=None):
+    """Request urls round-robin from client threads for duration seconds
+
+    Each client keeps one keep-alive connection. With etags, requests carry
+    If-None-Match. Returns (latencies in ms, Counter of status codes).
+    """
+    import collections
+    import http.client
+    import threading
+
+    deadline = time.perf_counter() + duration
+    results = [([], collections.Counter()) for _ in range(clients)]
+
+    def client(number):
+        latencies, statuses = results[number]
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        position = number
+        while time.perf_counter() < deadline and position < len(urls):
+            url = urls[position]
+            position += clients
+            headers = {'If-None-Match': etags[url]} if etags else {}
+            started = time.perf_counter()
+            connection.request('GET', url, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[response.status] += 1
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies = [ms for samples, _ in results for ms in samples]
+    return latencies, sum((statuses for _, statuses in results), collections.Counter())
+
+
+def bench_api(args):
+    """Sustained requests/sec and latency of aggregate_api: misses, hits and 304s"""
+    import http.client
+    import multiprocessing
+
+    rng = np.random.default_rng(5)
+    span = min(args.rows, 80_000)
+    first_day = pd.Timestamp('2022-01-01')
+    context = multiprocessing.get_context('spawn')
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = write_cleaned_csv(folder, args.rows)
+        ready = context.Queue()
+        server = context.Process(target=_serve_api, args=(path, args.workers, ready), daemon=True)
+        server.start()
+        try:
+            port = ready.get(timeout=600)
+
+            # Every request new (cache misses), then a small set repeated
+            # (cache hits), then the same set revalidated with its ETags (304s)
+            cold_urls = _api_urls(rng, 20_000, first_day, span)
+            hot_urls = _api_urls(rng, 50, first_day, span)
+            etags = {}
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            for url in hot_urls:
+                connection.request('GET', url)
+                response = connection.getresponse()
+                response.read()
+                etags[url] = response.getheader('ETag')
+            connection.close()
+
+            phases = {
+                'cache miss (new query)': _api_load(port, cold_urls, args.clients, args.duration),
+                'cache hit (200, full body)': _api_load(port, hot_urls * 100_000, args.clients,
+                                                        args.duration),
+                'revalidated (304, ETag)': _api_load(port, hot_urls * 100_000, args.clients,
+                                                     args.duration, etags),
+            }
+        finally:
+            server.terminate()
+            server.join()
+
+    print_timings(f"Aggregate API ({args.rows:,} rows, {args.workers} workers, "
+                  f"{args.clients} clients, {os.cpu_count()} CPU)",
+                  [(label, latencies) for label, (latencies, _) in phases.items()])
+    for label, (latencies, statuses) in phases.items():
+        codes = ', '.join(f"{count:,} x {status}" for status, count in sorted(statuses.items()))
+        print(f"  {label:34} {len(latencies) / args.duration:8,.0f} requests/sec  ({codes})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    rerun = commands.add_parser('rerun', help='dashboard rerun latency per section')
+    rerun.add_argument('--rows', type=int, default=87_743)
+    rerun.add_argument('--repeat', type=int, default=5)
+    rerun.set_defaults(func=bench_rerun)
+
+    sessions = commands.add_parser('sessions', help='concurrent dashboard sessions (headless)')
+    sessions.add_argument('--rows', type=int, default=87_743)
+    sessions.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 16])
+    sessions.add_argument('--steps', type=int, default=20, help='filter changes per session')
+    sessions.add_argument('--mode', choices=['threads', 'processes'], default='threads')
+    sessions.set_defaults(func=bench_sessions)
+
+    daterange = commands.add_parser('daterange', help='date-range KPIs: row scan vs index')
+    daterange.add_argument('--rows', type=int, default=1_000_000)
+    daterange.add_argument('--repeat', type=int, default=20)
+    daterange.set_defaults(func=bench_daterange)
+
+    optimizer = commands.add_parser('optimizer', help='budget optimizer solve time')
+    optimizer.add_argument('--repeat', type=int, default=20)
+    optimizer.set_defaults(func=bench_optimizer)
+
+    bootstrap = commands.add_parser('bootstrap', help='bootstrap confidence intervals')
+    bootstrap.add_argument('--rows', type=int, default=1_000_000)
+    bootstrap.add_argument('--resamples', type=int, default=10_000)
+    bootstrap.add_argument('--repeat', type=int, default=1)
+    bootstrap.set_defaults(func=bench_bootstrap)
+
+    approx = commands.add_parser('approx', help='first paint from the stratified sample')
+    approx.add_argument('--rows', type=int, default=2_000_000)
+    approx.add_argument('--repeat', type=int, default=3)
+    approx.set_defaults(func=bench_approximate)
+
+    engines = commands.add_parser('engines', help='pandas vs DuckDB backend')
+    engines.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    engines.add_argument('--repeat', type=int, default=10)
+    engines.set_defaults(func=bench_engines)
+
+    reload = commands.add_parser('reload', help='incremental refresh of appended data')
+    reload.add_argument('--rows', type=int, default=1_000_000)
+    reload.add_argument('--append', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    reload.add_argument('--repeat', type=int, default=3)
+    reload.set_defaults(func=bench_reload)
+
+    startup = commands.add_parser('startup', help='cold load from the CSV vs the snapshot')
+    startup.add_argument('--rows', type=int, nargs='+', default=[87_743, 1_000_000])
+    startup.add_argument('--repeat', type=int, default=3)
+    startup.set_defaults(func=bench_startup)
+
+    drilldown = commands.add_parser('drilldown', help='paginated campaign table vs full sort')
+    drilldown.add_argument('--rows', type=int, default=1_000_000)
+    drilldown.add_argument('--repeat', type=int, default=5)
+    drilldown.set_defaults(func=bench_drilldown)
+
+    topk = commands.add_parser('topk', help='per-segment top-K leaderboards')
+    topk.add_argument('--rows', type=int, default=1_000_000)
+    topk.add_argument('--k', type=int, default=5)
+    topk.add_argument('--repeat', type=int, default=5)
+    topk.set_defaults(func=bench_topk)
+
+    pacing = commands.add_parser('pacing', help='daily spend pacing and active campaigns')
+    pacing.add_argument('--rows', type=int, default=1_000_000)
+    pacing.add_argument('--repeat', type=int, default=3)
+    pacing.set_defaults(func=bench_pacing)
+
+    forecast = commands.add_parser('forecast', help='batch segment forecasting')
+    forecast.add_argument('--series', type=int, nargs='+', default=[140, 10_000, 100_000])
+    forecast.add_argument('--months', type=int, default=36)
+    forecast.set_defaults(func=bench_forecast)
+
+    tenants = commands.add_parser('tenants', help='several tenants sharing one memory budget')
+    tenants.add_argument('--tenants', type=int, default=6)
+    tenants.add_argument('--rows', type=int, default=200_000, help='campaigns per tenant')
+    tenants.add_argument('--budget', type=float, default=0.5, help='budget as a share of all data')
+    tenants.add_argument('--requests', type=int, default=200)
+    tenants.set_defaults(func=bench_tenants)
+
+    export = commands.add_parser('export', help='streaming export of the filtered campaigns')
+    export.add_argument('--rows', type=int, default=1_000_000)
+    export.add_argument('--chunk-rows', type=int, default=100_000)
+    export.set_defaults(func=bench_export)
+
+    crossfilter = commands.add_parser('crossfilter', help='cross-filter clicks between charts')
+    crossfilter.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 5_000_000])
+    crossfilter.add_argument('--clicks', type=int, default=20)
+    crossfilter.set_defaults(func=bench_crossfilter)
+
+    cleaning = commands.add_parser('cleaning', help='cleaning pipeline: pandas vs Polars')
+    cleaning.add_argument('--rows', type=int, default=1_000_000)
+    cleaning.add_argument('--repeat', type=int, default=3)
+    cleaning.set_defaults(func=bench_cleaning)
+
+    api = commands.add_parser('api', help='JSON aggregate API load test')
+    api.add_argument('--rows', type=int, default=1_000_000)
+    api.add_argument('--workers', type=int, default=8)
+    api.add_argument('--clients', type=int, default=8)
+    api.add_argument('--duration', type=float, default=5.0, help='seconds per phase')
+    api.set_defaults(func=bench_api)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+"""
+PARTITIONED, PRE-AGGREGATED EXTRACT FOR TABLEAU / POWER BI
+==========================================================
+TABLEAU_DASHBOARD_GUIDE.md imports the flat cleaned CSV into an extract
+and rebuilds its calculated fields (Overall ROAS, Average CAC, Efficiency
+Score, Year-Month, Budget Recommendation, ...) over every raw row, on
+every refresh. This exporter does that work once, at the dashboard grain:
+
+    bi_extract/
+        campaigns/year=2023/month=04/platform=Instagram/part-0.parquet
+        aggregates/segment_monthly.parquet    month × platform × type × category
+        aggregates/platform_monthly.parquet   month × platform      (trend sheets)
+        aggregates/platform_summary.parquet   platform              (KPI / budget sheets)
+        aggregates/segment_forecast.parquet   next quarter × segment (forecasting.py)
+        aggregates/*.csv                      the same tables, for tools without Parquet
+        _manifest.json                        partitions, fingerprints, column stats
+
+Campaign rows are split into Hive-style year/month/platform partitions
+(the partition columns live in the path, as Spark, DuckDB and pyarrow
+expect). Parquet keeps min/max statistics per column chunk, and the
+manifest repeats them per partition so a reader can skip partitions
+without opening them.
+
+The aggregate tables carry every additive sum (revenue, campaign_cost,
+ROAS_sum, CAC_sum, campaigns, ...) next to the calculated fields, so a
+BI tool can re-aggregate to any coarser grain with SUM() and divide, and
+the ready-made ratios are exact at each table's own grain.
+
+Refreshes are incremental: each partition's fingerprint (a hash of its
+rows) is kept in the manifest and only new or changed partitions are
+rewritten; partitions whose rows disappeared are deleted. The aggregate
+tables (thousands of rows, not the campaign history) are rewritten every
+time.
+
+HOW TO RUN:
+    python bi_extract.py                          # export or refresh bi_extract/
+    python bi_extract.py --output extract --full  # rewrite every partition
+
+Prerequisites: Run 01_data_cleaning_tutorial.py first!
+"""
+
+import argparse
+import json
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from campaign_dataset import CLEANED_FILE, CampaignDataset
+from forecasting import forecast_monthly
+from time_index import COUNT, DIMENSIONS, MEASURES, rollup
+
+EXTRACT_FOLDER = 'bi_extract'
+MANIFEST_FILE = '_manifest.json'
+PARTITION_COLUMNS = ['year', 'month', 'platform']
+COMPRESSION = 'zstd'
+
+# Per-campaign values the guide averages: stored as sums, averaged per row
+MEAN_MEASURES = ['ROAS', 'CAC', 'engagement_rate', 'conversion_rate']
+
+# Thresholds of the guide's "ROAS Status" and "Budget Recommendation" fields
+ROAS_STATUS = [(10, 'Excellent (≥10x)'), (5, 'Good (5-10x)'), (2, 'Fair (2-5x)')]
+ROAS_STATUS_BELOW = 'Poor (<2x)'
+BUDGET_RECOMMENDATION = [(30, 'Increase Budget'), (20, 'Maintain')]
+BUDGET_RECOMMENDATION_BELOW = 'Decrease Budget'
+
+
+# ============================================================================
+# CAMPAIGN PARTITIONS
+# ============================================================================
+def partition_keys(df):
+    """(year, month, platform) of every campaign row"""
+    return pd.DataFrame({
+        'year': df['start_date'].dt.year.to_numpy(),
+        'month': df['start_date'].dt.month.to_numpy(),
+        'platform': df['platform'].to_numpy(),
+    })
+
+
+def partition_path(year, month, platform):
+    """Hive-style relative folder of one partition"""
+    return f"year={year}/month={month:02d}/platform={quote(str(platform), safe='')}"
+
+
+def partition_fingerprints(df, keys):
+    """Row order grouped by partition, group starts, and a content hash per partition"""
+    codes = keys.groupby(PARTITION_COLUMNS, sort=True).ngroup().to_numpy()
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    order = np.argsort(codes, kind='stable')
+    starts = np.flatnonzero(np.r_[True, np.diff(codes[order]) != 0])
+    sums = np.add.reduceat(row_hashes[order], starts)      # uint64, wraps around
+    counts = np.diff(np.r_[starts, len(codes)])
+    return order, starts, [f'{count}:{total:016x}' for count, total in zip(counts, sums)]
+
+
+def column_stats(rows):
+    """[min, max] of the dates and measures in rows (JSON-friendly)"""
+    stats = {}
+    for column in ['start_date', 'end_date'] + MEASURES:
+        if column in rows:
+            low, high = rows[column].min(), rows[column].max()
+            if isinstance(low, pd.Timestamp):
+                stats[column] = [low.date().isoformat(), high.date().isoformat()]
+            else:
+                stats[column] = [float(low), float(high)]
+    return stats
+
+
+def write_partitions(df, folder, previous, full=False):
+    """Write new or changed partitions under folder/campaigns; returns the manifest entries"""
+    root = Path(folder) / 'campaigns'
+    keys = partition_keys(df)
+    stored = df.drop(columns=[c for c in PARTITION_COLUMNS if c in df])
+    order, starts, fingerprints = partition_fingerprints(stored, keys)
+
+    partitions, written = {}, 0
+    ends = np.r_[starts[1:], len(order)]
+    for start, end, fingerprint in zip(starts, ends, fingerprints):
+        positions = order[start:end]
+        year, month, platform = keys.iloc[positions[0]]
+        path = partition_path(year, month, platform)
+        entry = previous.get(path)
+        if (not full and entry is not None and entry['fingerprint'] == fingerprint
+                and (root / path / 'part-0.parquet').exists()):
+            partitions[path] = entry
+            continue
+
+        rows = stored.iloc[positions]
+        (root / path).mkdir(parents=True, exist_ok=True)
+        pq.write_table(pa.Table.from_pandas(rows, preserve_index=False),
+                       root / path / 'part-0.parquet',
+                       compression=COMPRESSION, write_statistics=True)
+        partitions[path] = {'year': int(year), 'month': int(month), 'platform': platform,
+                            'rows': len(rows), 'fingerprint': fingerprint,
+                            'stats': column_stats(rows)}
+        written += 1
+
+    removed = [path for path in previous if path not in partitions]
+    for path in removed:
+        shutil.rmtree(root / path, ignore_errors=True)
+        for parent in list((root / path).parents)[:2]:     # empty month / year folders
+            if parent.exists() and not any(parent.iterdir()):
+                parent.rmdir()
+    return partitions, written, removed
+
+
+# ============================================================================
+# PRE-AGGREGATED TABLES WITH THE GUIDE'S CALCULATED FIELDS
+# ============================================================================
+def add_calculated_fields(sums):
+    """The guide's calculated fields from additive sums (one row per group)"""
+    table = sums.rename(columns={m: f'{m}_sum' for m in MEAN_MEASURES})
+    table[COUNT] = table[COUNT].round().astype('int64')
+    cost, campaigns = table['campaign_cost'], table[COUNT]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table['overall_roas'] = table['revenue'] / cost
+        table['roi_pct'] = (table['revenue'] - cost) / cost * 100
+        for measure in MEAN_MEASURES:
+            table[f'average_{measure.lower()}'] = table[f'{measure}_sum'] / campaigns
+        table['efficiency_score'] = table['average_roas'] / table['average_cac']
+
+    table['roas_status'] = np.select([table['average_roas'] >= limit for limit, _ in ROAS_STATUS],
+                                     [label for _, label in ROAS_STATUS], ROAS_STATUS_BELOW)
+    table['budget_recommendation'] = np.select(
+        [table['efficiency_score'] >= limit for limit, _ in BUDGET_RECOMMENDATION],
+        [label for _, label in BUDGET_RECOMMENDATION], BUDGET_RECOMMENDATION_BELOW)
+
+    if 'month' in table:
+        table.insert(0, 'year_month', table['month'].dt.strftime('%Y-%m'))
+        table.insert(1, 'month_name', table['month'].dt.month_name())
+        table = table.rename(columns={'month': 'month_start'})
+    return table
+
+
+def aggregate_tables(index):
+    """segment_monthly, platform_monthly, platform_summary and segment_forecast from the time index"""
+    first = pd.Timestamp(index.first_day, unit='D')
+    last = pd.Timestamp(index.last_day, unit='D')
+    monthly = index.monthly(first, last)
+
+    segment_monthly = rollup(monthly, ['month'] + DIMENSIONS, sums=MEASURES).reset_index()
+    platform_monthly = rollup(monthly, ['month', 'platform'], sums=MEASURES).reset_index()
+    platform_summary = add_calculated_fields(
+        rollup(monthly, 'platform', sums=MEASURES).reset_index()
+    )
+
+    # Sheet 8 / 14 fields: need every platform at once (table calcs in the guide)
+    best = platform_summary['efficiency_score'].max()
+    platform_summary['is_best_platform'] = np.where(
+        platform_summary['efficiency_score'] == best, 'Best', 'Other')
+    platform_summary['current_budget_pct'] = (
+        platform_summary['campaign_cost'] / platform_summary['campaign_cost'].sum() * 100)
+    platform_summary['recommended_budget_pct'] = (
+        platform_summary['efficiency_score'] / platform_summary['efficiency_score'].sum() * 100)
+
+    return {
+        'segment_monthly': add_calculated_fields(segment_monthly),
+        'platform_monthly': add_calculated_fields(platform_monthly),
+        'platform_summary': platform_summary,
+        'segment_forecast': forecast_monthly(monthly, DIMENSIONS, last_day=last),
+    }
+
+
+def write_aggregates(tables, folder):
+    """Each table as Parquet and CSV under folder/aggregates; returns their sizes"""
+    root = Path(folder) / 'aggregates'
+    root.mkdir(parents=True, exist_ok=True)
+    sizes = {}
+    for name, table in tables.items():
+        parquet_path, csv_path = root / f'{name}.parquet', root / f'{name}.csv'
+        pq.write_table(pa.Table.from_pandas(table, preserve_index=False), parquet_path,
+                       compression=COMPRESSION, write_statistics=True)
+        table.to_csv(csv_path, index=False, date_format='%Y-%m-%d')
+        sizes[name] = {'rows': len(table), 'parquet_bytes': parquet_path.stat().st_size,
+                       'csv_bytes': csv_path.stat().st_size}
+    return sizes
+
+
+# ============================================================================
+# EXPORT / REFRESH
+# ============================================================================
+def export(dataset, folder=EXTRACT_FOLDER, full=False):
+    """Refresh the extract in folder from a CampaignDataset; returns the new manifest"""
+    started = time.perf_counter()
+    folder = Path(folder)
+    manifest_path = folder / MANIFEST_FILE
+    previous = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    old_partitions = previous.get('partitions', {})
+    columns = [c for c in dataset.frame.columns if c not in PARTITION_COLUMNS]
+    if previous.get('columns') != columns:
+        full = True                          # a schema change invalidates every file
+        shutil.rmtree(folder / 'campaigns', ignore_errors=True)
+        old_partitions = {}
+
+    # Even a full rewrite gets the old partitions: BI tools read the folder, not
+    # the manifest, so partitions without rows any more must be deleted
+    partitions, written, removed = write_partitions(dataset.frame, folder, old_partitions, full)
+    aggregates = write_aggregates(aggregate_tables(dataset.index), folder)
+
+    manifest = {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'source': str(dataset.path),
+        'rows': len(dataset.frame),
+        'columns': columns,
+        'partitioning': PARTITION_COLUMNS,
+        'partitions': partitions,
+        'aggregates': aggregates,
+        'last_refresh': {'written': written, 'unchanged': len(partitions) - written,
+                         'removed': len(removed), 'full': full,
+                         'seconds': round(time.perf_counter() - started, 3)},
+    }
+    partial = manifest_path.with_suffix('.tmp')
+    partial.write_text(json.dumps(manifest, indent=1))
+    partial.replace(manifest_path)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', default=CLEANED_FILE)
+    parser.add_argument('--output', default=EXTRACT_FOLDER)
+    parser.add_argument('--full', action='store_true', help='rewrite every partition')
+    args = parser.parse_args()
+
+    try:
+        dataset = CampaignDataset.load(args.input)
+    except FileNotFoundError:
+        raise SystemExit("❌ Error: Please run 01_data_cleaning_tutorial.py first!")
+
+    manifest = export(dataset, args.output, full=args.full)
+    refresh = manifest['last_refresh']
+    print(f"✓ {manifest['rows']:,} campaigns in {len(manifest['partitions']):,} partitions: "
+          f"{refresh['written']:,} written, {refresh['unchanged']:,} unchanged, "
+          f"{refresh['removed']:,} removed ({refresh['seconds']:.1f} s)")
+    for name, size in manifest['aggregates'].items():
+        print(f"✓ aggregates/{name}: {size['rows']:,} rows, "
+              f"{size['parquet_bytes'] / 1024:,.1f} KB Parquet")
+
+
+if __name__ == '__main__':
+    main()
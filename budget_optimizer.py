@@ -0,0 +1,149 @@
+"""
+CONSTRAINED BUDGET ALLOCATION OPTIMIZER
+=======================================
+The original recommendation split the budget in proportion to each
+platform's efficiency score (ROAS / CAC). That ignores diminishing returns:
+doubling spend on a platform does not double its revenue.
+
+This module gives every segment (by default platform × influencer_category
+× campaign_type) a response curve with diminishing returns
+
+    revenue(spend) = R0 × (spend / S0) ** b        0 < b < 1
+
+anchored at the segment's historical spend S0 and revenue R0. The
+elasticity b is fitted from campaign-level history (log revenue against
+log cost, one least-squares line per segment) and shrunk towards the pooled
+elasticity when a segment has few campaigns.
+
+Maximizing total revenue for a fixed budget with per-segment min/max spend
+has a closed-form answer for a given "price" λ of one extra dollar:
+
+    spend_i(λ) = clip((a_i × b_i / λ) ** (1 / (1 - b_i)), min_i, max_i)
+
+Total spend falls as λ rises, so we bisect on λ until the budget is used.
+Every step is a numpy operation over all segments at once, so thousands of
+segments solve in a few milliseconds - fast enough for live sliders.
+"""
+
+import numpy as np
+import pandas as pd
+
+SEGMENT = ['platform', 'influencer_category', 'campaign_type']
+
+ELASTICITY_BOUNDS = (0.05, 0.95)   # keep curves concave and well-behaved
+PRIOR_CAMPAIGNS = 30                # shrinkage weight of the pooled elasticity
+
+
+def fit_elasticities(df, by=SEGMENT, prior_campaigns=PRIOR_CAMPAIGNS,
+                     bounds=ELASTICITY_BOUNDS):
+    """Revenue elasticity of spend per segment from campaign-level history
+
+    Fits log(revenue) = c + b × log(campaign_cost) for every segment at once
+    using grouped sums (no Python loop over segments). Rescaling revenue or
+    cost by a constant (the what-if AOV/CPM assumptions) only moves c, so
+    the elasticities stay valid under any assumptions.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    usable = df[(df['revenue'] > 0) & (df['campaign_cost'] > 0)]
+    codes, segments = pd.MultiIndex.from_frame(usable[by]).factorize()
+
+    x = np.log(usable['campaign_cost'].to_numpy(np.float64))
+    y = np.log(usable['revenue'].to_numpy(np.float64))
+    count = np.bincount(codes).astype(np.float64)
+    sx, sy = np.bincount(codes, x), np.bincount(codes, y)
+    sxx, sxy = np.bincount(codes, x * x), np.bincount(codes, x * y)
+
+    var_x = sxx - sx * sx / count
+    cov_xy = sxy - sx * sy / count
+    with np.errstate(divide='ignore', invalid='ignore'):
+        raw = np.where(var_x > 0, cov_xy / var_x, np.nan)
+
+    pooled_var = x.var() * len(x)
+    pooled = ((x - x.mean()) * (y - y.mean())).sum() / pooled_var if pooled_var > 0 else 0.5
+    pooled = float(np.clip(pooled, *bounds))
+
+    raw = np.where(np.isnan(raw), pooled, raw)
+    shrunk = (count * raw + prior_campaigns * pooled) / (count + prior_campaigns)
+
+    return pd.DataFrame(
+        {'elasticity': np.clip(shrunk, *bounds), 'fitted_campaigns': count.astype(int)},
+        index=pd.MultiIndex.from_tuples(list(segments), names=by) if len(by) > 1
+        else pd.Index([s[0] for s in segments], name=by[0]),
+    )
+
+
+def response_curves(totals, elasticities, pooled=0.5):
+    """Anchor each segment's curve at its current spend and revenue
+
+    totals: current campaign_cost and revenue per segment (indexed like
+    elasticities, e.g. the output of time_index.rollup).
+    """
+    curves = totals[['campaign_cost', 'revenue']].copy()
+    curves = curves[(curves['campaign_cost'] > 0) & (curves['revenue'] > 0)]
+    curves['elasticity'] = elasticities['elasticity'].reindex(curves.index).fillna(pooled)
+    return curves
+
+
+def optimize_allocation(curves, budget, min_spend=None, max_spend=None, iterations=100):
+    """Revenue-maximizing spend per segment for a total budget
+
+    curves: output of response_curves()
+    min_spend / max_spend: per-segment bounds (scalars or arrays aligned with
+    curves); default 0 and the whole budget.
+    Returns curves with recommended_spend, expected_revenue and marginal_roas
+    (no rows when there are no segments, e.g. filters that match nothing).
+    """
+    if len(curves) == 0:
+        return curves.assign(recommended_spend=0.0, expected_revenue=0.0, marginal_roas=0.0)
+    spend0 = curves['campaign_cost'].to_numpy(np.float64)
+    revenue0 = curves['revenue'].to_numpy(np.float64)
+    b = curves['elasticity'].to_numpy(np.float64)
+    n = len(curves)
+
+    lo = np.broadcast_to(np.float64(0.0) if min_spend is None else min_spend, n).astype(np.float64)
+    hi = np.broadcast_to(np.float64(budget) if max_spend is None else max_spend, n).astype(np.float64)
+    if lo.sum() > budget * (1 + 1e-9) or hi.sum() < budget * (1 - 1e-9):
+        raise ValueError(
+            f"Budget ${budget:,.0f} is outside the feasible range "
+            f"${lo.sum():,.0f} - ${hi.sum():,.0f} set by the spend limits"
+        )
+
+    # revenue = a × spend**b with a chosen so the curve passes through (S0, R0)
+    log_ab = np.log(revenue0) - b * np.log(spend0) + np.log(b)
+    tiny = np.maximum(lo, budget * 1e-12)
+
+    def spend_at(log_price):
+        return np.clip(np.exp((log_ab - log_price) / (1 - b)), lo, hi)
+
+    # Marginal revenue is a*b*x**(b-1); bracket λ between its extremes
+    log_low = np.min(log_ab + (b - 1) * np.log(np.maximum(hi, tiny))) - 1.0
+    log_high = np.max(log_ab + (b - 1) * np.log(tiny)) + 1.0
+    for _ in range(iterations):
+        middle = 0.5 * (log_low + log_high)
+        if spend_at(middle).sum() > budget:
+            log_low = middle
+        else:
+            log_high = middle
+    spend = spend_at(0.5 * (log_low + log_high))
+
+    # Hand the last few cents of rounding to segments that are not at a limit
+    free = (spend > lo) & (spend < hi)
+    if free.any():
+        spend[free] += (budget - spend.sum()) * spend[free] / spend[free].sum()
+        spend = np.clip(spend, lo, hi)
+
+    result = curves.copy()
+    result['recommended_spend'] = spend
+    result['expected_revenue'] = revenue0 * (spend / spend0) ** b
+    result['marginal_roas'] = b * result['expected_revenue'] / spend
+    return result
+
+
+def recommend(totals, elasticities, budget=None, min_ratio=0.5, max_ratio=2.0):
+    """Optimized allocation with each segment kept within [min, max] × current spend"""
+    curves = response_curves(totals, elasticities)
+    current = curves['campaign_cost'].to_numpy(np.float64)
+    budget = current.sum() if budget is None else budget
+    return optimize_allocation(curves, budget,
+                               min_spend=current * min_ratio,
+                               max_spend=current * max_ratio)
@@ -0,0 +1,299 @@
+"""
+CLEANED CAMPAIGNS WITH INCREMENTAL (HOT) RELOAD
+===============================================
+The dashboard used to read influencer_marketing_cleaned.csv once and cache
+it forever: new data needed a server restart and a full re-read.
+
+CampaignDataset keeps a manifest of the files it has loaded:
+
+    influencer_marketing_cleaned.csv          01's output (may grow by appends)
+    influencer_marketing_cleaned_*.csv        extra partitions (e.g. _2024-07.csv)
+
+with, per file (by name), the bytes consumed so far and fingerprints (hashes of the
+first 64 KB and of the 4 KB before the end of what was read). refresh()
+compares the files against it:
+
+    - unchanged size             nothing to do (one stat() per file)
+    - grown, fingerprints match  rows were appended: parse only the new bytes
+    - new partition file         parse that file
+    - shrunk, rewritten, deleted full reload (the history itself changed)
+
+A refresh stops at the last newline, since a line without one may still
+be being written (it is read once a later append terminates it). A full
+load reads every line, so a file whose last row lacks a newline keeps it.
+
+New rows are appended to the time index (a new chunk, see time_index.py)
+and to the campaign frame, so the refresh parses and indexes only the
+delta. Each refresh bumps `version` and records the days it touched;
+range_version(start, end) tells a cache whether its date range saw new
+data, so only the affected entries are recomputed.
+
+Live campaign reports (see live_feed.py) go through apply_updates(): a
+report replaces the campaign's row with the same campaign_id (or adds the
+campaign). The index gets the old row with weight -1 plus the new row, so
+the sums change by the difference and the campaign is counted once.
+
+Cold start: load() first tries the snapshot written by the cleaning stage
+(see snapshot.py). Its manifest is checked like any refresh: if the files
+only grew since, the snapshot is used and just the appended rows are
+parsed; if they were rewritten, the CSV files are read as before. A
+refresh that finds the files rewritten also tries the snapshot first.
+
+Usage:
+    dataset = CampaignDataset.load()
+    dataset.loaded_from                 # 'snapshot', 'snapshot + delta' or 'csv'
+    dataset.save_snapshot()             # end of the cleaning stage
+    change = dataset.refresh()          # {'rows': 1200, 'files': [...], ...} or None
+    dataset.range_version('2024-01-01', '2024-03-31')
+"""
+
+import hashlib
+import threading
+import time
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+
+import pandas as pd
+
+from snapshot import SnapshotError, read_snapshot, snapshot_path, write_snapshot
+from time_index import DIMENSIONS, WEIGHT, CampaignTimeIndex, to_day
+
+CLEANED_FILE = 'influencer_marketing_cleaned.csv'
+HEAD_BYTES = 64 * 1024
+TAIL_BYTES = 4 * 1024
+
+
+def read_cleaned(source):
+    """Parse cleaned campaign CSV data (a path or bytes) with typed dates"""
+    df = pd.read_csv(BytesIO(source) if isinstance(source, bytes) else source)
+    df['start_date'] = pd.to_datetime(df['start_date'])
+    df['end_date'] = pd.to_datetime(df['end_date'])
+    return df
+
+
+def _fingerprints(path, size):
+    """Hashes of the start of a file and of the bytes just before `size`"""
+    with open(path, 'rb') as data:
+        head = data.read(min(HEAD_BYTES, size))
+        data.seek(max(0, size - TAIL_BYTES))
+        tail = data.read(size - max(0, size - TAIL_BYTES))
+    return hashlib.blake2b(head).hexdigest(), hashlib.blake2b(tail).hexdigest()
+
+
+class CampaignDataset:
+    """Cleaned campaigns and their time index, refreshed from a file manifest"""
+
+    def __init__(self, path=CLEANED_FILE):
+        self.path = Path(path)
+        self.frame = None
+        self.index = None
+        self.manifest = {}
+        self.version = 0
+        self.last_change = None     # what the latest refresh() returned
+        self.loaded_from = None     # 'snapshot', 'snapshot + delta' or 'csv'
+        self.defaults = None        # default-state aggregates from the snapshot
+        self._base_version = 0      # ranges older than a full reload are all stale
+        self._changes = []          # (version, first_day, last_day) of each delta
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=CLEANED_FILE, use_snapshot=True):
+        """Restore the snapshot if it matches the files, else read them all"""
+        dataset = cls(path)
+        if not (use_snapshot and dataset._load_snapshot()):
+            dataset._full_load()
+        return dataset
+
+    def files(self):
+        """The main CSV (must exist) followed by the partition files, in name order"""
+        if not self.path.exists():
+            raise FileNotFoundError(self.path)
+        return [self.path] + sorted(self.path.parent.glob(f'{self.path.stem}_*.csv'))
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def _read(self, path, start=0, partial=False):
+        """Rows of path from byte `start`, plus manifest entry
+
+        partial=True stops at the last complete line: an unterminated last
+        line may still be being written.
+        """
+        with open(path, 'rb') as data:
+            header = data.readline()
+            data.seek(max(start, len(header)))
+            body = data.read()
+        if partial:
+            body = body[:body.rfind(b'\n') + 1]
+        consumed = max(start, len(header)) + len(body)
+        rows = read_cleaned(header + body)
+        head, tail = _fingerprints(path, consumed)
+        return rows, {'size': consumed, 'head': head, 'tail': tail}
+
+    def _read_changes(self, changes):
+        """Rows from every (path, offset) in changes; updates the manifest"""
+        frames = []
+        for path, start in changes:
+            rows, self.manifest[path.name] = self._read(path, start, partial=True)
+            frames.append(rows)
+        return pd.concat(frames, ignore_index=True)
+
+    def _append(self, delta):
+        # Index: one new chunk built from the delta only. Frame: a new
+        # object, so readers of the old one keep a consistent snapshot.
+        self.index.append(delta)
+        self.frame = pd.concat([self.frame, delta], ignore_index=True)
+
+    def _full_load(self):
+        frames, manifest = [], {}
+        for path in self.files():
+            rows, manifest[path.name] = self._read(path)
+            frames.append(rows)
+        self.frame = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        self.index = CampaignTimeIndex.from_frame(self.frame)
+        self.manifest = manifest
+        self.loaded_from = 'csv'
+        self.defaults = None
+
+    def _load_snapshot(self):
+        """Restore frame, index and manifest from the snapshot; False if unusable"""
+        try:
+            snap = read_snapshot(snapshot_path(self.path))
+        except (OSError, SnapshotError):
+            return False
+        self.manifest = snap.meta['manifest']
+        changes = self.changed_files()
+        if changes is None:
+            self.manifest = {}
+            return False                                   # files rewritten since
+
+        self.frame = snap.tables['campaigns']
+        self.index = CampaignTimeIndex.from_arrays(snap.tables['index_cells'],
+                                                   snap.arrays['index_keys'],
+                                                   snap.arrays['index_cumulative'])
+        self.loaded_from = 'snapshot'
+        self.defaults = {
+            'first_day': snap.meta['first_day'],
+            'last_day': snap.meta['last_day'],
+            'cell_totals': snap.tables['default_totals'].astype(dict.fromkeys(DIMENSIONS, object)),
+            'monthly': snap.tables['default_monthly'].astype(dict.fromkeys(DIMENSIONS, object)),
+        }
+        delta = self._read_changes(changes) if changes else None
+        if delta is not None and len(delta):
+            self._append(delta)
+            self.loaded_from = 'snapshot + delta'
+            self.defaults = None
+        return True
+
+    def save_snapshot(self):
+        """Write frame, index, manifest and default-state aggregates next to the CSV"""
+        cells, keys, cumulative = self.index.to_arrays()
+        first_day, last_day = self.index.first_day, self.index.last_day
+        first, last = pd.Timestamp(first_day, unit='D'), pd.Timestamp(last_day, unit='D')
+        return write_snapshot(
+            snapshot_path(self.path),
+            tables={
+                'campaigns': self.frame,
+                'index_cells': cells,
+                'default_totals': self.index.cell_totals(first, last),
+                'default_monthly': self.index.monthly(first, last),
+            },
+            arrays={'index_keys': keys, 'index_cumulative': cumulative},
+            meta={'manifest': self.manifest, 'first_day': first_day, 'last_day': last_day,
+                  'rows': len(self.frame), 'created': datetime.now().isoformat(timespec='seconds')},
+        )
+
+    def changed_files(self):
+        """(path, byte offset to read from) for new data; None if a full reload is needed"""
+        files = self.files()
+        if set(self.manifest) - {path.name for path in files}:
+            return None                                    # a file disappeared
+        changes = []
+        for path in files:
+            entry = self.manifest.get(path.name)
+            if entry is None:
+                changes.append((path, 0))
+                continue
+            size = path.stat().st_size
+            if size == entry['size']:
+                continue
+            if size < entry['size'] or _fingerprints(path, entry['size']) != (entry['head'], entry['tail']):
+                return None                                # rewritten, not appended
+            changes.append((path, entry['size']))
+        return changes
+
+    def refresh(self):
+        """Load whatever changed since the last (re)load; None when nothing did
+
+        Returns {'rows', 'files', 'first_day', 'last_day', 'full_reload', 'ms'}.
+        One caller does the work; concurrent callers return None at once.
+        """
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            started = time.perf_counter()
+            changes = self.changed_files()
+            if changes == []:
+                return None
+
+            if changes is None:
+                if not self._load_snapshot():       # the new snapshot, if written yet
+                    self._full_load()
+                self.version += 1
+                self._base_version = self.version
+                self._changes = []
+                delta = self.frame
+            else:
+                delta = self._read_changes(changes)
+                if len(delta) == 0:
+                    return None
+                self._append(delta)
+                self.defaults = None                # computed before these rows existed
+                self.version += 1
+                self._changes.append((self.version, to_day(delta['start_date'].min()),
+                                      to_day(delta['start_date'].max())))
+
+            self.last_change = {
+                'rows': len(delta),
+                'files': [str(path) for path, _ in changes] if changes else [str(p) for p in self.files()],
+                'first_day': delta['start_date'].min(),
+                'last_day': delta['start_date'].max(),
+                'full_reload': changes is None,
+                'ms': (time.perf_counter() - started) * 1000,
+            }
+            return self.last_change
+        finally:
+            self._lock.release()
+
+    def apply_updates(self, updates):
+        """Replace campaigns by their latest report (unknown campaign_ids are added); returns rows changed
+
+        updates are derived campaign rows (cleaning_pipeline.derive_metrics);
+        the last report of a campaign_id in the batch wins.
+        """
+        updates = updates.drop_duplicates('campaign_id', keep='last')
+        if len(updates) == 0:
+            return 0
+        with self._lock:
+            superseded = self.frame['campaign_id'].isin(updates['campaign_id']).to_numpy()
+            replaced = self.frame[superseded]
+
+            # Index: retract the old rows, add the new ones (one chunk)
+            self.index.append(pd.concat([replaced.assign(**{WEIGHT: -1.0}),
+                                         updates.assign(**{WEIGHT: 1.0})], ignore_index=True))
+            # Frame: a new object, as in _append
+            rows = updates.reindex(columns=self.frame.columns)
+            self.frame = pd.concat([self.frame[~superseded], rows], ignore_index=True)
+
+            self.defaults = None
+            self.version += 1
+            days = pd.concat([replaced['start_date'], updates['start_date']])
+            self._changes.append((self.version, to_day(days.min()), to_day(days.max())))
+            return len(updates)
+
+    def range_version(self, start, end):
+        """Latest version that changed data in [start, end] (cache key for range results)"""
+        start_day, end_day = to_day(start), to_day(end)
+        return max([self._base_version] + [version for version, first, last in self._changes
+                                           if first <= end_day and last >= start_day])
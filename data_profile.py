@@ -0,0 +1,531 @@
+"""
+STREAMING DATA PROFILE
+======================
+01's inspection step ran df.describe(), df.isnull().sum() (twice) and
+df.dtypes (twice) over a fully loaded frame: several passes, and only for
+files that fit in memory. DataProfile reads a CSV in chunks, once, and
+keeps a small mergeable summary per column:
+
+    count, nulls, invalid     exact (invalid = not parseable as the column's kind)
+    min, max, mean, std       exact; numbers, dates, or text lengths
+    quantiles                 log-bucket sketch (DDSketch), 1% relative error
+    distinct                  HyperLogLog, 4,096 registers (about 1.6% error)
+    top values                Misra-Gries summary: counts are exact to within
+                              the reported error, values above it are never missed
+
+Every summary merges by addition or maximum, so chunks (or files profiled
+separately) combine into the same profile. The JSON artifact stores the
+summaries next to the readable numbers, so a profile can be merged with
+another later and today's profile can be diffed against yesterday's
+without touching either data file.
+
+Usage:
+    python data_profile.py                                  # profile the raw export
+    python data_profile.py --input big.csv --chunk-rows 500000
+    python data_profile.py --diff old.profile.json new.profile.json
+    profile = profile_csv('influencer_marketing_roi_dataset.csv'); profile.summary()
+"""
+
+import argparse
+import base64
+import json
+import math
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAW_FILE = 'influencer_marketing_roi_dataset.csv'
+FORMAT_VERSION = 1
+CHUNK_ROWS = 250_000
+QUANTILES = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+RELATIVE_ACCURACY = 0.01
+HLL_BITS = 12
+TOP_CAPACITY = 64             # Misra-Gries counters per column
+TOP_SHOWN = 10
+
+
+def profile_path(csv_path):
+    """Where the profile of a CSV lives: same name, .profile.json suffix"""
+    return Path(csv_path).with_suffix('.profile.json')
+
+
+# ============================================================================
+# SKETCHES
+# ============================================================================
+class QuantileSketch:
+    """Log-bucket histogram: bucket i holds values in (gamma^(i-1), gamma^i]
+
+    With accuracy=None the buckets are whole units instead (dates: one bucket
+    per day), which is exact for day-resolution values.
+    """
+
+    def __init__(self, accuracy=RELATIVE_ACCURACY):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy) if accuracy else None
+        self.zeros = 0
+        self.stores = {'positive': [0, np.zeros(0, dtype=np.int64)],      # [first bucket, counts]
+                       'negative': [0, np.zeros(0, dtype=np.int64)]}
+
+    def _add_buckets(self, sign, first, counts):
+        """Add counts for buckets first, first + 1, ... into one store"""
+        if not len(counts):
+            return
+        start, current = self.stores[sign]
+        if not len(current):
+            self.stores[sign] = [first, counts.astype(np.int64).copy()]
+            return
+        low, high = min(start, first), max(start + len(current), first + len(counts))
+        merged = np.zeros(high - low, dtype=np.int64)
+        merged[start - low:start - low + len(current)] += current
+        merged[first - low:first - low + len(counts)] += counts
+        self.stores[sign] = [low, merged]
+
+    def update(self, values):
+        """Add a float array (no NaN)"""
+        if self.gamma is None:
+            buckets = np.floor(values).astype(np.int64)
+            first = int(buckets.min())
+            self._add_buckets('positive', first, np.bincount(buckets - first))
+            return
+        self.zeros += int(np.count_nonzero(values == 0))
+        for sign, part in [('positive', values[values > 0]), ('negative', -values[values < 0])]:
+            if len(part):
+                buckets = np.ceil(np.log(part) / np.log(self.gamma)).astype(np.int64)
+                first = int(buckets.min())
+                self._add_buckets(sign, first, np.bincount(buckets - first))
+
+    def merge(self, other):
+        self.zeros += other.zeros
+        for sign, (first, counts) in other.stores.items():
+            self._add_buckets(sign, first, counts)
+
+    def quantiles(self, qs):
+        """Approximate values at the given quantiles (None when empty)"""
+        neg_first, neg = self.stores['negative']
+        pos_first, pos = self.stores['positive']
+        if self.gamma is None:
+            counts, centers = pos, (pos_first + np.arange(len(pos))).astype(np.float64)
+        else:
+            # Value order: negatives from the largest magnitude down, zeros, positives up
+            counts = np.concatenate([neg[::-1], [self.zeros], pos])
+            neg_values = -2 * self.gamma ** (neg_first + np.arange(len(neg)))[::-1] / (self.gamma + 1)
+            pos_values = 2 * self.gamma ** (pos_first + np.arange(len(pos))) / (self.gamma + 1)
+            centers = np.concatenate([neg_values, [0.0], pos_values])
+        total = counts.sum()
+        if total == 0:
+            return [None] * len(qs)
+        cumulative = np.cumsum(counts)
+        positions = np.searchsorted(cumulative, np.asarray(qs) * (total - 1), side='right')
+        return [float(centers[min(p, len(centers) - 1)]) for p in positions]
+
+    def to_dict(self):
+        return {'accuracy': self.accuracy, 'zeros': self.zeros,
+                **{sign: [first, counts.tolist()] for sign, (first, counts) in self.stores.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['accuracy'])
+        sketch.zeros = data['zeros']
+        for sign in sketch.stores:
+            first, counts = data[sign]
+            sketch.stores[sign] = [first, np.asarray(counts, dtype=np.int64)]
+        return sketch
+
+
+class HyperLogLog:
+    """Distinct count estimate from 2^bits registers of leading-zero ranks"""
+
+    def __init__(self, bits=HLL_BITS):
+        self.bits = bits
+        self.registers = np.zeros(1 << bits, dtype=np.uint8)
+
+    def update(self, hashes):
+        """Add uint64 hashes"""
+        index = (hashes >> np.uint64(64 - self.bits)).astype(np.int64)
+        rest = hashes << np.uint64(self.bits)
+        # rank = leading zeros of the remaining bits + 1 (frexp exponent = bit length)
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        rank = np.where(rest == 0, 64 - self.bits + 1, 65 - bit_length).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        empty = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and empty:
+            return int(round(m * math.log(m / empty)))      # small range: linear counting
+        return int(round(raw))
+
+    def to_dict(self):
+        return {'bits': self.bits, 'registers': base64.b64encode(self.registers.tobytes()).decode()}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['bits'])
+        sketch.registers = np.frombuffer(base64.b64decode(data['registers']), dtype=np.uint8).copy()
+        return sketch
+
+
+class FrequentValues:
+    """Misra-Gries summary: at most `capacity` counters, each low by at most `error`"""
+
+    def __init__(self, capacity=TOP_CAPACITY):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.error = 0
+
+    def _add(self, counts):
+        combined = self.counts.add(counts, fill_value=0).astype(np.int64)
+        if len(combined) > self.capacity:
+            cut = int(combined.nlargest(self.capacity + 1).iloc[-1])
+            combined = combined[combined > cut] - cut
+            self.error += cut
+        self.counts = combined
+
+    def update(self, values):
+        """Add a Series of values (no nulls)"""
+        counts = values.value_counts(sort=False)
+        if len(counts) > self.capacity:
+            # Reduce the chunk to its own summary first: only ~capacity values are merged
+            cut = int(np.partition(counts.to_numpy(), len(counts) - self.capacity - 1)
+                      [len(counts) - self.capacity - 1])
+            counts = counts[counts > cut] - cut
+            self.error += cut
+        counts.index = counts.index.map(str)
+        self._add(counts)
+
+    def merge(self, other):
+        self.error += other.error
+        self._add(other.counts)
+
+    def top(self, n=TOP_SHOWN):
+        """Most frequent values; only those counted above the error bound are certain"""
+        frequent = self.counts[self.counts > self.error]
+        return [[value, int(count)] for value, count in
+                frequent.sort_values(ascending=False, kind='stable').head(n).items()]
+
+    def to_dict(self):
+        return {'capacity': self.capacity, 'error': self.error,
+                'counts': {str(k): int(v) for k, v in sorted(self.counts.items())}}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['capacity'])
+        sketch.error = data['error']
+        sketch.counts = pd.Series(data['counts'], dtype=np.int64)
+        return sketch
+
+
+# ============================================================================
+# COLUMN AND FILE PROFILES
+# ============================================================================
+def infer_kind(values):
+    """'number', 'date' or 'text' from a column's first chunk"""
+    if pd.api.types.is_bool_dtype(values):
+        return 'text'
+    if pd.api.types.is_numeric_dtype(values):
+        return 'number'
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return 'date'
+    present = values.dropna()
+    if len(present) and pd.to_datetime(present.head(1000), format='ISO8601', errors='coerce').notna().all():
+        return 'date'
+    return 'text'
+
+
+class ColumnProfile:
+    """Exact counts and moments plus the three sketches for one column"""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.count = self.nulls = self.invalid = 0
+        self.minimum = self.maximum = None
+        self.mean = self.m2 = 0.0
+        self.quantiles = QuantileSketch(None if kind == 'date' else RELATIVE_ACCURACY)
+        self.distinct = HyperLogLog()
+        self.frequent = FrequentValues()
+
+    def _numbers(self, values):
+        """Values as floats (dates: days since 1970, text: lengths) and an invalid mask"""
+        if self.kind == 'number':
+            numbers = pd.to_numeric(values, errors='coerce')
+        elif self.kind == 'date':
+            dates = pd.to_datetime(values, format='ISO8601', errors='coerce')
+            numbers = dates.to_numpy().astype('datetime64[s]').astype(np.float64) / 86_400
+            numbers = pd.Series(np.where(dates.isna(), np.nan, numbers), index=values.index)
+        else:
+            # Lengths of present values only: astype(str) turns a missing value into 'nan'
+            present = values.notna()
+            numbers = pd.Series(np.nan, index=values.index)
+            numbers[present] = values[present].astype(str).str.len()
+        numbers = numbers.to_numpy(np.float64, na_value=np.nan)
+        return numbers, np.isnan(numbers) & values.notna().to_numpy()
+
+    def update(self, values):
+        """Add one chunk of a column (a Series)"""
+        n_a = self.valid
+        self.count += len(values)
+        present = values.notna().to_numpy()
+        self.nulls += int((~present).sum())
+        numbers, invalid = self._numbers(values)
+        self.invalid += int(invalid.sum())
+        numbers = numbers[~np.isnan(numbers)]
+
+        if len(numbers):
+            low, high = float(numbers.min()), float(numbers.max())
+            self.minimum = low if self.minimum is None else min(self.minimum, low)
+            self.maximum = high if self.maximum is None else max(self.maximum, high)
+            # Chan et al. parallel update of mean and sum of squared deviations
+            n_b = len(numbers)
+            mean_b = numbers.mean()
+            m2_b = ((numbers - mean_b) ** 2).sum()
+            delta = mean_b - self.mean
+            self.mean += delta * n_b / (n_a + n_b)
+            self.m2 += m2_b + delta ** 2 * n_a * n_b / (n_a + n_b)
+            self.quantiles.update(numbers)
+
+        # Numbers as floats, so 25 and 25.0 (chunks with / without nulls) are one value
+        kept = values[present]
+        if self.kind == 'number':
+            kept = pd.to_numeric(kept, errors='coerce').astype(np.float64)
+            hashed = pd.util.hash_array(kept.to_numpy())
+        else:
+            hashed = pd.util.hash_array(kept.astype(str).to_numpy(dtype=object))
+        self.distinct.update(hashed)
+        self.frequent.update(kept)
+
+    @property
+    def valid(self):
+        return self.count - self.nulls - self.invalid
+
+    def merge(self, other):
+        """Fold another profile of the same column into this one"""
+        n_a, n_b = self.valid, other.valid
+        self.count += other.count
+        self.nulls += other.nulls
+        self.invalid += other.invalid
+        if n_b:
+            delta = other.mean - self.mean
+            self.mean += delta * n_b / (n_a + n_b)
+            self.m2 += other.m2 + delta ** 2 * n_a * n_b / (n_a + n_b)
+            self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+            self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+        self.quantiles.merge(other.quantiles)
+        self.distinct.merge(other.distinct)
+        self.frequent.merge(other.frequent)
+
+    def _readable(self, value):
+        if value is None or self.kind != 'date':
+            return value
+        return str(np.datetime64(int(round(value * 86_400)), 's').astype('datetime64[D]'))
+
+    def to_dict(self):
+        valid = self.valid
+        return {
+            'kind': self.kind,
+            'count': self.count, 'nulls': self.nulls, 'invalid': self.invalid,
+            'min': self._readable(self.minimum), 'max': self._readable(self.maximum),
+            'mean': self._readable(self.mean) if valid else None,
+            'std': math.sqrt(self.m2 / (valid - 1)) if valid > 1 else None,
+            'quantiles': {f'p{round(q * 100):02d}': self._readable(v) for q, v in
+                          zip(QUANTILES, self.quantiles.quantiles(QUANTILES))},
+            'distinct': self.distinct.estimate(),
+            'top': self.frequent.top(),
+            'top_error': self.frequent.error,
+            'measure': {'number': 'value', 'date': 'day', 'text': 'length'}[self.kind],
+            'state': {'minimum': self.minimum, 'maximum': self.maximum, 'mean': self.mean, 'm2': self.m2,
+                      'quantiles': self.quantiles.to_dict(), 'distinct': self.distinct.to_dict(),
+                      'frequent': self.frequent.to_dict()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        column = cls(data['kind'])
+        column.count, column.nulls, column.invalid = data['count'], data['nulls'], data['invalid']
+        state = data['state']
+        column.minimum, column.maximum = state['minimum'], state['maximum']
+        column.mean, column.m2 = state['mean'], state['m2']
+        column.quantiles = QuantileSketch.from_dict(state['quantiles'])
+        column.distinct = HyperLogLog.from_dict(state['distinct'])
+        column.frequent = FrequentValues.from_dict(state['frequent'])
+        return column
+
+
+class DataProfile:
+    """Per-column profiles of a table, built chunk by chunk"""
+
+    def __init__(self, source=None):
+        self.source = source
+        self.rows = 0
+        self.columns = {}
+        self.seconds = 0.0
+
+    def update(self, chunk):
+        """Add a chunk of rows (a DataFrame)"""
+        started = time.perf_counter()
+        self.rows += len(chunk)
+        for name in chunk.columns:
+            if name not in self.columns:
+                self.columns[name] = ColumnProfile(infer_kind(chunk[name]))
+                self.columns[name].count = self.rows - len(chunk)       # rows before it appeared
+                self.columns[name].nulls = self.rows - len(chunk)
+            self.columns[name].update(chunk[name])
+        self.seconds += time.perf_counter() - started
+
+    def merge(self, other):
+        """Fold another profile (e.g. of another partition) into this one"""
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column
+        self.rows += other.rows
+        self.seconds += other.seconds
+
+    def summary(self):
+        """One readable row per column, like describe() + isnull() + dtypes together"""
+        rows = []
+        for name, column in self.columns.items():
+            data = column.to_dict()
+            rows.append({
+                'column': name, 'kind': data['kind'], 'nulls': data['nulls'],
+                'null_pct': 100 * data['nulls'] / data['count'] if data['count'] else 0.0,
+                'invalid': data['invalid'], 'distinct≈': data['distinct'],
+                **({'min': data['min'], 'median≈': data['quantiles']['p50'], 'max': data['max'],
+                    'mean': data['mean']} if data['kind'] != 'text' else {}),
+                'top': data['top'][0][0] if data['top'] else None,
+            })
+        columns = ['column', 'kind', 'nulls', 'null_pct', 'invalid', 'distinct≈',
+                   'min', 'median≈', 'max', 'mean', 'top']
+        return pd.DataFrame(rows, columns=columns).set_index('column')
+
+    def to_dict(self):
+        return {'format': FORMAT_VERSION, 'source': str(self.source), 'rows': self.rows,
+                'generated': datetime.now().isoformat(timespec='seconds'),
+                'seconds': round(self.seconds, 3),
+                'columns': {name: column.to_dict() for name, column in self.columns.items()}}
+
+    def save(self, path):
+        """Write the profile artifact (JSON) atomically"""
+        path = Path(path)
+        partial = path.with_suffix(path.suffix + '.tmp')
+        partial.write_text(json.dumps(self.to_dict(), indent=1, default=str))
+        partial.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        data = json.loads(Path(path).read_text())
+        if data.get('format') != FORMAT_VERSION:
+            raise ValueError(f"{path} has profile format {data.get('format')}, expected {FORMAT_VERSION}")
+        profile = cls(data['source'])
+        profile.rows, profile.seconds = data['rows'], data['seconds']
+        profile.columns = {name: ColumnProfile.from_dict(column)
+                           for name, column in data['columns'].items()}
+        return profile
+
+
+def profile_frame(frame, chunk_rows=CHUNK_ROWS, source=None):
+    """Profile an in-memory frame slice by slice (same summaries as profile_csv)"""
+    profile = DataProfile(source)
+    for first in range(0, len(frame), chunk_rows):
+        profile.update(frame.iloc[first:first + chunk_rows])
+    return profile
+
+
+def profile_csv(path=RAW_FILE, chunk_rows=CHUNK_ROWS):
+    """Profile a CSV in one streaming pass; memory use is one chunk plus the sketches"""
+    profile = DataProfile(path)
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        profile.update(chunk)
+    return profile
+
+
+# ============================================================================
+# COMPARING PROFILES
+# ============================================================================
+def diff_profiles(old, new, tolerance=0.05):
+    """Changes between two profile dicts: schema, row count and per-column statistics
+
+    Numeric statistics are reported when they moved by more than `tolerance`
+    (relative); counts, kinds and top values whenever they differ.
+    """
+    changes = []
+
+    def note(column, metric, before, after):
+        changes.append({'column': column, 'metric': metric, 'before': before, 'after': after})
+
+    if old['rows'] != new['rows']:
+        note('*', 'rows', old['rows'], new['rows'])
+    for name in old['columns'].keys() - new['columns'].keys():
+        note(name, 'column', 'present', 'removed')
+    for name in new['columns'].keys() - old['columns'].keys():
+        note(name, 'column', 'absent', 'added')
+
+    for name in [c for c in new['columns'] if c in old['columns']]:
+        before, after = old['columns'][name], new['columns'][name]
+        if before['kind'] != after['kind']:
+            note(name, 'kind', before['kind'], after['kind'])
+            continue
+        for metric in ['nulls', 'invalid']:
+            if before[metric] != after[metric]:
+                note(name, metric, before[metric], after[metric])
+        numeric = {'distinct≈': (before['distinct'], after['distinct'])}
+        for metric in ['min', 'max', 'mean', 'std']:
+            numeric[metric] = (before[metric], after[metric])
+        for q in ['p05', 'p50', 'p95']:
+            numeric[f'{q}≈'] = (before['quantiles'][q], after['quantiles'][q])
+        for metric, (a, b) in numeric.items():
+            if a == b:
+                continue
+            if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+                if abs(b - a) <= tolerance * max(abs(a), abs(b), 1e-12):
+                    continue
+            note(name, metric, a, b)
+        top_before = {value for value, _ in before['top'][:5]}
+        top_after = {value for value, _ in after['top'][:5]}
+        if top_before != top_after:
+            note(name, 'top 5 values', ', '.join(sorted(top_before)), ', '.join(sorted(top_after)))
+    return pd.DataFrame(changes, columns=['column', 'metric', 'before', 'after'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', default=RAW_FILE)
+    parser.add_argument('--output', help='profile file (default: <input>.profile.json)')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--diff', nargs=2, metavar=('OLD', 'NEW'),
+                        help='compare two saved profiles instead of profiling')
+    args = parser.parse_args()
+
+    if args.diff:
+        old, new = (json.loads(Path(path).read_text()) for path in args.diff)
+        changes = diff_profiles(old, new)
+        print(changes.to_string(index=False) if len(changes) else "✓ No changes between the profiles")
+        return
+
+    output = Path(args.output) if args.output else profile_path(args.input)
+    previous = json.loads(output.read_text()) if output.exists() else None
+    profile = profile_csv(args.input, args.chunk_rows)
+    print(f"📋 {args.input}: {profile.rows:,} rows, {len(profile.columns)} columns "
+          f"(one pass in {profile.seconds:.2f} s)")
+    print(profile.summary().to_string())
+    current = json.loads(json.dumps(profile.to_dict(), default=str))
+    if previous is not None:
+        changes = diff_profiles(previous, current)
+        print("\nChanges since the last profile:")
+        print(changes.to_string(index=False) if len(changes) else "  none")
+    profile.save(output)
+    print(f"\n✓ Saved: {output}")
+
+
+if __name__ == '__main__':
+    main()
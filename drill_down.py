@@ -0,0 +1,163 @@
+"""
+PAGINATED, SORTABLE CAMPAIGN DRILL-DOWN
+=======================================
+Drilling from a platform or category down to single campaigns used to mean
+filtering the whole frame, sorting the result and pushing every row into
+st.dataframe: tens of thousands of rows serialized to the browser to show
+the first fifty.
+
+CampaignPages prepares, once per data version:
+
+    orders        a stable argsort of ROAS, CAC, revenue and campaign_cost
+                  (NaN last); descending order reads it backwards
+    codes, days   each row's dimension codes and start day as small arrays
+    cell_keys     (cell, day) keys of all rows, sorted, like time_index.py
+
+page() walks the sort order from the start of the requested page and
+keeps rows that pass the filters, checking them a block at a time, so a
+page costs about page_size / (share of rows that match) row checks. The
+position where each page starts is remembered per query, so "next page"
+continues where the last one stopped instead of re-scanning from the top.
+
+count() answers "how many campaigns match" with two binary searches per
+selected cell in the sorted (cell, day) keys; no row is touched.
+
+Usage:
+    pages = CampaignPages(df)
+    pages.count('2023-01-01', '2023-06-30', platform=['TikTok'])
+    pages.page('2023-01-01', '2023-06-30', 'ROAS', descending=True,
+               page=0, page_size=50, platform=['TikTok'])
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from time_index import DAY_OFFSET, DAY_SPAN, DIMENSIONS, to_day
+
+SORT_KEYS = ['ROAS', 'CAC', 'revenue', 'campaign_cost']
+PAGE_COLUMNS = ['campaign_id', 'start_date', 'platform', 'campaign_type', 'influencer_category',
+                'campaign_cost', 'revenue', 'ROAS', 'CAC', 'product_sales']
+MAX_QUERIES = 256            # remembered page starts, least recently used dropped
+MAX_BLOCK = 1 << 16
+
+
+class CampaignPages:
+    """Campaign rows in precomputed sort orders, served one filtered page at a time"""
+
+    def __init__(self, frame, sort_keys=SORT_KEYS):
+        self.frame = frame
+        self.days = to_day(frame['start_date'])
+        self.codes, self.categories = {}, {}
+        for dimension in DIMENSIONS:
+            codes, categories = pd.factorize(frame[dimension])
+            self.codes[dimension] = codes
+            self.categories[dimension] = pd.Index(categories)
+
+        # Sort orders: ascending with NaN last, plus how many values are not NaN
+        self.orders = {}
+        for key in sort_keys:
+            values = frame[key].to_numpy(np.float64)
+            self.orders[key] = (np.argsort(values, kind='stable'),
+                                int(np.count_nonzero(~np.isnan(values))))
+
+        # Sorted (cell, day) keys for counting, cell = mixed-radix dimension codes
+        self._radix = [len(self.categories[d]) for d in DIMENSIONS]
+        cells = np.zeros(len(frame), dtype=np.int64)
+        for dimension, size in zip(DIMENSIONS, self._radix):
+            cells = cells * size + self.codes[dimension]
+        self.cell_keys = np.sort(cells * DAY_SPAN + DAY_OFFSET + self.days)
+
+        self._starts = OrderedDict()     # query -> {page: position in the sort order}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.frame)
+
+    # ------------------------------------------------------------------
+    # Filters
+    # ------------------------------------------------------------------
+    def _allowed(self, filters):
+        """Per filtered dimension, a boolean lookup over its codes (all-true ones dropped)"""
+        allowed = {}
+        for dimension, values in filters.items():
+            if values is None:
+                continue
+            lookup = self.categories[dimension].isin(list(values))
+            if not lookup.all():
+                allowed[dimension] = lookup
+        return allowed
+
+    def _matches(self, rows, start_day, end_day, allowed):
+        """Which of rows pass the date range and dimension filters"""
+        days = self.days[rows]
+        keep = (days >= start_day) & (days <= end_day)
+        for dimension, lookup in allowed.items():
+            keep &= lookup[self.codes[dimension][rows]]
+        return keep
+
+    def count(self, start, end, **filters):
+        """Number of matching campaigns, from the sorted (cell, day) keys"""
+        selected = np.ones(1, dtype=bool)
+        for dimension in DIMENSIONS:
+            values = filters.get(dimension)
+            lookup = (np.ones(len(self.categories[dimension]), dtype=bool) if values is None
+                      else self.categories[dimension].isin(list(values)))
+            selected = (selected[:, None] & lookup[None, :]).ravel()
+        base = np.flatnonzero(selected).astype(np.int64) * DAY_SPAN + DAY_OFFSET
+        lo = np.searchsorted(self.cell_keys, base + to_day(start), side='left')
+        hi = np.searchsorted(self.cell_keys, base + to_day(end), side='right')
+        return int((hi - lo).sum())
+
+    # ------------------------------------------------------------------
+    # Pages
+    # ------------------------------------------------------------------
+    def _rows(self, sort_by, descending, positions):
+        """Row numbers at the given positions of a sort order"""
+        order, valid = self.orders[sort_by]
+        if descending:          # read backwards, but NaN values stay last
+            positions = np.where(positions < valid, valid - 1 - positions, positions)
+        return order[positions]
+
+    def page(self, start, end, sort_by, descending=True, page=0, page_size=50,
+             columns=PAGE_COLUMNS, **filters):
+        """Rows of page number `page` (from 0) of the filtered, sorted campaigns"""
+        start_day, end_day = to_day(start), to_day(end)
+        allowed = self._allowed(filters)
+        query = (start_day, end_day, sort_by, descending, page_size,
+                 tuple(sorted((d, tuple(np.flatnonzero(lookup))) for d, lookup in allowed.items())))
+        with self._lock:
+            known = dict(self._starts.get(query, {0: 0}))
+
+        # Resume from the closest page whose start position is known
+        first = max(p for p in known if p <= page)
+        position, needed = known[first], (page - first + 1) * page_size
+        hits, found = [], 0
+        block = 4 * page_size
+        while position < len(self.frame) and found < needed:
+            positions = np.arange(position, min(position + block, len(self.frame)))
+            rows = self._rows(sort_by, descending, positions)
+            matched = position + np.flatnonzero(self._matches(rows, start_day, end_day, allowed))
+            hits.append(matched[:needed - found])
+            found += len(hits[-1])
+            position += block
+            block = min(2 * block, MAX_BLOCK)
+        hits = np.concatenate(hits) if hits else np.zeros(0, dtype=np.int64)
+
+        # Remember where every page we passed starts (and where the next one may)
+        for number in range(first + 1, page + 1):
+            index = (number - first) * page_size
+            if index < len(hits):
+                known[number] = int(hits[index])
+        if len(hits) == needed:
+            known[page + 1] = int(hits[-1]) + 1
+        with self._lock:
+            self._starts[query] = known
+            self._starts.move_to_end(query)
+            while len(self._starts) > MAX_QUERIES:
+                self._starts.popitem(last=False)
+
+        rows = self._rows(sort_by, descending, hits[(page - first) * page_size:])
+        return self.frame.iloc[rows][list(columns)].reset_index(drop=True)
@@ -0,0 +1,178 @@
+"""
+DUCKDB QUERY ENGINE FOR THE DASHBOARD (OPTIONAL)
+================================================
+The default dashboard reads the whole cleaned CSV into pandas and answers
+from an in-memory time index. That is fast but needs the full history in
+RAM. DuckDB instead runs SQL directly over the data files: the sidebar
+filters become WHERE clauses pushed down into a multi-threaded columnar
+scan, and only the small grouped result tables come back to Python.
+
+DuckDBCampaigns answers the same queries as CampaignTimeIndex
+(cell_totals, monthly, cells, first_day/last_day, total_campaigns), so
+every chart in 03 runs unchanged on either backend. It also returns
+filtered campaign rows for the per-campaign charts (or in batches, for
+exports), and the same count() and page() as drill_down.CampaignPages
+for the campaign table.
+
+The first use converts influencer_marketing_cleaned.csv to Parquet next to
+it (rebuilt whenever the CSV is newer); Parquet is columnar, so a query
+only reads the columns it uses.
+
+Requires: pip install duckdb
+
+Usage:
+    campaigns = DuckDBCampaigns('influencer_marketing_cleaned.csv')
+    totals = campaigns.cell_totals('2023-01-01', '2023-03-31', platform=['TikTok'])
+    rows = campaigns.campaigns('2023-01-01', '2023-03-31', columns=['platform', 'ROAS'])
+"""
+
+import os
+import threading
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+
+from drill_down import PAGE_COLUMNS, SORT_KEYS
+from time_index import COUNT, DIMENSIONS, MEASURES, to_day
+
+
+class DuckDBCampaigns:
+    """Campaign queries pushed down to DuckDB over a Parquet copy of the cleaned CSV"""
+
+    def __init__(self, csv_path='influencer_marketing_cleaned.csv', threads=None):
+        self.csv_path = Path(csv_path)
+        self.parquet_path = self.csv_path.with_suffix('.parquet')
+        self.columns = MEASURES + [COUNT]
+        self._connection = duckdb.connect()
+        self._connection.execute(f"SET threads TO {int(threads or os.cpu_count() or 1)}")
+        self._lock = threading.Lock()
+
+        self._convert()
+        self._connection.execute(
+            f"CREATE VIEW campaigns AS SELECT * FROM read_parquet('{self.parquet_path}')"
+        )
+        self.cells = self._query(f"SELECT DISTINCT {', '.join(DIMENSIONS)} FROM campaigns "
+                                 f"ORDER BY {', '.join(DIMENSIONS)}")
+        bounds = self._query("SELECT min(start_date) AS first, max(start_date) AS last, "
+                             "count(*) AS campaigns FROM campaigns")
+        self.first_day = to_day(bounds['first'].iloc[0])
+        self.last_day = to_day(bounds['last'].iloc[0])
+        self.total_campaigns = int(bounds['campaigns'].iloc[0])
+
+    def _convert(self):
+        """Write the Parquet copy unless it is already newer than the CSV"""
+        if not self.csv_path.exists():
+            if self.parquet_path.exists():
+                return
+            raise FileNotFoundError(self.csv_path)
+        if (self.parquet_path.exists()
+                and self.parquet_path.stat().st_mtime >= self.csv_path.stat().st_mtime):
+            return
+        self._connection.execute(f"""
+            COPY (
+                SELECT * REPLACE (CAST(start_date AS DATE) AS start_date)
+                FROM read_csv_auto('{self.csv_path}')
+                ORDER BY start_date
+            ) TO '{self.parquet_path}' (FORMAT PARQUET)
+        """)
+
+    def _query(self, sql, parameters=()):
+        """Run sql on a private cursor (one connection is shared by all sessions)"""
+        with self._lock:
+            cursor = self._connection.cursor()
+        try:
+            return cursor.execute(sql, list(parameters)).df()
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _where(start, end, filters):
+        """WHERE clause and parameters for a date range and dimension filters"""
+        clauses, parameters = [], []
+        if start is not None:
+            clauses.append("start_date >= CAST(? AS DATE)")
+            parameters.append(str(pd.Timestamp(start).date()))
+        if end is not None:
+            clauses.append("start_date <= CAST(? AS DATE)")
+            parameters.append(str(pd.Timestamp(end).date()))
+        for dimension, allowed in filters.items():
+            if allowed is None:
+                continue
+            allowed = list(allowed)
+            if not allowed:
+                clauses.append("FALSE")
+                continue
+            clauses.append(f"{dimension} IN ({', '.join('?' * len(allowed))})")
+            parameters.extend(allowed)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", parameters
+
+    def cell_totals(self, start, end, **filters):
+        """Measure totals per platform × campaign_type × category for start <= start_date <= end"""
+        where, parameters = self._where(start, end, filters)
+        sums = ", ".join(f"CAST(SUM({m}) AS DOUBLE) AS {m}" for m in MEASURES)
+        return self._query(f"""
+            SELECT {', '.join(DIMENSIONS)}, {sums}, CAST(COUNT(*) AS DOUBLE) AS {COUNT}
+            FROM campaigns {where}
+            GROUP BY ALL ORDER BY ALL
+        """, parameters)
+
+    def monthly(self, start, end, **filters):
+        """Measure totals per cell and calendar month of start_date"""
+        where, parameters = self._where(start, end, filters)
+        sums = ", ".join(f"CAST(SUM({m}) AS DOUBLE) AS {m}" for m in MEASURES)
+        result = self._query(f"""
+            SELECT CAST(date_trunc('month', start_date) AS TIMESTAMP) AS month,
+                   {', '.join(DIMENSIONS)}, {sums}, CAST(COUNT(*) AS DOUBLE) AS {COUNT}
+            FROM campaigns {where}
+            GROUP BY ALL ORDER BY ALL
+        """, parameters)
+        result['month'] = result['month'].astype('datetime64[ns]')
+        return result
+
+    def campaigns(self, start=None, end=None, columns=None, **filters):
+        """Campaign rows matching the filters, limited to the requested columns"""
+        where, parameters = self._where(start, end, filters)
+        selected = ', '.join(columns) if columns else '*'
+        result = self._query(f"SELECT {selected} FROM campaigns {where}", parameters)
+        if 'start_date' in result:
+            result['start_date'] = result['start_date'].astype('datetime64[ns]')
+        return result
+
+    def batches(self, start=None, end=None, columns=None, chunk_rows=100_000, **filters):
+        """Campaign rows matching the filters as frames of at most chunk_rows rows (streamed)"""
+        where, parameters = self._where(start, end, filters)
+        selected = ', '.join(columns) if columns else '*'
+        with self._lock:
+            cursor = self._connection.cursor()
+        try:
+            reader = cursor.execute(f"SELECT {selected} FROM campaigns {where}",
+                                    list(parameters)).fetch_record_batch(chunk_rows)
+            for batch in reader:
+                rows = batch.to_pandas()
+                if 'start_date' in rows:
+                    rows['start_date'] = rows['start_date'].astype('datetime64[ns]')
+                yield rows
+        finally:
+            cursor.close()
+
+    def count(self, start, end, **filters):
+        """Number of campaigns matching the filters"""
+        where, parameters = self._where(start, end, filters)
+        return int(self._query(f"SELECT count(*) AS n FROM campaigns {where}",
+                               parameters)['n'].iloc[0])
+
+    def page(self, start, end, sort_by, descending=True, page=0, page_size=50,
+             columns=PAGE_COLUMNS, **filters):
+        """One page of the filtered campaigns sorted by sort_by (NULLs last); only it is returned"""
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Cannot sort campaigns by {sort_by!r}")
+        where, parameters = self._where(start, end, filters)
+        result = self._query(f"""
+            SELECT {', '.join(columns)} FROM campaigns {where}
+            ORDER BY {sort_by} {'DESC' if descending else 'ASC'} NULLS LAST, campaign_id
+            LIMIT {int(page_size)} OFFSET {int(page) * int(page_size)}
+        """, parameters)
+        if 'start_date' in result:
+            result['start_date'] = result['start_date'].astype('datetime64[ns]')
+        return result
@@ -0,0 +1,152 @@
+"""
+STREAMING EXPORT OF THE FILTERED CAMPAIGNS
+==========================================
+Analysts download exactly the campaign rows behind the dashboard filters.
+Building that download in memory (filter the frame, to_csv, hand the bytes
+to the browser) holds a filtered copy plus the encoded file per session,
+and the rerun waits while it is built.
+
+Instead the rows are written to a file in chunks:
+
+    pandas    the shared frame is scanned CHUNK_ROWS rows at a time; each
+              block is filtered and written before the next is read
+    DuckDB    the filtered query is fetched as Arrow record batches
+
+CSV chunks are appended to one file (header once); Parquet chunks become
+row groups of one zstd-compressed file, whose schema is fixed up front (from
+the source frame when given, else from the first chunk) so that an empty or
+all-missing text column in one chunk cannot decide the column's type. Memory stays at one chunk however
+many rows match, and a progress callback gets the rows written and the
+share of the data scanned after every chunk. The file appears under its
+final name only when it is complete.
+
+The dashboard runs the export on a background thread and serves the
+finished file from EXPORT_FOLDER through Streamlit's static file serving
+(see .streamlit/config.toml), so the file is streamed from disk rather
+than read into server memory. Exports older than EXPORT_TTL_SECONDS are
+deleted whenever a new one starts.
+
+Usage:
+    chunks = frame_chunks(df, '2024-01-01', '2024-03-31', platform=['TikTok'])
+    export_file(chunks, 'tiktok_q1.parquet', 'parquet', schema=arrow_schema(df))
+    export_file(query_chunks(DuckDBCampaigns(), None, None), 'all.csv', 'csv')
+"""
+
+import os
+import secrets
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Format -> MIME type of the download
+FORMATS = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
+CHUNK_ROWS = 100_000
+EXPORT_FOLDER = Path('static') / 'exports'    # served by Streamlit as app/static/exports/
+EXPORT_TTL_SECONDS = 3600
+
+
+def frame_chunks(frame, start=None, end=None, columns=None, chunk_rows=CHUNK_ROWS, **filters):
+    """(filtered rows, share scanned) per block of chunk_rows rows of frame
+
+    start and end bound start_date (both days included); filters map a
+    column to its allowed values, as in the dashboard sidebar.
+    """
+    first = pd.Timestamp(start) if start is not None else None
+    stop = pd.Timestamp(end) + pd.Timedelta(days=1) if end is not None else None
+    n_rows = len(frame)
+    for begin in range(0, max(n_rows, 1), chunk_rows):
+        block = frame.iloc[begin:begin + chunk_rows]
+        mask = np.ones(len(block), dtype=bool)
+        if first is not None:
+            mask &= (block['start_date'] >= first).to_numpy()
+        if stop is not None:
+            mask &= (block['start_date'] < stop).to_numpy()
+        for column, allowed in filters.items():
+            if allowed is not None:
+                mask &= block[column].isin(list(allowed)).to_numpy()
+        rows = block[mask] if columns is None else block.loc[mask, list(columns)]
+        yield rows, min(begin + chunk_rows, n_rows) / n_rows if n_rows else 1.0
+
+
+def query_chunks(source, start=None, end=None, columns=None, chunk_rows=CHUNK_ROWS, **filters):
+    """(filtered rows, share written) per record batch of a DuckDBCampaigns query"""
+    total = source.count(start, end, **filters)
+    written = 0
+    for rows in source.batches(start, end, columns, chunk_rows, **filters):
+        written += len(rows)
+        yield rows, written / total if total else 1.0
+
+
+def arrow_schema(frame):
+    """Parquet schema for frames shaped like frame: columns with no values to type become strings
+
+    Text columns with object dtype have Arrow type null when they hold no
+    values (an empty frame, or only missing values); later chunks with text
+    could not be cast to that.
+    """
+    schema = pa.Schema.from_pandas(frame.iloc[:0], preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(i, field.with_type(pa.string()))
+    return schema
+
+
+def export_file(chunks, path, fmt='csv', progress=None, schema=None):
+    """Write (rows, share done) chunks to path as CSV or Parquet; returns rows written
+
+    progress(rows written, share done) is called after every chunk. schema
+    is the Parquet file's Arrow schema (default: arrow_schema of the first
+    chunk).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Cannot export as {fmt!r}: use one of {', '.join(FORMATS)}")
+    path = Path(path)
+    partial = path.with_name(path.name + '.tmp')
+    written, writer = 0, None
+    try:
+        with open(partial, 'wb') as out:
+            try:
+                for rows, done in chunks:
+                    if fmt == 'csv':
+                        rows.to_csv(out, header=writer is None, index=False)
+                        writer = out
+                    else:
+                        if writer is None:
+                            writer = pq.ParquetWriter(out, schema or arrow_schema(rows),
+                                                      compression='zstd')
+                        table = pa.Table.from_pandas(rows, preserve_index=False)
+                        writer.write_table(table.select(writer.schema.names).cast(writer.schema))
+                    written += len(rows)
+                    if progress is not None:
+                        progress(written, done)
+            finally:
+                if fmt == 'parquet' and writer is not None:
+                    writer.close()
+        os.replace(partial, path)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    return written
+
+
+def export_path(fmt, folder=EXPORT_FOLDER):
+    """A new, unguessable file name in folder (files there are served to anyone with the URL)"""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    return folder / f"campaigns_{datetime.now():%Y%m%d_%H%M%S}_{secrets.token_urlsafe(12)}.{fmt}"
+
+
+def remove_old_exports(folder=EXPORT_FOLDER, max_age=EXPORT_TTL_SECONDS):
+    """Delete exports (and abandoned partial files) older than max_age seconds"""
+    folder = Path(folder)
+    if not folder.is_dir():
+        return
+    cutoff = time.time() - max_age
+    for path in folder.glob('campaigns_*'):
+        if path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
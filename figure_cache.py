@@ -0,0 +1,140 @@
+"""
+SERIALIZED PLOTLY FIGURE CACHE
+==============================
+Building a Plotly Express figure costs tens of milliseconds, and the dashboard
+used to rebuild every chart on every rerun even when the numbers behind it
+had not changed.
+
+FigureCache stores each figure as its JSON spec, keyed by a fingerprint of
+    - the builder function (name and bytecode),
+    - the aggregate DataFrame/Series it was built from,
+    - any layout parameters passed to the builder.
+A cache hit skips the builder entirely and hands the stored spec to
+st.plotly_chart as a CachedFigure, which serializes straight from the spec
+instead of re-validating and deep-copying every trace.
+
+The cache keeps its own memory cap (bytes of JSON) and evicts the least
+recently used specs first. It is thread-safe so one instance can be shared
+by every dashboard session (see st.cache_resource in 03).
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.graph_objects as go
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MB of figure JSON
+
+
+def fingerprint(builder, data, params):
+    """Stable hash of a builder, its input aggregate and its layout parameters"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(builder.__qualname__.encode())
+    digest.update(builder.__code__.co_code)
+    digest.update(repr(sorted(params.items())).encode())
+
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        frame = data.to_frame() if isinstance(data, pd.Series) else data
+        digest.update(repr(list(frame.columns)).encode())
+        digest.update(repr(list(frame.dtypes.astype(str))).encode())
+        digest.update(repr(list(frame.index.names)).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=True).values.tobytes())
+    else:
+        digest.update(repr(data).encode())
+
+    return digest.hexdigest()
+
+
+class CachedFigure(go.Figure):
+    """Read-only figure that serializes directly from a stored JSON spec
+
+    st.plotly_chart calls to_dict() on figures and re-validates plain dicts;
+    both cost more than building a small chart. Serving the parsed spec from
+    to_dict() skips that work. Do not call update_* on a CachedFigure.
+    """
+
+    def __init__(self, spec):
+        super().__init__()
+        self._spec = spec
+
+    def to_dict(self):
+        return json.loads(self._spec)
+
+    def to_plotly_json(self):
+        return self.to_dict()
+
+    def to_json(self, *args, **kwargs):
+        return self._spec
+
+
+class FigureCache:
+    """Size-capped LRU cache of serialized Plotly figures"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._specs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._specs)
+
+    def figure(self, builder, data, **params):
+        """Return builder(data, **params), served from the cache when possible"""
+        return self.lookup(builder, data, **params)[0]
+
+    def lookup(self, builder, data, **params):
+        """Like figure(), but returns (figure, True when it was a cache hit)"""
+        key = fingerprint(builder, data, params)
+
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is not None:
+                self._specs.move_to_end(key)
+                self.hits += 1
+
+        hit = spec is not None
+        if not hit:
+            spec = builder(data, **params).to_json()
+            self._store(key, spec)
+
+        return CachedFigure(spec), hit
+
+    def _store(self, key, spec):
+        """Insert a spec and evict least recently used specs over the cap"""
+        size = len(spec)
+        with self._lock:
+            self.misses += 1
+            if size > self.max_bytes or key in self._specs:
+                return
+            self._specs[key] = spec
+            self.bytes_used += size
+            while self.bytes_used > self.max_bytes:
+                _, evicted = self._specs.popitem(last=False)
+                self.bytes_used -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every cached spec"""
+        with self._lock:
+            self._specs.clear()
+            self.bytes_used = 0
+
+    def stats(self):
+        """Counters for the dashboard sidebar"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._specs),
+            'bytes_used': self.bytes_used,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,108 @@
+"""
+TOP-K CAMPAIGN LEADERBOARDS
+===========================
+The best and worst N campaigns of every platform × campaign type ×
+influencer category segment (or any coarser grouping), by ROAS, CAC,
+revenue or engagement rate.
+
+Sorting all campaigns (or each segment's campaigns) to read off five rows
+costs O(n log n) for O(k) output. top_k() uses partial selection instead:
+
+    1. group rows by segment with one stable sort of small integer codes
+    2. lay each segment's values out as one row of a padded matrix
+       (segments × largest segment, empty slots = -inf)
+    3. np.argpartition along the rows moves every segment's k largest
+       values into its last k columns: O(n), all segments in one call
+    4. sort only those k values per segment for the ranking
+
+Missing values (e.g. CAC of campaigns without sales) never rank. "Best"
+follows the metric's direction: high ROAS is good, high CAC is not.
+
+Usage:
+    from leaderboard import leaderboards
+    board = leaderboards(df, metrics=['ROAS', 'CAC'], k=5)
+    board[(board['metric'] == 'ROAS') & (board['side'] == 'best')]
+"""
+
+import numpy as np
+import pandas as pd
+
+from budget_optimizer import SEGMENT
+
+# Metric -> whether larger values are better
+METRICS = {'ROAS': True, 'CAC': False, 'revenue': True, 'engagement_rate': True}
+LEADER_COLUMNS = ['campaign_id', 'start_date', 'platform', 'campaign_type', 'influencer_category',
+                  'campaign_cost', 'revenue', 'ROAS', 'CAC', 'engagement_rate']
+PAD_LIMIT = 4        # padded matrix at most this many times the row count, else per segment
+
+
+def top_k(frame, metric, k=5, by=SEGMENT, largest=True):
+    """Positions of the k largest (or smallest) metric values per group: by + rank + row"""
+    by = list(by or [])
+    n_rows = len(frame)
+    if by:
+        groups = frame.groupby(by, sort=True, observed=True)
+        codes = groups.ngroup().to_numpy()
+        keys = groups.size().index.to_frame(index=False)
+    else:
+        codes = np.zeros(n_rows, dtype=np.int64)
+        keys = pd.DataFrame(index=range(1 if n_rows else 0))
+
+    scores = frame[metric].to_numpy(np.float64, na_value=np.nan)
+    scores = np.where(np.isnan(scores), -np.inf, scores if largest else -scores)
+
+    # Rows grouped by segment (stable: original order within each segment);
+    # 16-bit codes let numpy use a radix sort
+    small = codes.astype(np.int16) if len(keys) <= np.iinfo(np.int16).max else codes
+    order = np.argsort(small, kind='stable')
+    sizes = np.bincount(codes, minlength=len(keys))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    width = int(sizes.max()) if len(sizes) else 0
+    k = min(k, width)
+    if k <= 0:
+        return keys.iloc[:0].assign(rank=np.zeros(0, dtype=np.int64), row=np.zeros(0, dtype=np.int64))
+
+    if len(keys) * width <= PAD_LIMIT * n_rows:
+        slot = np.arange(n_rows) - starts[codes[order]]
+        padded = np.full((len(keys), width), -np.inf)
+        padded[codes[order], slot] = scores[order]
+        chosen = np.argpartition(padded, width - k, axis=1)[:, width - k:]
+        values = np.take_along_axis(padded, chosen, axis=1)
+        rows = order[np.minimum(starts[:, None] + chosen, n_rows - 1)]
+    else:
+        # One segment dominates: padding would be mostly empty, select per segment
+        values = np.full((len(keys), k), -np.inf)
+        rows = np.zeros((len(keys), k), dtype=np.int64)
+        for group, (start, size) in enumerate(zip(starts, sizes)):
+            members = order[start:start + size]
+            take = min(k, size)
+            picked = members[np.argpartition(scores[members], size - take)[size - take:]]
+            values[group, :take], rows[group, :take] = scores[picked], picked
+
+    # Rank the k survivors: best first, ties by original row order
+    ranking = np.lexsort((rows, -values), axis=1)
+    values = np.take_along_axis(values, ranking, axis=1)
+    rows = np.take_along_axis(rows, ranking, axis=1)
+    group, rank = np.nonzero(values > -np.inf)
+    result = keys.iloc[group].reset_index(drop=True)
+    result['rank'] = rank + 1
+    result['row'] = rows[group, rank]
+    return result
+
+
+def leaderboard(frame, metric, k=5, by=SEGMENT, side='best', columns=LEADER_COLUMNS):
+    """Best (or worst) k campaigns per group by metric, with their campaign columns"""
+    largest = METRICS.get(metric, True) == (side == 'best')
+    ranked = top_k(frame, metric, k, by, largest)
+    rows = frame.iloc[ranked['row'].to_numpy()]
+    extra = [c for c in columns if c in frame.columns and c not in ranked.columns]
+    return pd.concat([ranked.drop(columns='row'), rows[extra].reset_index(drop=True)], axis=1)
+
+
+def leaderboards(frame, metrics=tuple(METRICS), k=5, by=SEGMENT, columns=LEADER_COLUMNS):
+    """Best and worst k campaigns per group for every metric, stacked in one table"""
+    boards = [
+        leaderboard(frame, metric, k, by, side, columns).assign(metric=metric, side=side)
+        for metric in metrics for side in ('best', 'worst')
+    ]
+    return pd.concat(boards, ignore_index=True)
@@ -0,0 +1,348 @@
+"""
+LIVE CAMPAIGN FEED: STREAMING INGESTION WITH ONLINE AGGREGATES
+==============================================================
+Campaigns report engagements and sales continuously, but the rest of the
+project works from the cleaned CSV snapshot. This module tails an
+append-only feed file of campaign updates and keeps aggregates current
+without ever re-reading the history.
+
+The feed (a local file standing in for a message queue) is either
+    campaign_updates.jsonl    one JSON object per line, or
+    campaign_updates.csv      a header line, then one row per update
+with the raw export's columns (campaign_id, platform, influencer_category,
+campaign_type, start_date, engagements, estimated_reach, product_sales, ...).
+An update is a campaign's latest report: it replaces the previous report
+with the same campaign_id (from the feed or the cleaned data), so a
+campaign that reports ten times still counts once, with its latest figures.
+
+Each poll reads only the bytes appended since the last one (a partly
+written last line waits for the next poll), applies 01's derivations
+(cost, revenue, ROAS, CAC, rates - see cleaning_pipeline.derive_metrics)
+and folds the batch into OnlineAggregates:
+
+    per platform × campaign_type × influencer_category × day
+        count and running sums of every measure
+        running mean and variance of the per-campaign ratios
+
+Means and variances are merged batch by batch with the parallel form of
+Welford's algorithm, so they never need the individual reports again:
+    n = n_a + n_b,  δ = mean_b - mean_a
+    mean = mean_a + δ × n_b / n
+    M2   = M2_a + M2_b + δ² × n_a × n_b / n        variance = M2 / (n - 1)
+A superseded report is taken out with the same formulas solved for a
+(only the latest report per campaign_id is kept to do that).
+
+LiveCampaigns also hands every batch to the CampaignDataset
+(apply_updates), which replaces the campaigns' rows in the frame and their
+contribution to the time index, so the dashboard's KPIs, charts, campaign
+table and exports all include the updates at its next rerun.
+
+HOW TO RUN:
+    python live_feed.py replay --rate 20     # stand-in feed: replay raw campaigns as updates
+    python live_feed.py follow               # ingest the feed and print running aggregates
+"""
+
+import argparse
+import json
+import threading
+import time
+from datetime import date
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cleaning_pipeline import NOISE_SEED, RAW_FILE, derive_metrics
+from time_index import DIMENSIONS, MEASURES, to_day
+from what_if import BASELINE_CPM
+
+FEED_FILE = 'campaign_updates.jsonl'
+RAW_COLUMNS = ['campaign_id', 'platform', 'influencer_category', 'campaign_type', 'start_date',
+               'engagements', 'estimated_reach', 'product_sales']
+
+# Per-campaign ratios whose spread matters; the other measures only need sums
+RATIOS = ['ROAS', 'CAC', 'engagement_rate', 'conversion_rate']
+
+
+# ============================================================================
+# TAILING THE FEED
+# ============================================================================
+class FeedTailer:
+    """Reads the complete lines appended to a JSONL or CSV file since the last poll"""
+
+    def __init__(self, path=FEED_FILE):
+        self.path = Path(path)
+        self.offset = 0
+        self.malformed = 0
+        self._header = None
+        self._partial = b''
+
+    def poll(self):
+        """Raw updates appended since the last call, as a DataFrame"""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return pd.DataFrame(columns=RAW_COLUMNS)
+        if size < self.offset:           # truncated or replaced: start again
+            self.offset, self._partial, self._header = 0, b'', None
+        if size == self.offset:
+            return pd.DataFrame(columns=RAW_COLUMNS)
+
+        with open(self.path, 'rb') as feed:
+            feed.seek(self.offset)
+            data = self._partial + feed.read(size - self.offset)
+        self.offset = size
+        complete, _, self._partial = data.rpartition(b'\n')
+        lines = [line for line in complete.decode('utf-8').splitlines() if line.strip()]
+        if not lines:
+            return pd.DataFrame(columns=RAW_COLUMNS)
+
+        if self.path.suffix == '.csv':
+            if self._header is None:
+                self._header, lines = lines[0], lines[1:]
+            updates = pd.read_csv(StringIO('\n'.join([self._header] + lines)))
+        else:
+            records = []
+            for line in lines:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    self.malformed += 1
+            updates = pd.DataFrame.from_records(records)
+        return self._validate(updates)
+
+    def _validate(self, updates):
+        """Drop updates with missing fields, unknown platforms or unreadable dates/numbers"""
+        updates = updates.reindex(columns=list(dict.fromkeys(RAW_COLUMNS + list(updates.columns))))
+        updates['start_date'] = pd.to_datetime(updates['start_date'], errors='coerce')
+        for column in ['engagements', 'estimated_reach', 'product_sales']:
+            updates[column] = pd.to_numeric(updates[column], errors='coerce')
+        usable = (updates[RAW_COLUMNS].notna().all(axis=1) & (updates['estimated_reach'] > 0)
+                  & updates['platform'].isin(list(BASELINE_CPM)))
+        self.malformed += int((~usable).sum())
+        return updates[usable].reset_index(drop=True)
+
+
+# ============================================================================
+# ONLINE AGGREGATES
+# ============================================================================
+class OnlineAggregates:
+    """Running count, sums, means and variances per cell × day, merged batch by batch"""
+
+    def __init__(self):
+        self._slots = {}                 # (platform, type, category, day) -> row
+        self._keys = []
+        capacity = 1024
+        self.count = np.zeros(capacity)
+        self.sums = np.zeros((capacity, len(MEASURES)))
+        self.means = np.zeros((capacity, len(RATIOS)))
+        self.m2 = np.zeros((capacity, len(RATIOS)))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _rows_for(self, keys):
+        """Row of every key, adding (and growing the arrays for) unseen keys"""
+        rows = np.empty(len(keys), dtype=np.int64)
+        for position, key in enumerate(keys):
+            row = self._slots.get(key)
+            if row is None:
+                row = self._slots[key] = len(self._keys)
+                self._keys.append(key)
+            rows[position] = row
+        if len(self._keys) > len(self.count):
+            grow = max(len(self._keys), 2 * len(self.count)) - len(self.count)
+            self.count = np.concatenate([self.count, np.zeros(grow)])
+            self.sums = np.vstack([self.sums, np.zeros((grow, len(MEASURES)))])
+            self.means = np.vstack([self.means, np.zeros((grow, len(RATIOS)))])
+            self.m2 = np.vstack([self.m2, np.zeros((grow, len(RATIOS)))])
+        return rows
+
+    def _batch(self, campaigns):
+        """Row of each cell × day in a batch with its count, sums, means and M2"""
+        day = to_day(campaigns['start_date'])
+        codes, keys = pd.MultiIndex.from_arrays(
+            [campaigns[d] for d in DIMENSIONS] + [day]
+        ).factorize()
+        rows = self._rows_for([tuple(key) for key in keys])
+        n_b = np.bincount(codes, minlength=len(keys)).astype(np.float64)
+        sums_b = np.column_stack([np.bincount(codes, campaigns[m].to_numpy(np.float64), len(keys))
+                                  for m in MEASURES])
+        values = campaigns[RATIOS].to_numpy(np.float64)
+        means_b = np.column_stack([np.bincount(codes, values[:, i], len(keys))
+                                   for i in range(len(RATIOS))]) / n_b[:, None]
+        deviations = values - means_b[codes]
+        m2_b = np.column_stack([np.bincount(codes, deviations[:, i] ** 2, len(keys))
+                                for i in range(len(RATIOS))])
+        return rows, n_b, sums_b, means_b, m2_b
+
+    def update(self, campaigns):
+        """Fold a batch of derived campaign rows into the running aggregates"""
+        if len(campaigns) == 0:
+            return
+        rows, n_b, sums_b, means_b, m2_b = self._batch(campaigns)
+
+        # Merge with what each key had before (Chan et al. parallel update)
+        n_a = self.count[rows]
+        n = n_a + n_b
+        delta = means_b - self.means[rows]
+        self.means[rows] += delta * (n_b / n)[:, None]
+        self.m2[rows] += m2_b + delta ** 2 * (n_a * n_b / n)[:, None]
+        self.sums[rows] += sums_b
+        self.count[rows] = n
+
+    def remove(self, campaigns):
+        """Take campaign rows folded in earlier back out (the inverse of update)"""
+        if len(campaigns) == 0:
+            return
+        rows, n_b, sums_b, means_b, m2_b = self._batch(campaigns)
+
+        # Solve the merge for what each key had without the batch
+        n = self.count[rows]
+        n_a = n - n_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means_a = np.where(n_a[:, None] > 0,
+                               (self.means[rows] * n[:, None] - means_b * n_b[:, None]) / n_a[:, None], 0)
+            delta = means_b - means_a
+            m2_a = self.m2[rows] - m2_b - delta ** 2 * (n_a * n_b / n)[:, None]
+        self.means[rows] = means_a
+        self.m2[rows] = np.where(n_a[:, None] > 1, np.maximum(m2_a, 0), 0)   # no spread in 0-1 reports
+        self.sums[rows] -= sums_b
+        self.count[rows] = n_a
+
+    def frame(self):
+        """Current aggregates: one row per cell × day with sums, means and std devs"""
+        used = len(self._keys)
+        result = pd.DataFrame(self._keys, columns=DIMENSIONS + ['day'])
+        result['day'] = pd.to_datetime(result['day'], unit='D')
+        result['campaigns'] = self.count[:used].astype(np.int64)
+        result[MEASURES] = self.sums[:used]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = self.m2[:used] / (self.count[:used, None] - 1)
+        for i, ratio in enumerate(RATIOS):
+            result[f'{ratio}_mean'] = self.means[:used, i]
+            result[f'{ratio}_std'] = np.sqrt(variance[:, i])
+        result = result[result['campaigns'] > 0]           # every report there was superseded
+        return result.sort_values(['day'] + DIMENSIONS).reset_index(drop=True)
+
+
+# ============================================================================
+# FEED -> AGGREGATES (+ DATASET)
+# ============================================================================
+class LiveCampaigns:
+    """Polls the feed once for all callers and keeps aggregates (and a dataset) current
+
+    version counts the batches applied, so each dashboard session can tell
+    whether it has already shown the latest data.
+    """
+
+    def __init__(self, path=FEED_FILE, dataset=None, seed=NOISE_SEED):
+        self.tailer = FeedTailer(path)
+        self.aggregates = OnlineAggregates()
+        self.dataset = dataset
+        self.latest = pd.DataFrame()     # latest derived report per campaign_id (the index)
+        self.updates = 0
+        self.version = 0
+        self.last_update = None
+        self._noise = np.random.RandomState(seed)
+        self._lock = threading.Lock()
+        self.poll()                      # catch up with what is already in the feed
+
+    def poll(self):
+        """Ingest new updates; returns how many were applied"""
+        if not self._lock.acquire(blocking=False):
+            return 0                     # another session is already ingesting
+        try:
+            updates = self.tailer.poll()
+            if len(updates) == 0:
+                return 0
+            # One noise draw per update, continuing the same seeded stream:
+            # replaying the feed from the start reproduces every cost exactly
+            campaigns = derive_metrics(updates, self._noise.uniform(-0.2, 0.2, len(updates)))
+            if 'end_date' in campaigns:
+                campaigns['end_date'] = pd.to_datetime(campaigns['end_date'], errors='coerce')
+            self.updates += len(campaigns)
+
+            # Each campaign's latest report replaces its earlier one
+            campaigns = campaigns.drop_duplicates('campaign_id', keep='last').reset_index(drop=True)
+            superseded = self.latest[self.latest.index.isin(campaigns['campaign_id'])]
+            self.aggregates.remove(superseded.reset_index())
+            self.aggregates.update(campaigns)
+            self.latest = pd.concat([self.latest.drop(superseded.index), campaigns.set_index('campaign_id')])
+            if self.dataset is not None:
+                self.dataset.apply_updates(campaigns)
+            self.version += 1
+            self.last_update = pd.Timestamp.now()
+            return len(updates)
+        finally:
+            self._lock.release()
+
+
+# ============================================================================
+# STAND-IN FEED AND COMMAND LINE
+# ============================================================================
+def replay(path=FEED_FILE, raw_path=RAW_FILE, rate=10.0, limit=None, seed=0):
+    """Append random raw campaigns, dated today, to the feed at `rate` updates/sec"""
+    raw = pd.read_csv(raw_path)
+    rng = np.random.default_rng(seed)
+    path = Path(path)
+    written = 0
+    with open(path, 'a', encoding='utf-8') as feed:
+        while limit is None or written < limit:
+            update = raw.iloc[int(rng.integers(len(raw)))].to_dict()
+            update['start_date'] = str(date.today())
+            if path.suffix == '.csv':
+                if feed.tell() == 0:
+                    feed.write(','.join(update) + '\n')
+                feed.write(','.join(str(value) for value in update.values()) + '\n')
+            else:
+                feed.write(json.dumps(update, default=str) + '\n')
+            feed.flush()
+            written += 1
+            time.sleep(1 / rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    replay_parser = commands.add_parser('replay', help='append raw campaigns to the feed')
+    replay_parser.add_argument('--feed', default=FEED_FILE)
+    replay_parser.add_argument('--input', default=RAW_FILE)
+    replay_parser.add_argument('--rate', type=float, default=10.0, help='updates per second')
+    replay_parser.add_argument('--limit', type=int)
+
+    follow_parser = commands.add_parser('follow', help='ingest the feed and print aggregates')
+    follow_parser.add_argument('--feed', default=FEED_FILE)
+    follow_parser.add_argument('--interval', type=float, default=2.0, help='seconds between polls')
+    args = parser.parse_args()
+
+    if args.command == 'replay':
+        print(f"📡 Appending updates to {args.feed} at {args.rate:g}/sec (Ctrl+C to stop)")
+        try:
+            replay(args.feed, args.input, args.rate, args.limit)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    live = LiveCampaigns(args.feed)
+    print(f"📡 Following {args.feed}: {live.updates:,} updates so far")
+    try:
+        while True:
+            time.sleep(args.interval)
+            if live.poll():
+                today = live.aggregates.frame()
+                today = today[today['day'] == today['day'].max()]
+                summary = today.groupby('platform')[['campaigns', 'campaign_cost', 'revenue']].sum()
+                summary['ROAS'] = summary['revenue'] / summary['campaign_cost']
+                print(f"\n{pd.Timestamp.now():%H:%M:%S}  {live.updates:,} updates "
+                      f"({live.tailer.malformed} malformed), latest day by platform:")
+                print(summary.round(2).to_string())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
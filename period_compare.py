@@ -0,0 +1,124 @@
+"""
+PERIOD-OVER-PERIOD COMPARISON OF KPIs
+=====================================
+A KPI on its own ("ROAS 2.41") says little; against a baseline ("+0.18
+vs the previous quarter") it says whether things are getting better.
+Every date window gets one of two baselines:
+
+    previous period          the same number of days, ending the day
+                             before the window starts
+    same period last year    the window shifted back one calendar year
+
+Both windows are answered by the time index (see time_index.py): each is
+one cell_totals() lookup, two binary searches per cell, however many
+campaigns they contain. A baseline window lies in the past, so its cell
+totals only change when new data lands inside it: the dashboard caches
+them under the dataset's range_version() of the baseline window, and
+moving the current window (or returning to an earlier one) does not
+recompute history.
+
+The KPIs match the dashboard's top row: spend, revenue and sales are
+sums, ROAS is total revenue / total spend and CAC the mean per-campaign
+CAC. Per-platform metrics use campaign means for ROAS and CAC, like the
+platform charts.
+
+Usage:
+    window = baseline_window('2024-04-01', '2024-06-30', 'previous period')
+    current = index.cell_totals('2024-04-01', '2024-06-30', platform=['TikTok'])
+    baseline = index.cell_totals(*window, platform=['TikTok'])
+    compare(kpis(current), kpis(baseline))
+    compare_frames(platform_metrics(current), platform_metrics(baseline))
+"""
+
+import numpy as np
+import pandas as pd
+
+from time_index import COUNT, rollup
+
+COMPARISONS = ['previous period', 'same period last year']
+
+# KPI -> (label, value format, whether a rise is good: True, False or None for neutral)
+KPIS = {
+    'spend': ('Total Spend', '${:,.0f}', None),
+    'revenue': ('Total Revenue', '${:,.0f}', True),
+    'ROAS': ('Overall ROAS', '{:.2f}', True),
+    'CAC': ('Avg CAC', '${:.2f}', False),
+    'sales': ('Total Sales', '{:,.0f}', True),
+    'campaigns': ('Campaigns', '{:,.0f}', None),
+}
+PLATFORM_METRICS = ['spend', 'revenue', 'ROAS', 'CAC', 'campaigns']
+
+
+def baseline_window(start, end, comparison):
+    """(first day, last day) of the baseline for the window start..end (both days included)"""
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    if comparison == 'previous period':
+        length = end - start + pd.Timedelta(days=1)
+        return start - length, start - pd.Timedelta(days=1)
+    if comparison == 'same period last year':
+        return start - pd.DateOffset(years=1), end - pd.DateOffset(years=1)
+    raise ValueError(f"Unknown comparison {comparison!r}: use one of {', '.join(COMPARISONS)}")
+
+
+def kpis(totals):
+    """Top-row KPIs (Series) from cell totals (cell_totals() output, or any frame of its columns)"""
+    campaigns = totals[COUNT].sum()
+    spend = totals['campaign_cost'].sum()
+    revenue = totals['revenue'].sum()
+    return pd.Series({
+        'spend': spend,
+        'revenue': revenue,
+        'ROAS': revenue / spend if spend > 0 else np.nan,
+        'CAC': totals['CAC'].sum() / campaigns if campaigns > 0 else np.nan,
+        'sales': totals['product_sales'].sum(),
+        'campaigns': campaigns,
+    })
+
+
+def platform_metrics(totals):
+    """Spend, revenue, mean ROAS, mean CAC and campaigns per platform from cell totals"""
+    grouped = rollup(totals, 'platform', sums=['campaign_cost', 'revenue'], means=['ROAS', 'CAC'])
+    return grouped.rename(columns={'campaign_cost': 'spend', COUNT: 'campaigns'})[PLATFORM_METRICS]
+
+
+def change(current, baseline):
+    """Relative change current / baseline - 1 (NaN without a baseline)"""
+    current, baseline = np.asarray(current, dtype=float), np.asarray(baseline, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.where(baseline > 0, current / baseline - 1, np.nan)
+    return result if result.ndim else float(result)
+
+
+def compare(current, baseline):
+    """current, baseline and relative change per KPI (from two kpis() Series)"""
+    baseline = baseline.reindex(current.index)
+    return pd.DataFrame({'current': current, 'baseline': baseline,
+                         'change': change(current, baseline)})
+
+
+def compare_frames(current, baseline):
+    """Metrics of current with a '<metric>_change' column each, versus baseline (same index)
+
+    Rows only in the baseline (a platform that stopped) are kept with a
+    current value of 0; rows only in current get a NaN change.
+    """
+    rows = current.index.union(baseline.index)
+    current = current.reindex(rows).fillna({'spend': 0.0, 'revenue': 0.0, 'campaigns': 0.0})
+    baseline = baseline.reindex(rows)
+    result = current.copy()
+    for metric in current.columns:
+        result[f'{metric}_change'] = change(current[metric], baseline[metric])
+    return result[[column for metric in current.columns for column in (metric, f'{metric}_change')]]
+
+
+def format_change(value):
+    """'+12.3%', or 'new' when there is no baseline to compare with"""
+    return 'new' if pd.isna(value) else f"{value:+.1%}"
+
+
+def describe_window(start, end):
+    """'Jan 1 – Mar 31, 2024'"""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if start.year == end.year:
+        return f"{start:%b} {start.day} – {end:%b} {end.day}, {end.year}"
+    return f"{start:%b} {start.day}, {start.year} – {end:%b} {end.day}, {end.year}"
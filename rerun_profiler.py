@@ -0,0 +1,178 @@
+"""
+PER-RERUN PROFILER FOR THE DASHBOARD
+====================================
+When a rerun feels slow, the total time in the sidebar does not say where
+it went. RerunProfiler records one row per instrumented step of a rerun:
+
+    name      what ran (a section, a rollup, a chart, a styled table)
+    depth     nesting level (steps inside a section have depth 1)
+    ms        wall time
+    rows      rows of the data the step worked on
+    cache     'hit' / 'miss' for cached figures, blank otherwise
+    bytes     payload size (figure JSON, table memory)
+
+The profiler lives in st.session_state, so every analyst has their own
+history of the last HISTORY_RERUNS reruns. Disabled profilers do nothing
+but hand out a throwaway record, so the instrumentation can stay in place.
+
+Section fragments rerun without the rest of the script; such a rerun is
+recorded as its own entry (kind "section") and shows up in the history.
+Decorate a section with profiler.section so its entry is closed when the
+fragment returns, not when the analyst next interacts.
+
+Usage:
+    profiler = RerunProfiler.for_session(st.session_state, enabled=True)
+    profiler.begin('full rerun')
+    with profiler.step('chart: budget_pie', rows=len(data)) as step:
+        step['cache'] = 'hit'
+    rollup = profiler.wrap(rollup, lambda totals, by, **_: f'rollup by {by}')
+    render_overview = st.fragment(profiler.section(render_overview))
+    profiler.finish()
+    profiler.export()        # JSON bytes of the whole history
+"""
+
+import functools
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+HISTORY_RERUNS = 50
+SESSION_KEY = 'rerun_profiler'
+
+
+class RerunProfiler:
+    """Step timings of the current rerun plus a rolling history of past reruns"""
+
+    def __init__(self, history=HISTORY_RERUNS):
+        self.enabled = False
+        self.current = None
+        self.history = deque(maxlen=history)
+        self._depth = 0
+
+    @classmethod
+    def for_session(cls, session_state, enabled=False):
+        """The session's profiler (created on first use), switched on or off"""
+        if SESSION_KEY not in session_state:
+            session_state[SESSION_KEY] = cls()
+        profiler = session_state[SESSION_KEY]
+        profiler.enabled = enabled
+        return profiler
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def begin(self, kind):
+        """Start recording a rerun; a section fragment joins an open full rerun"""
+        if not self.enabled:
+            return
+        if self.current is not None:
+            if kind == 'section' and not self.current['finished']:
+                return
+            self._close()
+        self.current = {'kind': kind, 'started': datetime.now().isoformat(timespec='seconds'),
+                        'finished': False, 'steps': [], '_clock': time.perf_counter()}
+        self._depth = 0
+
+    def finish(self):
+        """End the full rerun and add it to the history"""
+        if self.enabled and self.current is not None:
+            self.current['finished'] = True
+            self._close()
+
+    def section(self, func):
+        """func recorded as its own "section" rerun, closed when it returns
+
+        Called during a full rerun, func just runs as part of that rerun.
+        """
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            own = self.enabled and self.current is None
+            self.begin('section')
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if own and self.current is not None:
+                    self._close()
+        return run
+
+    def _close(self):
+        run = self.current
+        run['total_ms'] = (time.perf_counter() - run.pop('_clock')) * 1000
+        self.history.append(run)
+        self.current = None
+
+    @contextmanager
+    def step(self, name, rows=None):
+        """Time the block; the yielded dict takes rows / cache / bytes"""
+        record = {'name': name, 'depth': self._depth, 'ms': 0.0, 'rows': rows,
+                  'cache': None, 'bytes': None}
+        if not self.enabled or self.current is None:
+            yield record
+            return
+
+        self.current['steps'].append(record)
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['ms'] = (time.perf_counter() - started) * 1000
+            self._depth -= 1
+
+    def wrap(self, func, label):
+        """func with every call recorded as a step named label(*args, **kwargs)"""
+        def profiled(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            with self.step(label(*args, **kwargs)) as record:
+                result = func(*args, **kwargs)
+                # Rows processed: the first frame passed in, else the frame returned
+                frames = [a for a in args if isinstance(a, pd.DataFrame)] or [result]
+                record['rows'] = len(frames[0]) if isinstance(frames[0], pd.DataFrame) else None
+            return result
+        return profiled
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def last_run(self):
+        """Steps of the most recent finished rerun as a table"""
+        if not self.history:
+            return pd.DataFrame(columns=['step', 'ms', 'rows', 'cache', 'KB'])
+        steps = pd.DataFrame(self.history[-1]['steps'],
+                             columns=['name', 'depth', 'ms', 'rows', 'cache', 'bytes'])
+        return pd.DataFrame({
+            'step': [('   ' * (depth - 1) + '↳ ' if depth else '') + name
+                     for name, depth in zip(steps['name'], steps['depth'])],
+            'ms': steps['ms'].round(1),
+            'rows': steps['rows'].astype('Int64'),
+            'cache': steps['cache'].fillna(''),
+            'KB': (steps['bytes'].astype('Float64') / 1024).round(1),
+        })
+
+    def history_table(self):
+        """One row per recorded rerun: when, kind, total and slowest step"""
+        rows = []
+        for number, run in enumerate(self.history, 1):
+            steps = run['steps']
+            # Slowest leaf step: a section's time is the sum of what ran inside it
+            leaves = [s for s, after in zip(steps, steps[1:] + [None])
+                      if after is None or after['depth'] <= s['depth']]
+            slowest = max(leaves, key=lambda s: s['ms'], default=None)
+            rows.append({
+                'rerun': number,
+                'started': run['started'],
+                'kind': run['kind'],
+                'total_ms': round(run['total_ms'], 1),
+                'steps': len(run['steps']),
+                'slowest': f"{slowest['name']} ({slowest['ms']:.0f} ms)" if slowest else '',
+            })
+        return pd.DataFrame(rows, columns=['rerun', 'started', 'kind', 'total_ms', 'steps', 'slowest'])
+
+    def export(self):
+        """The whole history as JSON bytes, for offline analysis"""
+        return json.dumps({'reruns': list(self.history)}, indent=1, default=str).encode()
@@ -0,0 +1,155 @@
+"""
+DASHBOARD SNAPSHOT: ONE FILE, ONE MEMORY-MAPPED READ
+====================================================
+A cold dashboard start used to parse the whole cleaned CSV, convert both
+date columns and build the time index before anything could be drawn.
+The snapshot holds the result of that work, written once at the end of
+the cleaning stage:
+
+    campaigns         the typed campaign frame (dates already datetime64)
+    index_cells       the time index cells (platform × type × category)
+    index_keys        its sorted (cell, day) keys
+    index_cumulative  its cumulative sums
+    default_totals    cell totals over the whole date range, no filters
+    default_monthly   monthly totals for the same default state
+    manifest          files + fingerprints the snapshot was built from
+
+File layout: an 8-byte magic, the header length, a JSON header listing
+every section's offset and length, then the sections themselves, each
+aligned to 64 bytes. Frames are Arrow IPC streams, arrays are raw numpy
+bytes. read_snapshot() memory-maps the file once and slices it: arrays
+are zero-copy views and frames are converted straight from the mapping.
+
+The manifest ties the snapshot to the CSV it came from; CampaignDataset
+(campaign_dataset.py) uses it to decide whether the snapshot is current,
+needs only the rows appended since, or must be ignored.
+
+Usage:
+    python snapshot.py                          # build from the cleaned CSV
+    python snapshot.py --check                  # load it and compare to the CSV
+    snap = read_snapshot('influencer_marketing_cleaned.snapshot')
+    snap.tables['campaigns'], snap.arrays['index_keys'], snap.meta['manifest']
+"""
+
+import argparse
+import json
+import struct
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+MAGIC = b'CAMPSNAP'
+FORMAT_VERSION = 1
+ALIGN = 64
+
+Snapshot = namedtuple('Snapshot', ['tables', 'arrays', 'meta'])
+
+
+class SnapshotError(ValueError):
+    """The file is not a snapshot this code can read"""
+
+
+def snapshot_path(csv_path):
+    """Where the snapshot of a cleaned CSV lives: same name, .snapshot suffix"""
+    return Path(csv_path).with_suffix('.snapshot')
+
+
+def _arrow_bytes(frame):
+    """Arrow IPC stream of a frame (a RangeIndex is stored as metadata only)"""
+    table = pa.Table.from_pandas(frame)
+    sink = pa.BufferOutputStream()
+    with ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def write_snapshot(path, tables=None, arrays=None, meta=None):
+    """Write frames (as Arrow) and numpy arrays into one aligned snapshot file"""
+    sections, payloads, offset = {}, [], 0
+    for name, frame in (tables or {}).items():
+        data = _arrow_bytes(frame)
+        sections[name] = {'kind': 'arrow', 'offset': offset, 'length': data.size}
+        payloads.append(data)
+        offset += -(-data.size // ALIGN) * ALIGN
+    for name, array in (arrays or {}).items():
+        array = np.ascontiguousarray(array)
+        sections[name] = {'kind': 'numpy', 'offset': offset, 'length': array.nbytes,
+                          'dtype': array.dtype.str, 'shape': list(array.shape)}
+        payloads.append(array.tobytes())
+        offset += -(-array.nbytes // ALIGN) * ALIGN
+
+    header = json.dumps({'format': FORMAT_VERSION, 'sections': sections,
+                         'meta': meta or {}}, default=str).encode()
+    start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+
+    path = Path(path)
+    partial = path.with_suffix(path.suffix + '.tmp')
+    with open(partial, 'wb') as out:
+        out.write(MAGIC + struct.pack('<Q', len(header)) + header)
+        for name, payload in zip(sections, payloads):
+            out.seek(start + sections[name]['offset'])
+            out.write(payload)
+        out.truncate(start + offset)
+    partial.replace(path)           # readers never see a half-written snapshot
+    return path
+
+
+def read_snapshot(path):
+    """Map the file once and return its frames, arrays and metadata"""
+    mapped = pa.memory_map(str(path)).read_buffer()
+    if mapped.size < len(MAGIC) + 8 or mapped[:len(MAGIC)].to_pybytes() != MAGIC:
+        raise SnapshotError(f"{path} is not a dashboard snapshot")
+    (header_length,) = struct.unpack('<Q', mapped[len(MAGIC):len(MAGIC) + 8].to_pybytes())
+    header = json.loads(mapped[len(MAGIC) + 8:len(MAGIC) + 8 + header_length].to_pybytes())
+    if header.get('format') != FORMAT_VERSION:
+        raise SnapshotError(f"{path} has snapshot format {header.get('format')}, "
+                            f"expected {FORMAT_VERSION}")
+    start = -(-(len(MAGIC) + 8 + header_length) // ALIGN) * ALIGN
+
+    tables, arrays = {}, {}
+    for name, section in header['sections'].items():
+        data = mapped.slice(start + section['offset'], section['length'])
+        if section['kind'] == 'arrow':
+            tables[name] = ipc.open_stream(data).read_all().to_pandas()
+        else:
+            arrays[name] = np.frombuffer(data, dtype=section['dtype']).reshape(section['shape'])
+    return Snapshot(tables, arrays, header['meta'])
+
+
+def main():
+    from campaign_dataset import CLEANED_FILE, CampaignDataset
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', default=CLEANED_FILE)
+    parser.add_argument('--check', action='store_true',
+                        help='load the snapshot and compare it with a fresh CSV load')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    from_csv = CampaignDataset.load(args.input, use_snapshot=False)
+    csv_seconds = time.perf_counter() - started
+    if not args.check:
+        path = from_csv.save_snapshot()
+        print(f"✓ Snapshot saved to: {path} ({path.stat().st_size / 1e6:,.1f} MB)")
+        return
+
+    started = time.perf_counter()
+    from_snapshot = CampaignDataset.load(args.input)
+    snapshot_seconds = time.perf_counter() - started
+    same = (from_snapshot.loaded_from == 'snapshot'
+            and from_snapshot.frame.equals(from_csv.frame)
+            and from_snapshot.index.cell_totals('1900-01-01', '2200-01-01').equals(
+                from_csv.index.cell_totals('1900-01-01', '2200-01-01')))
+    print(f"CSV load {csv_seconds:.2f} s, snapshot load {snapshot_seconds:.2f} s "
+          f"({from_snapshot.loaded_from})")
+    print("✓ Snapshot matches the CSV" if same else "✗ Snapshot differs from the CSV")
+    raise SystemExit(0 if same else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,349 @@
+"""
+MULTI-TENANT DATASETS UNDER ONE MEMORY BUDGET
+=============================================
+One dashboard server can serve several brands, each with its own cleaned
+campaign data:
+
+    influencer_marketing_cleaned.csv                   the "default" tenant
+    tenants/<brand>/influencer_marketing_cleaned.csv   one folder per brand
+
+(run 01 inside a brand's folder to create its files there). A tenant's
+sample, snapshot and live feed live next to its CSV, as they do for the
+default tenant.
+
+TenantRegistry loads a tenant only when a session first asks for it: its
+CampaignDataset (frame, time index, manifest) is read on a small pool of
+loader threads, one load in flight per tenant, so a large brand's first
+load does not hold up a small brand's. A load is measured, and the budget
+enforced, when it completes. Everything derived from the dataset (sample
+index, campaign sort orders, elasticity fits, bootstrap intervals, ...) is
+kept in the tenant's own cache through cached(). Each tenant is measured
+in bytes: the dataset once loaded (and again after each refresh), every
+cache entry when it is stored. Objects shared between entries and the
+dataset (a sort order that holds the campaign frame, say) are counted once.
+
+When the total passes the budget, whole tenants are evicted, least
+recently used first; the tenant being served is never evicted to make
+room for itself. A single tenant's cache entries may use at most
+CACHE_SHARE of the budget: beyond that its oldest entries are dropped, so
+one large brand's cached aggregates cannot push every other brand out.
+An evicted tenant is simply loaded again on its next visit.
+
+Pinned entries (cached(..., pinned=True)) are never dropped to make room;
+they go only with their whole tenant. Use them for state that must live
+as long as the dataset, such as the live feed follower that appends to
+the tenant's time index (building a second one would replay the feed
+into the same index).
+
+Per-tenant bytes, loads, evictions and cache hit rates are kept across
+evictions, for the dashboard sidebar.
+
+Usage:
+    registry = TenantRegistry(max_bytes=2 * 1024 ** 3)
+    registry.names()                                  # ['default', 'acme', ...]
+    dataset = registry.dataset('acme')                # loads on first use
+    pages = registry.cached('acme', 'campaign pages', dataset.version,
+                            lambda: CampaignPages(dataset.frame), max_entries=1)
+    registry.stats()
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from types import FunctionType, MethodType, ModuleType
+
+import numpy as np
+import pandas as pd
+
+from campaign_dataset import CLEANED_FILE, CampaignDataset
+
+TENANTS_FOLDER = 'tenants'
+DEFAULT_TENANT = 'default'
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3     # 2 GB for all tenants together
+CACHE_SHARE = 0.25                    # most of the budget one tenant's cache entries may use
+LOADER_THREADS = 4                    # tenants loading at the same time
+
+
+def deep_size(value, seen=None):
+    """Approximate bytes held by value: frames, arrays and the objects holding them
+
+    Objects whose id is in `seen` count as 0, and every object visited is
+    added to it, so sharing one `seen` counts shared data once.
+    """
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, Future):
+        if not value.done() or value.cancelled() or value.exception() is not None:
+            return 0
+        return deep_size(value.result(), seen)
+    if isinstance(value, (type, ModuleType, FunctionType, MethodType)):
+        return 0
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(deep_size(k, seen) + deep_size(v, seen)
+                                          for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(deep_size(item, seen) for item in value)
+    fields = getattr(value, '__dict__', None)
+    if fields is not None:
+        return sys.getsizeof(value) + deep_size(fields, seen)
+    return sys.getsizeof(value)
+
+
+def discover_tenants(main_file=CLEANED_FILE, folder=TENANTS_FOLDER):
+    """Tenant name -> cleaned CSV path: the default tenant, then one per brand folder"""
+    main_file = Path(main_file)
+    tenants = {DEFAULT_TENANT: main_file}
+    root = main_file.parent / folder
+    if root.is_dir():
+        for path in sorted(root.glob(f'*/{main_file.name}')):
+            tenants.setdefault(path.parent.name, path)
+    return tenants
+
+
+class Tenant:
+    """One tenant's loaded state (dataset and caches) and its lifetime counters"""
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = Path(path)
+        self.loader = None            # Future of the CampaignDataset, None when not loaded
+        self.entries = OrderedDict()  # (kind, key) -> (value, bytes), least recently used first
+        self.pinned = set()           # (kind, key) of entries only dropped with the whole tenant
+        self.dataset_bytes = 0
+        self.cache_bytes = 0
+        self.dataset_version = None   # version the dataset was last measured at
+        self.dataset_seen = set()     # ids counted in dataset_bytes
+        self.last_used = None
+        self.generation = 0           # bumped by unload(): results computed before it are not stored
+        self.loads = 0
+        self.evictions = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def bytes_used(self):
+        return self.dataset_bytes + self.cache_bytes
+
+    @property
+    def folder(self):
+        """Where the tenant's sample, snapshot and live feed files are"""
+        return self.path.parent
+
+    def state(self):
+        if self.loader is None:
+            return 'cached' if self.entries else 'not loaded'
+        if not self.loader.done():
+            return 'loading'
+        return 'failed' if self.loader.exception() is not None else 'loaded'
+
+    def unload(self):
+        """Drop the dataset and every cache entry (counters stay)"""
+        self.loader = None
+        self.entries.clear()
+        self.pinned.clear()
+        self.dataset_bytes = self.cache_bytes = 0
+        self.dataset_version = None
+        self.dataset_seen = set()
+        self.generation += 1
+
+
+class TenantRegistry:
+    """Lazily loaded tenants sharing one memory budget, evicted least recently used first"""
+
+    def __init__(self, main_file=CLEANED_FILE, folder=TENANTS_FOLDER,
+                 max_bytes=DEFAULT_MAX_BYTES, cache_share=CACHE_SHARE,
+                 loader_threads=LOADER_THREADS):
+        self.main_file = main_file
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.cache_share = cache_share
+        self.evictions = 0
+        self._tenants = {}
+        self._resident = OrderedDict()   # names of tenants holding memory, least recently used first
+        self._executor = ThreadPoolExecutor(max_workers=loader_threads,
+                                            thread_name_prefix='tenant-loader')
+        self._lock = threading.RLock()
+
+    def names(self):
+        """Tenant names, default first (the tenants folder is scanned on each call)"""
+        return list(discover_tenants(self.main_file, self.folder))
+
+    def tenant(self, name):
+        """The Tenant for name (KeyError for unknown tenants)"""
+        with self._lock:
+            if name not in self._tenants:
+                self._tenants[name] = Tenant(name, discover_tenants(self.main_file, self.folder)[name])
+            return self._tenants[name]
+
+    @property
+    def bytes_used(self):
+        return sum(self._tenants[name].bytes_used for name in self._resident)
+
+    # ------------------------------------------------------------------
+    # Datasets
+    # ------------------------------------------------------------------
+    def loader(self, name):
+        """Future of the tenant's CampaignDataset; starts loading it on first use"""
+        with self._lock:
+            tenant = self._touch(name)
+            if tenant.loader is None:
+                tenant.loads += 1
+                tenant.loader = self._executor.submit(CampaignDataset.load, tenant.path)
+                loader = tenant.loader
+                loader.add_done_callback(lambda _: self._loaded(name, loader))
+            return tenant.loader
+
+    def dataset(self, name):
+        """The tenant's CampaignDataset, waiting for it to load"""
+        return self.loader(name).result()
+
+    def _loaded(self, name, loader):
+        with self._lock:
+            if self._tenants[name].loader is loader and loader.exception() is None:
+                self.account(name)
+
+    def account(self, name):
+        """Measure the tenant's dataset again if a refresh changed it, then enforce the budget"""
+        with self._lock:
+            tenant = self._tenants[name]
+            if tenant.loader is None or not tenant.loader.done() or tenant.loader.exception():
+                return
+            dataset = tenant.loader.result()
+            if tenant.dataset_version != dataset.version:
+                seen = set()
+                tenant.dataset_bytes = deep_size(dataset, seen)
+                tenant.dataset_seen = seen
+                tenant.dataset_version = dataset.version
+            self._enforce(keep=name)
+
+    # ------------------------------------------------------------------
+    # Per-tenant caches
+    # ------------------------------------------------------------------
+    def cached(self, name, kind, key, compute, max_entries=None, pinned=False):
+        """compute() stored under (kind, key) in the tenant's cache; the stored value on a hit
+
+        Values are shared by every session: callers must not modify them.
+        max_entries caps the entries of this kind (oldest dropped first).
+        A pinned entry is not dropped to stay within the budget, only with
+        its tenant (or by forget()).
+        """
+        with self._lock:
+            tenant = self._touch(name)
+            entry = tenant.entries.get((kind, key))
+            if entry is not None:
+                tenant.entries.move_to_end((kind, key))
+                tenant.hits += 1
+                return entry[0]
+            tenant.misses += 1
+            seen, generation = set(tenant.dataset_seen), tenant.generation
+
+        value = compute()
+        size = deep_size(value, seen)
+        with self._lock:
+            if tenant.generation != generation:
+                return value                      # evicted meanwhile
+            self._resident[name] = None
+            self._resident.move_to_end(name)
+            old = tenant.entries.pop((kind, key), None)
+            tenant.cache_bytes += size - (old[1] if old else 0)
+            tenant.entries[(kind, key)] = (value, size)
+            if pinned:
+                tenant.pinned.add((kind, key))
+            if max_entries is not None:
+                same_kind = [k for k in tenant.entries if k[0] == kind]
+                for stale in same_kind[:-max_entries]:
+                    self._drop(tenant, stale)
+            self._enforce(keep=name)
+        return value
+
+    def forget(self, name, kind):
+        """Drop the tenant's cache entries of one kind"""
+        with self._lock:
+            tenant = self.tenant(name)
+            for key in [k for k in tenant.entries if k[0] == kind]:
+                self._drop(tenant, key)
+
+    def _drop(self, tenant, key):
+        _, size = tenant.entries.pop(key)
+        tenant.pinned.discard(key)
+        tenant.cache_bytes -= size
+
+    def _droppable(self, tenant):
+        """The tenant's unpinned cache keys, least recently used first"""
+        return (key for key in list(tenant.entries) if key not in tenant.pinned)
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+    def _touch(self, name):
+        tenant = self.tenant(name)
+        tenant.last_used = time.time()
+        self._resident[name] = None
+        self._resident.move_to_end(name)
+        return tenant
+
+    def evict(self, name):
+        """Unload one tenant now (its next use loads it again)"""
+        with self._lock:
+            tenant = self.tenant(name)
+            if name in self._resident:
+                del self._resident[name]
+                tenant.unload()
+                tenant.evictions += 1
+                self.evictions += 1
+
+    def _enforce(self, keep):
+        """Trim keep's cache to its share, then evict other tenants, oldest use first"""
+        tenant = self._tenants[keep]
+        share = self.cache_share * self.max_bytes
+        for key in self._droppable(tenant):
+            if tenant.cache_bytes <= share:
+                break
+            self._drop(tenant, key)
+        for name in list(self._resident):
+            if self.bytes_used <= self.max_bytes:
+                break
+            if name != keep:
+                self.evict(name)
+        # Still over budget: the tenant being served keeps its dataset and pinned entries
+        for key in self._droppable(tenant):
+            if self.bytes_used <= self.max_bytes:
+                break
+            self._drop(tenant, key)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def stats(self):
+        """One row per tenant: state, memory, loads, evictions and cache hit rate"""
+        with self._lock:
+            rows = []
+            for name in self.names():
+                tenant = self.tenant(name)
+                lookups = tenant.hits + tenant.misses
+                dataset = tenant.loader.result() if tenant.state() == 'loaded' else None
+                rows.append({
+                    'tenant': name,
+                    'state': tenant.state(),
+                    'campaigns': len(dataset.frame) if dataset is not None else 0,
+                    'data_mb': tenant.dataset_bytes / 1e6,
+                    'cache_mb': tenant.cache_bytes / 1e6,
+                    'cache_entries': len(tenant.entries),
+                    'hit_rate': tenant.hits / lookups if lookups else 0.0,
+                    'loads': tenant.loads,
+                    'evictions': tenant.evictions,
+                    'last_used': pd.Timestamp(tenant.last_used, unit='s') if tenant.last_used else pd.NaT,
+                })
+            return pd.DataFrame(rows)
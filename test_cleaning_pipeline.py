@@ -0,0 +1,57 @@
+"""
+PARITY TEST: PANDAS AND POLARS CLEANING BACKENDS
+================================================
+Runs both backends of cleaning_pipeline.py on a small generated raw export
+with the dirt the cleaning steps handle (duplicate rows, campaigns without
+sales or engagements) and checks compare_outputs() finds no difference.
+
+HOW TO RUN:
+    python -m pytest -q test_cleaning_pipeline.py
+
+Skipped when polars is not installed.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cleaning_pipeline import clean_pandas, collect_polars, compare_outputs
+from what_if import BASELINE_CPM
+
+pytest.importorskip('polars')
+
+
+def write_raw_csv(path, rows=500, seed=7):
+    """A raw export like influencer_marketing_roi_dataset.csv, with duplicates and zero counts"""
+    rng = np.random.RandomState(seed)
+    start = pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.randint(0, 730, rows), unit='D')
+    duration = rng.randint(1, 60, rows)
+    raw = pd.DataFrame({
+        'campaign_id': [f'CAMP{100000 + i}' for i in range(rows)],
+        'platform': rng.choice(list(BASELINE_CPM), rows),
+        'influencer_category': rng.choice(['Gaming', 'Beauty', 'Tech', 'Fitness'], rows),
+        'campaign_type': rng.choice(['Product Launch', 'Brand Awareness', 'Giveaway'], rows),
+        'start_date': start.strftime('%Y-%m-%d'),
+        'engagements': rng.randint(0, 50_000, rows),
+        'estimated_reach': rng.randint(1_000, 500_000, rows),
+        'product_sales': rng.randint(0, 3_000, rows),
+        'campaign_duration_days': duration,
+        'end_date': (start + pd.to_timedelta(duration, unit='D')).strftime('%Y-%m-%d'),
+    })
+    raw.loc[::9, 'product_sales'] = 0
+    raw.loc[::13, 'engagements'] = 0
+    # Exact duplicates, spread through the file, that both backends must drop
+    dirty = pd.concat([raw, raw.iloc[::17], raw.iloc[5:8]]).sample(frac=1, random_state=seed)
+    dirty.to_csv(path, index=False)
+    return raw
+
+
+def test_polars_matches_pandas(tmp_path):
+    path = tmp_path / 'raw.csv'
+    raw = write_raw_csv(path)
+
+    expected = clean_pandas(path)
+    got = collect_polars(path)
+
+    assert len(expected) == len(raw)
+    assert compare_outputs(expected, got) == []
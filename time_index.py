@@ -0,0 +1,269 @@
+"""
+PREFIX-SUM TIME INDEX FOR DATE-RANGE KPIs
+=========================================
+The date-range filter is the control analysts change most, and every change
+used to re-scan all campaign rows to add up spend, revenue and sales.
+
+CampaignTimeIndex keeps, for every cell (platform × campaign_type ×
+influencer_category), the daily totals of the additive measures as running
+(cumulative) sums. The total of any measure over any date range is then
+
+    cumsum[last day <= end] - cumsum[last day < start]
+
+which is two binary-search lookups per cell, independent of how many
+campaigns the range contains. Means such as average ROAS or CAC are exact
+too: we keep the SUM of the per-campaign values plus a campaign count, and
+divide at the end (that is exactly what groupby(...).mean() computes).
+
+Weighted rows: if the frame has a sample_weight column (see approximate.py)
+every measure is multiplied by it and the campaign count becomes the sum of
+weights, so an index built from a stratified sample returns estimates of the
+full-data totals through the same queries.
+
+Layout:
+    - every (cell, day) pair gets a sortable key = cell_id * DAY_SPAN + day
+    - a chunk holds keys in sorted order next to the cumulative sums of all
+      measures, so one np.searchsorted call answers every cell at once
+    - appending new days builds a new chunk from the new rows only; chunks
+      are merged (compacted) once there are more than max_chunks of them
+
+Usage:
+    index = CampaignTimeIndex.from_frame(df)
+    totals = index.cell_totals('2023-01-01', '2023-03-31', platform=['TikTok'])
+    monthly = index.monthly('2023-01-01', '2023-12-31')
+    rollup(totals, 'platform', sums=['revenue'], means=['ROAS'])
+    index.append(new_rows)
+    cells, keys, cumulative = index.to_arrays()      # saved in the dashboard snapshot
+"""
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ['platform', 'campaign_type', 'influencer_category']
+
+# Additive per-campaign values. ROAS, CAC and the rates are stored as sums so
+# that their campaign-level means can be re-derived for any range.
+MEASURES = [
+    'campaign_cost', 'revenue', 'product_sales', 'engagements', 'estimated_reach',
+    'ROAS', 'CAC', 'engagement_rate', 'conversion_rate',
+]
+COUNT = 'campaigns'
+WEIGHT = 'sample_weight'
+
+DAY_SPAN = 1 << 32          # key = cell_id * DAY_SPAN + day + DAY_OFFSET
+DAY_OFFSET = 1 << 31        # lets days before 1970 stay positive
+
+
+def to_day(value):
+    """Convert a date-like value (or Series of them) to integer days since 1970"""
+    if isinstance(value, pd.Series):
+        return value.values.astype('datetime64[D]').astype(np.int64)
+    return int(np.datetime64(pd.Timestamp(value).date(), 'D').astype(np.int64))
+
+
+class _Chunk:
+    """Sorted (cell, day) keys plus cumulative sums of every measure"""
+
+    def __init__(self, keys, values):
+        self.keys = keys
+        # Leading zero row: cumulative[i] is the total of the first i entries
+        self.cumulative = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+        self.first_day = int((keys % DAY_SPAN).min()) - DAY_OFFSET if len(keys) else 0
+        self.last_day = int((keys % DAY_SPAN).max()) - DAY_OFFSET if len(keys) else -1
+
+    @classmethod
+    def from_cumulative(cls, keys, cumulative):
+        """Rebuild a chunk from saved keys and cumulative sums (no re-summing)"""
+        chunk = cls(keys[:0], cumulative[:0, :])
+        chunk.keys, chunk.cumulative = keys, cumulative
+        if len(keys):
+            chunk.first_day = int((keys % DAY_SPAN).min()) - DAY_OFFSET
+            chunk.last_day = int((keys % DAY_SPAN).max()) - DAY_OFFSET
+        return chunk
+
+    def __len__(self):
+        return len(self.keys)
+
+    def values(self):
+        """Per-entry (not cumulative) values, used when compacting"""
+        return np.diff(self.cumulative, axis=0)
+
+    def range_totals(self, cell_ids, start_day, end_day):
+        """Totals per cell for start_day <= day <= end_day: shape (cells, columns)"""
+        base = cell_ids.astype(np.int64) * DAY_SPAN + DAY_OFFSET
+        lo = np.searchsorted(self.keys, base + start_day, side='left')
+        hi = np.searchsorted(self.keys, base + end_day, side='right')
+        return self.cumulative[hi] - self.cumulative[lo]
+
+    def boundary_totals(self, cell_ids, boundary_days):
+        """Totals between consecutive boundary days: shape (cells, bins, columns)"""
+        grid = (cell_ids.astype(np.int64)[:, None] * DAY_SPAN + DAY_OFFSET
+                + boundary_days[None, :])
+        positions = np.searchsorted(self.keys, grid.ravel(), side='left').reshape(grid.shape)
+        cumulative = self.cumulative[positions]
+        return np.diff(cumulative, axis=1)
+
+
+class CampaignTimeIndex:
+    """Daily prefix sums per platform × campaign_type × category cell"""
+
+    def __init__(self, max_chunks=8):
+        self.max_chunks = max_chunks
+        self.columns = MEASURES + [COUNT]
+        self.cells = pd.DataFrame(columns=DIMENSIONS)
+        self._cell_ids = {}
+        self._chunks = []
+
+    @classmethod
+    def from_frame(cls, df, max_chunks=8):
+        """Build an index from a cleaned campaign frame"""
+        index = cls(max_chunks=max_chunks)
+        index.append(df)
+        return index
+
+    @classmethod
+    def from_arrays(cls, cells, keys, cumulative, max_chunks=8):
+        """Restore an index saved with to_arrays() (e.g. from a snapshot file)"""
+        index = cls(max_chunks=max_chunks)
+        index.cells = cells.astype(object).reset_index(drop=True)
+        index._cell_ids = {tuple(row): i for i, row in
+                           enumerate(index.cells.itertuples(index=False))}
+        index._chunks = [_Chunk.from_cumulative(keys, cumulative)]
+        return index
+
+    def to_arrays(self):
+        """(cells, keys, cumulative sums) of the compacted index"""
+        self.compact()
+        if not self._chunks:
+            return self.cells, np.zeros(0, np.int64), np.zeros((1, len(self.columns)))
+        chunk = self._chunks[0]
+        return self.cells, chunk.keys, chunk.cumulative
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def _assign_cells(self, df):
+        """Cell id for every row, registering unseen dimension combinations"""
+        combos = df[DIMENSIONS].drop_duplicates()
+        new = [tuple(row) for row in combos.itertuples(index=False)
+               if tuple(row) not in self._cell_ids]
+        for combo in new:
+            self._cell_ids[combo] = len(self._cell_ids)
+        if new:
+            self.cells = pd.concat(
+                [self.cells, pd.DataFrame(new, columns=DIMENSIONS)], ignore_index=True
+            )
+
+        lookup = pd.Series(
+            list(self._cell_ids.values()),
+            index=pd.MultiIndex.from_tuples(list(self._cell_ids), names=DIMENSIONS),
+        )
+        return lookup.reindex(pd.MultiIndex.from_frame(df[DIMENSIONS])).to_numpy(np.int64)
+
+    def append(self, df):
+        """Add campaigns (e.g. newly arrived days) without rebuilding old chunks"""
+        if len(df) == 0:
+            return self
+
+        cell_ids = self._assign_cells(df)
+        keys = cell_ids * DAY_SPAN + DAY_OFFSET + to_day(df['start_date'])
+        weights = df[WEIGHT].to_numpy(np.float64) if WEIGHT in df else np.ones(len(df))
+        values = np.column_stack(
+            [df[m].to_numpy(np.float64) * weights for m in MEASURES] + [weights]
+        )
+
+        # One entry per (cell, day): sort keys, then add up rows sharing a key
+        order = np.argsort(keys, kind='stable')
+        keys, values = keys[order], values[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        self._chunks.append(_Chunk(keys[starts], np.add.reduceat(values, starts, axis=0)))
+
+        if len(self._chunks) > self.max_chunks:
+            self.compact()
+        return self
+
+    def compact(self):
+        """Merge all chunks into one"""
+        if len(self._chunks) <= 1:
+            return self
+        keys = np.concatenate([c.keys for c in self._chunks])
+        values = np.vstack([c.values() for c in self._chunks])
+        order = np.argsort(keys, kind='stable')
+        keys, values = keys[order], values[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        self._chunks = [_Chunk(keys[starts], np.add.reduceat(values, starts, axis=0))]
+        return self
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    @property
+    def first_day(self):
+        return min((c.first_day for c in self._chunks if len(c)), default=None)
+
+    @property
+    def last_day(self):
+        return max((c.last_day for c in self._chunks if len(c)), default=None)
+
+    @property
+    def total_campaigns(self):
+        return int(round(sum(c.cumulative[-1, -1] for c in self._chunks)))
+
+    def select_cells(self, **filters):
+        """Cell ids whose dimensions match the given lists of allowed values"""
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dimension, allowed in filters.items():
+            if allowed is not None:
+                mask &= self.cells[dimension].isin(list(allowed)).to_numpy()
+        return np.flatnonzero(mask)
+
+    def cell_totals(self, start, end, **filters):
+        """Measure totals per selected cell for start <= start_date <= end"""
+        cell_ids = self.select_cells(**filters)
+        start_day, end_day = to_day(start), to_day(end)
+
+        totals = np.zeros((len(cell_ids), len(self.columns)))
+        for chunk in self._chunks:
+            if chunk.last_day >= start_day and chunk.first_day <= end_day:
+                totals += chunk.range_totals(cell_ids, start_day, end_day)
+
+        result = self.cells.iloc[cell_ids].reset_index(drop=True)
+        result[self.columns] = totals
+        return result[result[COUNT] > 0].reset_index(drop=True)
+
+    def monthly(self, start, end, **filters):
+        """Measure totals per selected cell and calendar month of start_date"""
+        cell_ids = self.select_cells(**filters)
+        start_day, end_day = to_day(start), to_day(end)
+
+        first_month = np.datetime64(start_day, 'D').astype('datetime64[M]')
+        last_month = np.datetime64(end_day, 'D').astype('datetime64[M]')
+        months = np.arange(first_month, last_month + 1)
+        boundaries = months.astype('datetime64[D]').astype(np.int64)
+        boundaries[0] = start_day
+        boundaries = np.append(boundaries, end_day + 1)
+
+        totals = np.zeros((len(cell_ids), len(months), len(self.columns)))
+        for chunk in self._chunks:
+            if chunk.last_day >= start_day and chunk.first_day <= end_day:
+                totals += chunk.boundary_totals(cell_ids, boundaries)
+
+        cell_pos, month_pos = np.nonzero(totals[:, :, -1] > 0)
+        result = self.cells.iloc[cell_ids[cell_pos]].reset_index(drop=True)
+        result.insert(0, 'month', months[month_pos].astype('datetime64[ns]'))
+        result[self.columns] = totals[cell_pos, month_pos]
+        return result
+
+
+def rollup(totals, by, sums=(), means=()):
+    """Group index output by `by`, summing `sums` and re-deriving campaign means
+
+    rollup(totals, 'platform', sums=['revenue'], means=['ROAS']) matches
+    df.groupby('platform').agg({'revenue': 'sum', 'ROAS': 'mean'}).
+    """
+    columns = list(sums) + [m for m in means if m not in sums] + [COUNT]
+    grouped = totals.groupby(by, sort=True)[columns].sum()
+    grouped = grouped[grouped[COUNT] > 0]
+    for measure in means:
+        grouped[measure] = grouped[measure] / grouped[COUNT]
+    return grouped
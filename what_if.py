@@ -0,0 +1,78 @@
+"""
+WHAT-IF ASSUMPTIONS: AVERAGE ORDER VALUE AND PLATFORM CPM
+=========================================================
+01_data_cleaning_tutorial.py simulates two numbers we do not actually have:
+    revenue       = product_sales × AVERAGE_ORDER_VALUE
+    campaign_cost = estimated_reach / 1000 × platform_cpm[platform] × noise
+
+Both are linear, so changing an assumption just rescales what we already
+computed - there is no need to re-run the cleaning script:
+    revenue       × (new AOV / old AOV)
+    campaign_cost × (new CPM / old CPM)            for that platform
+    CAC           × (new CPM / old CPM)            CAC = cost / sales
+    ROAS          × (AOV ratio) / (CPM ratio)      ROAS = revenue / cost
+
+Every platform-level total or sum of these columns (time index cells,
+monthly rollups, even individual campaigns) can be rescaled the same way.
+Results match a full re-run up to the 2-decimal rounding 01 applies to each
+campaign's ROAS and CAC.
+"""
+
+# The assumptions 01_data_cleaning_tutorial.py used to build the cleaned data.
+# Keep in sync with STEP 5 of that script.
+BASELINE_AOV = 50
+BASELINE_CPM = {
+    'Instagram': 7,
+    'YouTube': 10,
+    'TikTok': 6,
+    'Twitter': 5
+}
+
+
+def is_baseline(aov=BASELINE_AOV, cpm=None):
+    """True when the assumptions are the ones the data was built with"""
+    cpm = cpm or {}
+    return aov == BASELINE_AOV and all(
+        cpm.get(platform, value) == value for platform, value in BASELINE_CPM.items()
+    )
+
+
+def apply_assumptions(frame, aov=BASELINE_AOV, cpm=None):
+    """Rescale revenue, cost, ROAS and CAC columns of frame to new assumptions
+
+    frame needs a 'platform' column; any of campaign_cost, revenue, ROAS and
+    CAC that are present are rescaled (as sums or per-campaign values).
+    Returns frame unchanged when the assumptions are the baseline ones.
+    """
+    cpm = cpm or {}
+    if is_baseline(aov, cpm):
+        return frame
+
+    revenue_ratio = aov / BASELINE_AOV
+    cost_ratio = frame['platform'].map(
+        {platform: cpm.get(platform, base) / base for platform, base in BASELINE_CPM.items()}
+    ).fillna(1.0).to_numpy()
+
+    frame = frame.copy()
+    if 'revenue' in frame:
+        frame['revenue'] = frame['revenue'] * revenue_ratio
+    if 'campaign_cost' in frame:
+        frame['campaign_cost'] = frame['campaign_cost'] * cost_ratio
+    if 'CAC' in frame:
+        frame['CAC'] = frame['CAC'] * cost_ratio
+    if 'ROAS' in frame:
+        frame['ROAS'] = frame['ROAS'] * revenue_ratio / cost_ratio
+    return frame
+
+
+def describe(aov=BASELINE_AOV, cpm=None):
+    """One-line summary of the assumptions that differ from the baseline"""
+    cpm = cpm or {}
+    changes = []
+    if aov != BASELINE_AOV:
+        changes.append(f"AOV ${BASELINE_AOV:g} → ${aov:g}")
+    for platform, base in BASELINE_CPM.items():
+        value = cpm.get(platform, base)
+        if value != base:
+            changes.append(f"{platform} CPM ${base:g} → ${value:g}")
+    return ", ".join(changes) if changes else "baseline assumptions"